@@ -1,13 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form, BackgroundTasks
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Request, File, UploadFile, Form
+from typing import Any, Dict, List, Optional
 import os
+import json
+import asyncio
 from pydantic import BaseModel
 
-# Import services
-from services.avatar.visual_processor import VisualProcessorService
-from services.avatar.avatar_creator import AvatarCreatorService
-from services.avatar.animation_synchronizer import AnimationSynchronizerService
-from services.avatar.model_exporter import ModelExporterService
+# Shared service container
+from core.container import ServiceContainer, get_services
+from core.config import settings
+from core.events import event_stream_response
+from core.media import media_response, package_file_response, record_media
+from core.uploads import UploadTooLargeError, ingest_upload
+from services.avatar.animation_format import MEDIA_TYPE as ANIMATION_MEDIA_TYPE
+from services.video.hls import HLS_MEDIA_TYPES, MASTER_PLAYLIST
 
 router = APIRouter(tags=["avatar"])
 
@@ -24,14 +29,126 @@ class AvatarResponse(BaseModel):
     avatar_model_url: str
     status: str
 
+class AvatarBatchItem(BaseModel):
+    music_id: str
+    visual_description: Optional[str] = None
+    style: str = "realistic"
+
+class AvatarBatchRequest(BaseModel):
+    items: List[AvatarBatchItem]
+
+class AvatarBatchResponse(BaseModel):
+    id: str
+    items: List[Dict[str, Any]]
+    status: str
+
 # Endpoints
+@router.post("/avatar/batch", response_model=AvatarBatchResponse)
+async def create_avatar_batch(
+    request: AvatarBatchRequest,
+    services: ServiceContainer = Depends(get_services)
+):
+    """
+    Creates several avatars in a single job.
+    
+    - **items**: Avatar specs (music_id, visual_description, style); reference images are not supported in batches
+    
+    Items with the same style and description share visual processing and the
+    base avatar, and items with the same music_id share one music analysis.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Batch has no items")
+    if len(request.items) > settings.AVATAR_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has more than {settings.AVATAR_BATCH_MAX_ITEMS} items"
+        )
+    
+    batch_id = None
+    try:
+        batch_id = f"avatar_batch_{os.urandom(6).hex()}"
+        
+        items = [
+            {
+                "avatar_id": f"avatar_{item.music_id}_{os.urandom(4).hex()}",
+                "music_id": item.music_id,
+                "style": item.style,
+                "visual_description": item.visual_description
+            }
+            for item in request.items
+        ]
+        
+        services.status_store.create(batch_id, "avatar_batch", {
+            "avatar_ids": [item["avatar_id"] for item in items]
+        })
+        for item in items:
+            services.status_store.create(item["avatar_id"], "avatar", {"batch_id": batch_id})
+        
+        # Process each distinct (style, description) once
+        services.status_store.stage(batch_id, "visual", 5)
+        specs = list({(item["style"], item["visual_description"]) for item in items})
+        visual_results = await asyncio.gather(*(
+            services.visual_processor.process(description=description, style=style)
+            for style, description in specs
+        ))
+        visual_data = dict(zip(specs, visual_results))
+        
+        for item in items:
+            item["visual_data"] = visual_data[(item["style"], item.pop("visual_description"))]
+        
+        # Enqueue the whole batch as one job for the workers
+        services.status_store.enqueued(batch_id)
+        services.job_queue.enqueue("avatar_batch", {
+            "batch_id": batch_id,
+            "items": items
+        })
+        
+        return {
+            "id": batch_id,
+            "items": [
+                {
+                    "id": item["avatar_id"],
+                    "music_id": item["music_id"],
+                    "status_url": f"/api/avatar/{item['avatar_id']}"
+                }
+                for item in items
+            ],
+            "status": "processing"
+        }
+        
+    except Exception as e:
+        if batch_id:
+            services.status_store.fail(batch_id, str(e))
+        raise HTTPException(status_code=500, detail=f"Error creating avatar batch: {str(e)}")
+
+@router.get("/avatar/batch/{batch_id}")
+async def get_avatar_batch_status(
+    batch_id: str,
+    services: ServiceContainer = Depends(get_services)
+):
+    """
+    Checks the status of an avatar batch and of each of its avatars.
+    """
+    status = services.status_store.get(batch_id)
+    
+    if status is None or status["kind"] != "avatar_batch":
+        raise HTTPException(status_code=404, detail="Avatar batch not found")
+    
+    items = []
+    for avatar_id in status["result"].get("avatar_ids", []):
+        item = services.status_store.get(avatar_id) or {"id": avatar_id, "status": "unknown"}
+        items.append(_with_media_urls(item))
+    status["items"] = items
+    
+    return status
+
 @router.post("/avatar/create", response_model=AvatarResponse)
 async def create_avatar(
     music_id: str = Form(...),
     visual_description: Optional[str] = Form(None),
     style: str = Form("realistic"),
     image_file: Optional[UploadFile] = File(None),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    services: ServiceContainer = Depends(get_services)
 ):
     """
     Creates a digital avatar based on visual description or uploaded image.
@@ -41,26 +158,34 @@ async def create_avatar(
     - **style**: Visual style (realistic, cartoon, anime, futuristic)
     - **image_file**: (Optional) User's selfie or reference image
     """
+    avatar_id = None
     try:
         # Generate unique ID for the avatar
         avatar_id = f"avatar_{music_id}_{os.urandom(4).hex()}"
         
+        # Stream the uploaded image to disk; later stages only receive its path
+        image_path = None
+        if image_file:
+            image_path = (await ingest_upload(image_file))["path"]
+        
+        services.status_store.create(avatar_id, "avatar")
+        
         # Process visual input (description or image)
-        visual_processor = VisualProcessorService()
-        visual_data = await visual_processor.process(
+        services.status_store.stage(avatar_id, "visual", 5)
+        visual_data = await services.visual_processor.process(
             description=visual_description,
-            image_file=image_file,
+            image_path=image_path,
             style=style
         )
         
-        # Start avatar generation process in background
-        background_tasks.add_task(
-            process_avatar_generation,
-            avatar_id=avatar_id,
-            music_id=music_id,
-            visual_data=visual_data,
-            style=style
-        )
+        # Enqueue avatar generation for the workers
+        services.status_store.enqueued(avatar_id)
+        services.job_queue.enqueue("avatar", {
+            "avatar_id": avatar_id,
+            "music_id": music_id,
+            "visual_data": visual_data,
+            "style": style
+        })
         
         return {
             "id": avatar_id,
@@ -70,110 +195,303 @@ async def create_avatar(
             "status": "processing"
         }
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
+        if avatar_id:
+            services.status_store.fail(avatar_id, str(e))
         raise HTTPException(status_code=500, detail=f"Error creating avatar: {str(e)}")
 
 @router.get("/avatar/{avatar_id}")
-async def get_avatar_status(avatar_id: str):
+async def get_avatar_status(
+    avatar_id: str,
+    services: ServiceContainer = Depends(get_services)
+):
     """
     Checks the status of avatar generation.
     """
-    # Check if avatar exists and its status
-    # Simplified implementation - in production, would check database
-    avatar_video_path = f"./storage/avatar/{avatar_id}/avatar_video.mp4"
-    avatar_model_path = f"./storage/avatar/{avatar_id}/avatar_model.glb"
+    # Look up the status index (without touching the media directories)
+    status = services.status_store.get(avatar_id)
     
-    if os.path.exists(avatar_video_path) and os.path.exists(avatar_model_path):
-        return {
-            "id": avatar_id,
-            "status": "completed",
-            "avatar_video_url": f"/api/avatar/{avatar_id}/video",
-            "avatar_model_url": f"/api/avatar/{avatar_id}/model"
-        }
-    else:
-        return {
-            "id": avatar_id,
-            "status": "processing"
-        }
+    if status is None:
+        raise HTTPException(status_code=404, detail="Avatar not found")
+    
+    return _with_media_urls(status)
+
+def _with_media_urls(status: Dict[str, Any]) -> Dict[str, Any]:
+    # Media URLs are only exposed once the avatar is completed
+    if status["status"] == "completed":
+        avatar_id = status["id"]
+        status["avatar_video_url"] = f"/api/avatar/{avatar_id}/video"
+        status["avatar_model_url"] = f"/api/avatar/{avatar_id}/model"
+        status["avatar_animation_url"] = f"/api/avatar/{avatar_id}/animation"
+        if status["result"].get("hls_renditions"):
+            status["avatar_hls_url"] = f"/api/avatar/{avatar_id}/hls/master.m3u8"
+    return status
+
+@router.get("/avatar/{avatar_id}/events")
+async def stream_avatar_events(
+    avatar_id: str,
+    request: Request,
+    services: ServiceContainer = Depends(get_services)
+):
+    """
+    Streams avatar generation stage transitions and progress as Server-Sent Events.
+    """
+    return event_stream_response(services.event_broker, avatar_id, request)
 
 @router.get("/avatar/{avatar_id}/video")
-async def stream_avatar_video(avatar_id: str):
+async def stream_avatar_video(avatar_id: str, request: Request):
     """
-    Returns the avatar video file for streaming.
+    Returns the avatar video file for streaming (with Range and ETag support).
     """
-    from fastapi.responses import FileResponse
-    
-    avatar_path = f"./storage/avatar/{avatar_id}/avatar_video.mp4"
-    
-    if not os.path.exists(avatar_path):
-        raise HTTPException(status_code=404, detail="Avatar video not found or still processing")
-    
-    return FileResponse(
-        path=avatar_path,
+    return await media_response(
+        request,
+        f"./storage/avatar/{avatar_id}/avatar_video.mp4",
         media_type="video/mp4",
-        filename=f"twinverse_avatar_{avatar_id}.mp4"
+        filename=f"twinverse_avatar_{avatar_id}.mp4",
+        not_found="Avatar video not found or still processing"
+    )
+
+@router.get("/avatar/{avatar_id}/hls/{file_path:path}")
+async def stream_avatar_hls(avatar_id: str, file_path: str, request: Request):
+    """
+    Returns the HLS master playlist (always revalidated) and the immutable,
+    content-addressed rendition playlists and fMP4 segments of the avatar video.
+    """
+    return await package_file_response(
+        request,
+        f"./storage/avatar/{avatar_id}/hls",
+        file_path,
+        HLS_MEDIA_TYPES,
+        not_found="Avatar stream not found or still processing",
+        revalidate=(MASTER_PLAYLIST,)
+    )
+
+@router.get("/avatar/{avatar_id}/animation")
+async def stream_avatar_animation(avatar_id: str, request: Request):
+    """
+    Returns the binary animation container (per-frame channels) of the avatar.
+    """
+    return await media_response(
+        request,
+        f"./storage/avatar/{avatar_id}/avatar_animated.anim",
+        media_type=ANIMATION_MEDIA_TYPE,
+        filename=f"twinverse_avatar_{avatar_id}.anim",
+        not_found="Avatar animation not found or still processing"
     )
 
 @router.get("/avatar/{avatar_id}/model")
-async def download_avatar_model(avatar_id: str):
+async def download_avatar_model(avatar_id: str, request: Request):
     """
     Returns the 3D model file of the avatar.
     """
-    from fastapi.responses import FileResponse
-    
-    model_path = f"./storage/avatar/{avatar_id}/avatar_model.glb"
-    
-    if not os.path.exists(model_path):
-        raise HTTPException(status_code=404, detail="Avatar model not found or still processing")
-    
-    return FileResponse(
-        path=model_path,
+    return await media_response(
+        request,
+        f"./storage/avatar/{avatar_id}/avatar_model.glb",
         media_type="model/gltf-binary",
-        filename=f"twinverse_avatar_{avatar_id}.glb"
+        filename=f"twinverse_avatar_{avatar_id}.glb",
+        not_found="Avatar model not found or still processing"
     )
 
-# Background processing function
+# Processing functions run by the workers (see worker.py)
 async def process_avatar_generation(
+    services: ServiceContainer,
     avatar_id: str,
     music_id: str,
     visual_data: dict,
     style: str
 ):
     try:
+        services.status_store.start(avatar_id)
+        
         # Create directory for avatar files
         os.makedirs(f"./storage/avatar/{avatar_id}", exist_ok=True)
         
-        # Get music data for emotion and voice characteristics
-        # In production, would retrieve from database
-        music_path = f"./storage/music/{music_id}/musica_finalizada.mp3"
-        
         # Create base avatar
-        avatar_creator = AvatarCreatorService()
-        avatar_base = await avatar_creator.create(
+        services.status_store.stage(avatar_id, "base", 20)
+        avatar_base = await services.avatar_creator.create(
             visual_data=visual_data,
             style=style,
             output_dir=f"./storage/avatar/{avatar_id}"
         )
         
-        # Synchronize avatar with music
-        animation_synchronizer = AnimationSynchronizerService()
-        animated_avatar = await animation_synchronizer.synchronize(
-            avatar_base=avatar_base,
-            music_path=music_path,
-            output_dir=f"./storage/avatar/{avatar_id}"
-        )
+        await _animate_and_export(services, avatar_id, music_id, avatar_base)
         
-        # Export avatar as video and 3D model
-        model_exporter = ModelExporterService()
-        await model_exporter.export(
-            animated_avatar=animated_avatar,
-            formats=["mp4", "glb"],
-            output_dir=f"./storage/avatar/{avatar_id}"
-        )
+    except Exception as e:
+        _record_avatar_failure(services, avatar_id, e)
+        
+        # Re-raise so the worker reschedules the job
+        raise
+
+async def process_avatar_batch(
+    services: ServiceContainer,
+    batch_id: str,
+    items: List[dict]
+):
+    """
+    Runs every avatar of a batch stage by stage: one music analysis per
+    music_id, one base avatar per (style, features) group (the others reuse
+    it through the base asset cache), then animation, optimization and export
+    of all avatars concurrently. A failed avatar does not stop the others.
+    """
+    try:
+        services.status_store.start(batch_id)
+        
+        # Avatars finished by a previous attempt of this job are not redone
+        pending = [
+            item for item in items
+            if (services.status_store.get(item["avatar_id"]) or {}).get("status") != "completed"
+        ]
+        for item in pending:
+            services.status_store.start(item["avatar_id"])
+            os.makedirs(f"./storage/avatar/{item['avatar_id']}", exist_ok=True)
+        
+        # Decode and analyze each music once for the whole batch
+        services.status_store.stage(batch_id, "analysis", 10)
+        music_ids = sorted({item["music_id"] for item in pending})
+        analyses = dict(zip(music_ids, await asyncio.gather(*(
+            services.music_analyzer.analyze(_music_path(music_id)) for music_id in music_ids
+        ))))
+        
+        # Base avatars: the first item of each group builds the template, the rest hit the cache
+        services.status_store.stage(batch_id, "base", 20)
+        groups: Dict[str, List[dict]] = {}
+        for item in pending:
+            key = json.dumps([item["style"], item["visual_data"]], sort_keys=True)
+            groups.setdefault(key, []).append(item)
         
-        # In production, would update status in database
+        bases: Dict[str, Dict[str, Any]] = {}
+        
+        async def create_base(item: dict) -> None:
+            avatar_id = item["avatar_id"]
+            services.status_store.stage(avatar_id, "base", 20)
+            bases[avatar_id] = await services.avatar_creator.create(
+                visual_data=item["visual_data"],
+                style=item["style"],
+                output_dir=f"./storage/avatar/{avatar_id}"
+            )
+        
+        async def create_group(group: List[dict]) -> None:
+            await create_base(group[0])
+            await asyncio.gather(*(create_base(item) for item in group[1:]))
+        
+        await asyncio.gather(*(create_group(group) for group in groups.values()))
+        
+        # Animation, optimization and export per avatar; the export pool bounds the CPU work
+        services.status_store.stage(batch_id, "avatars", 40)
+        finished = 0
+        
+        async def finish(item: dict) -> bool:
+            nonlocal finished
+            avatar_id = item["avatar_id"]
+            try:
+                await _animate_and_export(
+                    services, avatar_id, item["music_id"], bases[avatar_id], analyses[item["music_id"]]
+                )
+                return True
+            except Exception as e:
+                _record_avatar_failure(services, avatar_id, e)
+                return False
+            finally:
+                finished += 1
+                services.status_store.progress(batch_id, "avatars", 40 + 60 * finished / len(pending))
+        
+        succeeded = await asyncio.gather(*(finish(item) for item in pending))
+        
+        # The batch is not retried for individual avatars: their failures are final
+        failed = [item["avatar_id"] for item, ok in zip(pending, succeeded) if not ok]
+        for avatar_id in failed:
+            services.status_store.fail(avatar_id)
+        services.status_store.complete(batch_id, {
+            "completed": len(items) - len(failed),
+            "failed": failed,
+            "music_analyses": len(music_ids),
+            "base_groups": len(groups)
+        })
         
     except Exception as e:
-        # Log error and update status
-        with open(f"./storage/avatar/{avatar_id}/error.log", "w") as f:
-            f.write(f"Error generating avatar: {str(e)}")
+        # The status only becomes "failed" once the queue gives up (see worker.py);
+        # unfinished avatars wait for the retry too instead of staying "running"
+        error = f"Error generating avatar batch: {str(e)}"
+        services.status_store.retrying(batch_id, error)
+        for avatar_id in _unfinished_avatars(services, items):
+            services.status_store.retrying(avatar_id, error)
+        
+        # Re-raise so the worker reschedules the job
+        raise
+
+def fail_batch_avatars(services: ServiceContainer, items: List[dict], error: Optional[str]):
+    """
+    Marks every avatar of a batch that is not completed as failed, keeping the
+    error of its last attempt. Called when the queue gives up on the batch.
+    """
+    for avatar_id in _unfinished_avatars(services, items):
+        status = services.status_store.get(avatar_id)
+        services.status_store.fail(avatar_id, status["error"] or error)
+
+def _unfinished_avatars(services: ServiceContainer, items: List[dict]) -> List[str]:
+    unfinished = []
+    for item in items:
+        status = services.status_store.get(item["avatar_id"])
+        if status is not None and status["status"] not in ("completed", "failed"):
+            unfinished.append(item["avatar_id"])
+    return unfinished
+
+def _music_path(music_id: str) -> str:
+    # In production, would retrieve from database
+    return f"./storage/music/{music_id}/musica_finalizada.mp3"
+
+async def _animate_and_export(
+    services: ServiceContainer,
+    avatar_id: str,
+    music_id: str,
+    avatar_base: Dict[str, Any],
+    analysis: Optional[Dict[str, Any]] = None
+):
+    """
+    Stages shared by single and batch generation, from animation to completion.
+    """
+    output_dir = f"./storage/avatar/{avatar_id}"
+    
+    # Synchronize avatar with music
+    services.status_store.stage(avatar_id, "animation", 45)
+    animated_avatar = await services.animation_synchronizer.synchronize(
+        avatar_base=avatar_base,
+        music_path=_music_path(music_id),
+        output_dir=output_dir,
+        analysis=analysis
+    )
+    
+    # Reduce per-frame channels to error-bounded keyframes
+    services.status_store.stage(avatar_id, "optimize", 60)
+    animated_avatar = await services.animation_optimizer.optimize(animated_avatar)
+    
+    # Export avatar as video and 3D model
+    services.status_store.stage(avatar_id, "export", 75)
+    exported = await services.model_exporter.export(
+        animated_avatar=animated_avatar,
+        formats=["mp4", "glb"],
+        output_dir=output_dir,
+        on_format_exported=lambda format, seconds: services.status_store.record_timings(
+            avatar_id, {f"export_{format}": seconds}
+        )
+    )
+    
+    # Hashes of the served files for the media server cache validators
+    record_media(*exported.values(), animated_avatar.get("animation_path"))
+    
+    # Segmented HLS renditions of the avatar video (the MP4 stays as fallback)
+    services.status_store.stage(avatar_id, "package", 90)
+    package = await services.stream_packager.package(exported["mp4"], f"{output_dir}/hls")
+    
+    services.status_store.complete(avatar_id, {
+        "animation_optimization": animated_avatar.get("optimization"),
+        "hls_renditions": package["renditions"] if package else None
+    })
+
+def _record_avatar_failure(services: ServiceContainer, avatar_id: str, error: Exception):
+    # Log error and update status; it only becomes "failed" once the failure is final
+    services.status_store.retrying(avatar_id, f"Error generating avatar: {str(error)}")
+    with open(f"./storage/avatar/{avatar_id}/error.log", "w") as f:
+        f.write(f"Error generating avatar: {str(error)}")
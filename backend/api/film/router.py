@@ -1,13 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Request, File, UploadFile, Form
 from typing import Optional
 import os
 from pydantic import BaseModel
 
-# Import services
-from services.film.screenplay_generator import ScreenplayGeneratorService
-from services.film.storyboard_creator import StoryboardCreatorService
-from services.film.video_generator import VideoGeneratorService
-from services.film.video_editor import VideoEditorService
+# Shared service container
+from core.checkpoint import CheckpointManifest
+from core.container import ServiceContainer, get_services
+from core.events import event_stream_response
+from core.media import media_response, package_file_response, record_media
+from services.video.hls import HLS_MEDIA_TYPES, MASTER_PLAYLIST
 
 router = APIRouter(tags=["film"])
 
@@ -30,7 +31,7 @@ class FilmResponse(BaseModel):
 async def create_film(
     music_id: str = Form(...),
     avatar_id: str = Form(...),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    services: ServiceContainer = Depends(get_services)
 ):
     """
     Creates a short film based on music and avatar.
@@ -38,17 +39,18 @@ async def create_film(
     - **music_id**: ID of the previously created music
     - **avatar_id**: ID of the previously created avatar
     """
+    film_id = None
     try:
         # Generate unique ID for the film
         film_id = f"film_{music_id}_{avatar_id}_{os.urandom(4).hex()}"
+        services.status_store.create(film_id, "film")
         
-        # Start film generation process in background
-        background_tasks.add_task(
-            process_film_generation,
-            film_id=film_id,
-            music_id=music_id,
-            avatar_id=avatar_id
-        )
+        # Enqueue film generation for the workers
+        services.job_queue.enqueue("film", {
+            "film_id": film_id,
+            "music_id": music_id,
+            "avatar_id": avatar_id
+        })
         
         return {
             "id": film_id,
@@ -61,95 +63,118 @@ async def create_film(
         }
         
     except Exception as e:
+        if film_id:
+            services.status_store.fail(film_id, str(e))
         raise HTTPException(status_code=500, detail=f"Error creating film: {str(e)}")
 
 @router.get("/film/{film_id}")
-async def get_film_status(film_id: str):
+async def get_film_status(
+    film_id: str,
+    services: ServiceContainer = Depends(get_services)
+):
     """
     Checks the status of film generation.
     """
-    # Check if film exists and its status
-    # Simplified implementation - in production, would check database
-    film_path = f"./storage/film/{film_id}/curta_twinverse.mp4"
-    screenplay_path = f"./storage/film/{film_id}/roteiro_curta.txt"
+    # Look up the status index (without touching the media directories)
+    status = services.status_store.get(film_id)
     
-    if os.path.exists(film_path) and os.path.exists(screenplay_path):
-        return {
-            "id": film_id,
-            "status": "completed",
-            "screenplay_url": f"/api/film/{film_id}/screenplay",
-            "storyboard_url": f"/api/film/{film_id}/storyboard",
-            "film_url": f"/api/film/{film_id}/video"
-        }
-    else:
-        return {
-            "id": film_id,
-            "status": "processing"
-        }
+    if status is None:
+        raise HTTPException(status_code=404, detail="Film not found")
+    
+    if status["status"] == "completed":
+        status["screenplay_url"] = f"/api/film/{film_id}/screenplay"
+        status["storyboard_url"] = f"/api/film/{film_id}/storyboard"
+        status["film_url"] = f"/api/film/{film_id}/video"
+        if status["result"].get("hls_renditions"):
+            status["film_hls_url"] = f"/api/film/{film_id}/hls/master.m3u8"
+    
+    return status
+
+@router.get("/film/{film_id}/events")
+async def stream_film_events(
+    film_id: str,
+    request: Request,
+    services: ServiceContainer = Depends(get_services)
+):
+    """
+    Streams film generation stage transitions and progress as Server-Sent Events.
+    """
+    return event_stream_response(services.event_broker, film_id, request)
 
 @router.get("/film/{film_id}/video")
-async def stream_film(film_id: str):
+async def stream_film(film_id: str, request: Request):
     """
-    Returns the film video file for streaming.
+    Returns the film video file for streaming (with Range and ETag support).
     """
-    from fastapi.responses import FileResponse
-    
-    film_path = f"./storage/film/{film_id}/curta_twinverse.mp4"
-    
-    if not os.path.exists(film_path):
-        raise HTTPException(status_code=404, detail="Film not found or still processing")
-    
-    return FileResponse(
-        path=film_path,
+    return await media_response(
+        request,
+        f"./storage/film/{film_id}/curta_twinverse.mp4",
         media_type="video/mp4",
-        filename=f"twinverse_film_{film_id}.mp4"
+        filename=f"twinverse_film_{film_id}.mp4",
+        not_found="Film not found or still processing"
+    )
+
+@router.get("/film/{film_id}/hls/{file_path:path}")
+async def stream_film_hls(film_id: str, file_path: str, request: Request):
+    """
+    Returns the HLS master playlist (always revalidated) and the immutable,
+    content-addressed rendition playlists and fMP4 segments of the film.
+    """
+    return await package_file_response(
+        request,
+        f"./storage/film/{film_id}/hls",
+        file_path,
+        HLS_MEDIA_TYPES,
+        not_found="Film stream not found or still processing",
+        revalidate=(MASTER_PLAYLIST,)
     )
 
 @router.get("/film/{film_id}/screenplay")
-async def get_screenplay(film_id: str):
+async def get_screenplay(film_id: str, request: Request):
     """
     Returns the screenplay text file.
     """
-    from fastapi.responses import FileResponse
-    
-    screenplay_path = f"./storage/film/{film_id}/roteiro_curta.txt"
-    
-    if not os.path.exists(screenplay_path):
-        raise HTTPException(status_code=404, detail="Screenplay not found or still processing")
-    
-    return FileResponse(
-        path=screenplay_path,
+    return await media_response(
+        request,
+        f"./storage/film/{film_id}/roteiro_curta.txt",
         media_type="text/plain",
-        filename=f"twinverse_screenplay_{film_id}.txt"
+        filename=f"twinverse_screenplay_{film_id}.txt",
+        not_found="Screenplay not found or still processing"
     )
 
 @router.get("/film/{film_id}/storyboard")
-async def get_storyboard(film_id: str):
+async def get_storyboard(film_id: str, request: Request):
     """
     Returns the storyboard image file.
     """
-    from fastapi.responses import FileResponse
-    
-    storyboard_path = f"./storage/film/{film_id}/storyboard.jpg"
-    
-    if not os.path.exists(storyboard_path):
-        raise HTTPException(status_code=404, detail="Storyboard not found or still processing")
-    
-    return FileResponse(
-        path=storyboard_path,
+    return await media_response(
+        request,
+        f"./storage/film/{film_id}/storyboard.jpg",
         media_type="image/jpeg",
-        filename=f"twinverse_storyboard_{film_id}.jpg"
+        filename=f"twinverse_storyboard_{film_id}.jpg",
+        not_found="Storyboard not found or still processing"
     )
 
-# Background processing function
+# Processing function run by the workers (see worker.py)
 async def process_film_generation(
+    services: ServiceContainer,
     film_id: str,
     music_id: str,
-    avatar_id: str
+    avatar_id: str,
+    resume: bool = True
 ):
     try:
+        services.status_store.start(film_id)
+        
         # Create directory for film files
-        os.makedirs(f"./storage/film/{film_id}", exist_ok=True)
+        film_dir = f"./storage/film/{film_id}"
+        os.makedirs(film_dir, exist_ok=True)
+        
+        # Stage checkpoints: on retry, stages whose outputs are present and
+        # hash-verified are skipped, so only the missing work is paid for
+        checkpoints = CheckpointManifest(f"{film_dir}/checkpoint.json")
+        if not resume:
+            checkpoints.reset()
         
         # Get music and avatar data
         # In production, would retrieve from database
@@ -157,40 +182,101 @@ async def process_film_generation(
         avatar_video_path = f"./storage/avatar/{avatar_id}/avatar_video.mp4"
         
         # Generate screenplay
-        screenplay_generator = ScreenplayGeneratorService()
-        screenplay = await screenplay_generator.generate(
-            music_id=music_id,
-            avatar_id=avatar_id,
-            output_path=f"./storage/film/{film_id}/roteiro_curta.txt"
-        )
+        services.status_store.stage(film_id, "screenplay", 5)
+        screenplay = checkpoints.get("screenplay")
+        if screenplay is None:
+            checkpoints.invalidate("storyboard", "timeline", "scenes", "edit")
+            screenplay = await services.screenplay_generator.generate(
+                music_id=music_id,
+                avatar_id=avatar_id,
+                output_path=f"{film_dir}/roteiro_curta.txt"
+            )
+            checkpoints.save("screenplay", screenplay, outputs=[screenplay["file_path"]])
         
         # Create storyboard
-        storyboard_creator = StoryboardCreatorService()
-        storyboard = await storyboard_creator.create(
-            screenplay=screenplay,
-            output_path=f"./storage/film/{film_id}/storyboard.jpg"
-        )
+        services.status_store.stage(film_id, "storyboard", 20)
+        storyboard = checkpoints.get("storyboard")
+        if storyboard is None:
+            checkpoints.invalidate("timeline", "scenes", "edit")
+            storyboard = await services.storyboard_creator.create(
+                screenplay=screenplay,
+                output_path=f"{film_dir}/storyboard.jpg"
+            )
+            checkpoints.save("storyboard", storyboard, outputs=[storyboard["file_path"]])
         
-        # Generate video scenes
-        video_generator = VideoGeneratorService()
-        scenes = await video_generator.generate(
-            screenplay=screenplay,
-            storyboard=storyboard,
-            output_dir=f"./storage/film/{film_id}/scenes"
-        )
+        # Plan scene durations over the music (cuts snapped to bars and sections)
+        services.status_store.stage(film_id, "timeline", 30)
+        timeline = checkpoints.get("timeline")
+        if timeline is None:
+            checkpoints.invalidate("scenes", "edit")
+            timeline = await services.timeline_planner.plan(
+                music_path=music_path,
+                scene_count=len(storyboard.get("scenes", []))
+            )
+            checkpoints.save("timeline", timeline)
+        
+        # Generate video scenes (each scene is checkpointed as soon as it is rendered)
+        services.status_store.stage(film_id, "scenes", 35)
+        scenes = checkpoints.get("scenes")
+        if scenes is None:
+            checkpoints.invalidate("edit")
+            completed_scenes = {}
+            for i in range(len(storyboard.get("scenes", []))):
+                scene = checkpoints.get(f"scenes/{i}")
+                if scene is not None:
+                    completed_scenes[i] = scene
+            rendered = set(completed_scenes)
+            
+            def on_scene_generated(i, scene):
+                checkpoints.save(f"scenes/{i}", scene, outputs=[scene["file_path"]])
+                rendered.add(i)
+            
+            scenes = await services.video_generator.generate(
+                screenplay=screenplay,
+                storyboard=storyboard,
+                output_dir=f"{film_dir}/scenes",
+                timeline=timeline["scenes"],
+                completed_scenes=completed_scenes,
+                on_scene_generated=on_scene_generated
+            )
+            
+            # Only checkpoint the whole stage if every scene was really rendered
+            # (placeholders from failed scenes are regenerated on the next run)
+            if len(rendered) == len(scenes):
+                checkpoints.save("scenes", scenes, outputs=[scene["file_path"] for scene in scenes])
         
         # Edit final film
-        video_editor = VideoEditorService()
-        final_film = await video_editor.edit(
-            scenes=scenes,
-            music_path=music_path,
-            avatar_path=avatar_video_path,
-            output_path=f"./storage/film/{film_id}/curta_twinverse.mp4"
+        services.status_store.stage(film_id, "edit", 80)
+        final_film = checkpoints.get("edit")
+        if final_film is None:
+            final_film = await services.video_editor.edit(
+                scenes=scenes,
+                music_path=music_path,
+                avatar_path=avatar_video_path,
+                output_path=f"{film_dir}/curta_twinverse.mp4"
+            )
+            checkpoints.save("edit", final_film, outputs=[final_film["file_path"]])
+        
+        # Hashes of the served files for the media server cache validators
+        record_media(
+            f"{film_dir}/curta_twinverse.mp4",
+            f"{film_dir}/roteiro_curta.txt",
+            f"{film_dir}/storyboard.jpg"
         )
         
-        # In production, would update status in database
+        # Segmented HLS renditions for adaptive streaming (the MP4 stays as fallback)
+        services.status_store.stage(film_id, "package", 90)
+        package = await services.stream_packager.package(final_film["file_path"], f"{film_dir}/hls")
+        
+        services.status_store.complete(film_id, {
+            "hls_renditions": package["renditions"] if package else None
+        })
         
     except Exception as e:
-        # Log error and update status
+        # Log error; the status only becomes "failed" once the queue gives up (see worker.py)
+        services.status_store.retrying(film_id, f"Error generating film: {str(e)}")
         with open(f"./storage/film/{film_id}/error.log", "w") as f:
             f.write(f"Error generating film: {str(e)}")
+        
+        # Re-raise so the worker reschedules the job
+        raise
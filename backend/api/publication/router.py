@@ -1,13 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, Form, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Request, Form
 from typing import Optional
 import os
 from pydantic import BaseModel
 
-# Import services
-from services.publication.page_template import PageTemplateService
-from services.publication.asset_compiler import AssetCompilerService
-from services.publication.url_generator import URLGeneratorService
-from services.publication.sharing_integration import SharingIntegrationService
+# Shared service container
+from core.container import ServiceContainer, get_services
+from core.events import event_stream_response
+from core.media import media_response, record_media
 
 router = APIRouter(tags=["publication"])
 
@@ -26,6 +25,11 @@ class PublicationResponse(BaseModel):
     public_url: str
     status: str
 
+class PlaybackMetric(BaseModel):
+    asset: str  # film, avatar
+    source: str  # hls, mp4
+    startup_ms: float
+
 # Endpoints
 @router.post("/publication/create", response_model=PublicationResponse)
 async def create_publication(
@@ -33,7 +37,7 @@ async def create_publication(
     avatar_id: str = Form(...),
     film_id: str = Form(...),
     artist_name: Optional[str] = Form(None),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    services: ServiceContainer = Depends(get_services)
 ):
     """
     Creates a publication page with all generated content.
@@ -43,23 +47,26 @@ async def create_publication(
     - **film_id**: ID of the previously created film
     - **artist_name**: (Optional) Artist name or character name
     """
+    publication_id = None
     try:
         # Generate unique ID for the publication
         publication_id = f"pub_{music_id}_{os.urandom(4).hex()}"
         
         # Generate user ID for URL
         user_id = f"user_{os.urandom(8).hex()}"
+        services.status_store.create(publication_id, "publication", result={
+            "public_url": f"https://www.twinversestudios.cloud/{user_id}"
+        })
         
-        # Start publication generation process in background
-        background_tasks.add_task(
-            process_publication_generation,
-            publication_id=publication_id,
-            music_id=music_id,
-            avatar_id=avatar_id,
-            film_id=film_id,
-            artist_name=artist_name,
-            user_id=user_id
-        )
+        # Enqueue publication generation for the workers
+        services.job_queue.enqueue("publication", {
+            "publication_id": publication_id,
+            "music_id": music_id,
+            "avatar_id": avatar_id,
+            "film_id": film_id,
+            "artist_name": artist_name,
+            "user_id": user_id
+        })
         
         return {
             "id": publication_id,
@@ -71,53 +78,89 @@ async def create_publication(
         }
         
     except Exception as e:
+        if publication_id:
+            services.status_store.fail(publication_id, str(e))
         raise HTTPException(status_code=500, detail=f"Error creating publication: {str(e)}")
 
 @router.get("/publication/{publication_id}")
-async def get_publication_status(publication_id: str):
+async def get_publication_status(
+    publication_id: str,
+    services: ServiceContainer = Depends(get_services)
+):
     """
     Checks the status of publication generation.
     """
-    # Check if publication exists and its status
-    # Simplified implementation - in production, would check database
-    publication_path = f"./storage/publication/{publication_id}/pagina_publicacao.html"
+    # Look up the status index (without touching the media directories)
+    status = services.status_store.get(publication_id)
     
-    if os.path.exists(publication_path):
-        # In production, would retrieve from database
-        user_id = publication_id.replace("pub_", "user_")
-        
-        return {
-            "id": publication_id,
-            "status": "completed",
-            "public_url": f"https://www.twinversestudios.cloud/{user_id}",
-            "html_url": f"/api/publication/{publication_id}/html"
-        }
-    else:
-        return {
-            "id": publication_id,
-            "status": "processing"
-        }
+    if status is None:
+        raise HTTPException(status_code=404, detail="Publication not found")
+    
+    if status["status"] == "completed":
+        status["public_url"] = status["result"].get("public_url")
+        status["html_url"] = f"/api/publication/{publication_id}/html"
+    
+    return status
 
-@router.get("/publication/{publication_id}/html")
-async def get_publication_html(publication_id: str):
+@router.get("/publication/{publication_id}/events")
+async def stream_publication_events(
+    publication_id: str,
+    request: Request,
+    services: ServiceContainer = Depends(get_services)
+):
     """
-    Returns the HTML file of the publication page.
+    Streams publication generation stage transitions and progress as Server-Sent Events.
+    """
+    return event_stream_response(services.event_broker, publication_id, request)
+
+@router.post("/publication/{publication_id}/playback")
+async def record_playback_metric(
+    publication_id: str,
+    metric: PlaybackMetric,
+    services: ServiceContainer = Depends(get_services)
+):
+    """
+    Records the time to first frame measured by the publication page player.
     """
-    from fastapi.responses import FileResponse
+    if metric.asset not in ("film", "avatar") or metric.source not in ("hls", "mp4"):
+        raise HTTPException(status_code=400, detail="Unknown asset or source")
     
-    publication_path = f"./storage/publication/{publication_id}/pagina_publicacao.html"
+    recorded = services.playback_metrics.record(
+        publication_id, metric.asset, metric.source, metric.startup_ms
+    )
+    return {"recorded": recorded}
+
+@router.get("/publication/{publication_id}/playback")
+async def get_playback_metrics(
+    publication_id: str,
+    services: ServiceContainer = Depends(get_services)
+):
+    """
+    Returns startup time statistics (count, median, p95) per asset and source.
+    """
+    summary = services.playback_metrics.summary(publication_id)
     
-    if not os.path.exists(publication_path):
-        raise HTTPException(status_code=404, detail="Publication not found or still processing")
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Publication not found")
     
-    return FileResponse(
-        path=publication_path,
+    return {"id": publication_id, "startup_time": summary}
+
+@router.get("/publication/{publication_id}/html")
+async def get_publication_html(publication_id: str, request: Request):
+    """
+    Returns the HTML file of the publication page.
+    """
+    return await media_response(
+        request,
+        f"./storage/publication/{publication_id}/pagina_publicacao.html",
         media_type="text/html",
-        filename=f"twinverse_publication_{publication_id}.html"
+        filename=f"twinverse_publication_{publication_id}.html",
+        not_found="Publication not found or still processing"
     )
 
-# Background processing function
+# Processing function run by the workers (see worker.py)
 async def process_publication_generation(
+    services: ServiceContainer,
     publication_id: str,
     music_id: str,
     avatar_id: str,
@@ -126,44 +169,54 @@ async def process_publication_generation(
     user_id: str
 ):
     try:
+        services.status_store.start(publication_id)
+        
         # Create directory for publication files
         os.makedirs(f"./storage/publication/{publication_id}", exist_ok=True)
         
         # Compile assets from previous phases
-        asset_compiler = AssetCompilerService()
-        assets = await asset_compiler.compile(
+        services.status_store.stage(publication_id, "assets", 10)
+        assets = await services.asset_compiler.compile(
             music_id=music_id,
             avatar_id=avatar_id,
             film_id=film_id,
             output_dir=f"./storage/publication/{publication_id}/assets"
         )
+        assets["playback_metrics_url"] = f"/api/publication/{publication_id}/playback"
         
         # Generate page template
-        page_template = PageTemplateService()
-        page = await page_template.generate(
+        services.status_store.stage(publication_id, "page", 40)
+        page = await services.page_template.generate(
             assets=assets,
             artist_name=artist_name,
             output_path=f"./storage/publication/{publication_id}/pagina_publicacao.html"
         )
         
         # Generate public URL
-        url_generator = URLGeneratorService()
-        url = await url_generator.generate(
+        services.status_store.stage(publication_id, "url", 70)
+        url = await services.url_generator.generate(
             user_id=user_id,
             publication_id=publication_id
         )
         
         # Set up sharing integrations
-        sharing_integration = SharingIntegrationService()
-        sharing = await sharing_integration.setup(
+        services.status_store.stage(publication_id, "sharing", 85)
+        sharing = await services.sharing_integration.setup(
             publication_id=publication_id,
             public_url=url,
             assets=assets
         )
         
-        # In production, would update status in database
+        # Hash of the served page for the media server cache validators
+        record_media(f"./storage/publication/{publication_id}/pagina_publicacao.html")
+        
+        services.status_store.complete(publication_id, {"public_url": url})
         
     except Exception as e:
-        # Log error and update status
+        # Log error; the status only becomes "failed" once the queue gives up (see worker.py)
+        services.status_store.retrying(publication_id, f"Error generating publication: {str(e)}")
         with open(f"./storage/publication/{publication_id}/error.log", "w") as f:
             f.write(f"Error generating publication: {str(e)}")
+        
+        # Re-raise so the worker reschedules the job
+        raise
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Request, File, UploadFile, Form
 from typing import Optional
 import os
 from pydantic import BaseModel
 
-# Importações dos serviços
-from services.phrase_interpreter import PhraseInterpreterService
-from services.lyrics_generator import LyricsGeneratorService
-from services.music_generator import MusicGeneratorService
-from services.voice_processor import VoiceProcessorService
+# Contêiner de serviços compartilhados
+from core.container import ServiceContainer, get_services
+from core.events import event_stream_response
+from core.media import media_response, record_media
+from core.pipeline import Pipeline
+from core.uploads import UploadTooLargeError, ingest_upload
 
 router = APIRouter(tags=["music"])
 
@@ -31,7 +32,8 @@ async def create_music(
     genre: Optional[str] = Form(None),
     emotion: Optional[str] = Form(None),
     voice_file: Optional[UploadFile] = File(None),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    use_cache: bool = Form(True),
+    services: ServiceContainer = Depends(get_services)
 ):
     """
     Cria uma música original a partir de uma frase criativa.
@@ -40,35 +42,45 @@ async def create_music(
     - **genre**: (Opcional) Gênero musical desejado
     - **emotion**: (Opcional) Emoção principal desejada
     - **voice_file**: (Opcional) Arquivo de voz do usuário
+    - **use_cache**: (Opcional) Reutilizar interpretação e letra já geradas para a mesma entrada
     """
+    music_id = None
     try:
         # Gerar ID único para a música
         music_id = f"music_{phrase[:10].replace(' ', '_').lower()}_{os.urandom(4).hex()}"
         
+        # Gravar o arquivo de voz em disco antes de responder: o worker recebe apenas o caminho
+        voice_path = None
+        if voice_file:
+            voice_path = (await ingest_upload(voice_file))["path"]
+        
+        services.status_store.create(music_id, "music")
+        
         # Processar a frase para extrair emoção, palavras-chave e gênero sugerido
-        phrase_interpreter = PhraseInterpreterService()
-        interpretation = await phrase_interpreter.interpret(phrase, emotion, genre)
+        services.status_store.stage(music_id, "interpret", 5)
+        interpretation = await services.phrase_interpreter.interpret(phrase, emotion, genre, use_cache=use_cache)
         
         # Gerar letra da música
-        lyrics_generator = LyricsGeneratorService()
-        lyrics = await lyrics_generator.generate(
+        services.status_store.stage(music_id, "lyrics", 10)
+        lyrics = await services.lyrics_generator.generate(
             phrase=phrase,
             emotion=interpretation["emotion"],
             genre=interpretation["genre"],
-            keywords=interpretation["keywords"]
+            keywords=interpretation["keywords"],
+            use_cache=use_cache
         )
         
-        # Iniciar processo de geração de música em background
-        # (Este processo pode demorar, então é executado em background)
-        background_tasks.add_task(
-            process_music_generation,
-            music_id=music_id,
-            phrase=phrase,
-            lyrics=lyrics,
-            emotion=interpretation["emotion"],
-            genre=interpretation["genre"],
-            voice_file=voice_file
-        )
+        # Enfileirar a geração da música para os workers
+        # (Este processo pode demorar, então é executado fora do processo da API)
+        services.status_store.enqueued(music_id)
+        services.job_queue.enqueue("music", {
+            "music_id": music_id,
+            "phrase": phrase,
+            "lyrics": lyrics,
+            "emotion": interpretation["emotion"],
+            "genre": interpretation["genre"],
+            "voice_path": voice_path
+        })
         
         return {
             "id": music_id,
@@ -78,56 +90,80 @@ async def create_music(
             "status": "processing"
         }
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
+        if music_id:
+            services.status_store.fail(music_id, str(e))
         raise HTTPException(status_code=500, detail=f"Erro ao criar música: {str(e)}")
 
 @router.get("/music/{music_id}")
-async def get_music_status(music_id: str):
+async def get_music_status(
+    music_id: str,
+    services: ServiceContainer = Depends(get_services)
+):
     """
     Verifica o status de geração de uma música.
     """
-    # Verificar se a música existe e seu status
-    # Implementação simplificada - em produção, verificaria em banco de dados
-    music_path = f"./storage/music/{music_id}/musica_finalizada.mp3"
+    # Consultar o índice de status (sem acessar os diretórios de mídia)
+    status = services.status_store.get(music_id)
     
-    if os.path.exists(music_path):
-        return {
-            "id": music_id,
-            "status": "completed",
-            "music_url": f"/api/music/{music_id}/stream"
-        }
-    else:
-        return {
-            "id": music_id,
-            "status": "processing"
-        }
+    if status is None:
+        raise HTTPException(status_code=404, detail="Música não encontrada")
+    
+    if status["status"] == "completed":
+        status["music_url"] = f"/api/music/{music_id}/stream"
+    
+    return status
+
+@router.get("/music/{music_id}/events")
+async def stream_music_events(
+    music_id: str,
+    request: Request,
+    services: ServiceContainer = Depends(get_services)
+):
+    """
+    Transmite (Server-Sent Events) as transições de etapa e o progresso da geração da música.
+    """
+    return event_stream_response(services.event_broker, music_id, request)
 
 @router.get("/music/{music_id}/stream")
-async def stream_music(music_id: str):
+async def stream_music(music_id: str, request: Request):
     """
-    Retorna o arquivo de música para streaming.
+    Retorna o arquivo de música para streaming (com suporte a Range e ETag).
     """
-    music_path = f"./storage/music/{music_id}/musica_finalizada.mp3"
-    
-    if not os.path.exists(music_path):
-        raise HTTPException(status_code=404, detail="Música não encontrada ou ainda em processamento")
-    
-    return FileResponse(
-        path=music_path,
+    return await media_response(
+        request,
+        f"./storage/music/{music_id}/musica_finalizada.mp3",
         media_type="audio/mpeg",
-        filename=f"twinverse_{music_id}.mp3"
+        filename=f"twinverse_{music_id}.mp3",
+        not_found="Música não encontrada ou ainda em processamento"
     )
 
-# Função auxiliar para processamento em background
+@router.get("/cache/stats")
+async def get_cache_stats(services: ServiceContainer = Depends(get_services)):
+    """
+    Retorna os contadores de acerto/erro e o uso de disco dos caches de
+    interpretação e de letras deste processo.
+    """
+    return {
+        "interpretation": services.interpretation_cache.stats(),
+        "lyrics": services.lyrics_cache.stats()
+    }
+
+# Função de processamento executada pelos workers (ver worker.py)
 async def process_music_generation(
+    services: ServiceContainer,
     music_id: str,
     phrase: str,
     lyrics: str,
     emotion: str,
     genre: str,
-    voice_file: Optional[UploadFile] = None
+    voice_path: Optional[str] = None
 ):
     try:
+        services.status_store.start(music_id)
+        
         # Criar diretório para armazenar arquivos da música
         os.makedirs(f"./storage/music/{music_id}", exist_ok=True)
         
@@ -135,34 +171,60 @@ async def process_music_generation(
         with open(f"./storage/music/{music_id}/lyrics.txt", "w") as f:
             f.write(lyrics)
         
+        music_dir = f"./storage/music/{music_id}"
+        
+        # Grafo de etapas: instrumental e voz são independentes e rodam em paralelo;
+        # apenas a combinação depende das duas
+        pipeline = Pipeline()
+        
         # Gerar melodia instrumental
-        music_generator = MusicGeneratorService()
-        instrumental_path = await music_generator.generate(
+        pipeline.add("instrumental", lambda results: services.music_generator.generate(
             lyrics=lyrics,
             emotion=emotion,
             genre=genre,
-            output_path=f"./storage/music/{music_id}/instrumental.mp3"
-        )
+            output_path=f"{music_dir}/instrumental.mp3"
+        ))
         
         # Processar voz (do usuário ou sintética)
-        voice_processor = VoiceProcessorService()
-        voice_path = await voice_processor.process(
+        pipeline.add("voice", lambda results: services.voice_processor.process(
             lyrics=lyrics,
             emotion=emotion,
-            voice_file=voice_file,
-            output_path=f"./storage/music/{music_id}/voice.mp3"
-        )
+            voice_path=voice_path,
+            output_path=f"{music_dir}/voice.mp3"
+        ))
         
         # Combinar instrumental e voz
-        final_music_path = await music_generator.combine(
-            instrumental_path=instrumental_path,
-            voice_path=voice_path,
-            output_path=f"./storage/music/{music_id}/musica_finalizada.mp3"
-        )
+        pipeline.add("combine", lambda results: services.music_generator.combine(
+            instrumental_path=results["instrumental"],
+            voice_path=results["voice"],
+            output_path=f"{music_dir}/musica_finalizada.mp3"
+        ), depends_on=["instrumental", "voice"])
         
-        # Em uma implementação real, atualizaríamos o status no banco de dados
+        # Analisar ritmo e seções já aqui, para que avatar e filme encontrem o cache pronto
+        pipeline.add("analysis", lambda results: services.music_analyzer.analyze(
+            results["combine"]
+        ), depends_on=["combine"])
+        
+        # Progresso percentual ao iniciar cada etapa
+        stage_progress = {"instrumental": 30, "voice": 30, "combine": 80, "analysis": 90}
+        
+        try:
+            await pipeline.run(
+                on_stage_start=lambda stage: services.status_store.progress(music_id, stage, stage_progress[stage])
+            )
+        finally:
+            services.status_store.record_timings(music_id, pipeline.timings)
+        
+        # Hash do arquivo final para os validadores de cache do servidor de mídia
+        record_media(f"{music_dir}/musica_finalizada.mp3")
+        
+        services.status_store.complete(music_id)
         
     except Exception as e:
-        # Registrar erro e atualizar status
+        # Registrar erro; o status só fica "failed" quando a fila desistir (ver worker.py)
+        services.status_store.retrying(music_id, f"Erro ao gerar música: {str(e)}")
         with open(f"./storage/music/{music_id}/error.log", "w") as f:
             f.write(f"Erro ao gerar música: {str(e)}")
+        
+        # Propagar para que o worker reagende o trabalho
+        raise
@@ -0,0 +1,97 @@
+"""
+Benchmark do alinhamento de letra (services/audio/alignment.py) em um núcleo:
+100 pares de letra com seções e envelope sintético da voz (frases separadas
+por pausas), com separação silábica e keyframes de visemas de cada música.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_alignment.py [--songs 100] [--seconds 180] [--repeat 3]
+"""
+import os
+
+# Um núcleo: BLAS/OpenMP sem threads extras
+for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(variable, "1")
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audio.alignment import ENVELOPE_WINDOW, align_lyrics, lyric_syllables
+
+# Orçamento: 100 músicas de 3 minutos alinhadas em até 1 segundo (escala com --songs)
+TARGET_SECONDS = 1.0
+
+WORDS = (
+    "amor", "coração", "saudade", "poesia", "rainha", "estrela", "noite", "canção", "quando",
+    "água", "praia", "ideia", "pássaro", "chuva", "sonho", "abraço", "planeta", "perfeito",
+    "ainda", "muito", "feliz", "luar", "cidade", "caminho", "tempo", "vida", "mar", "sol"
+)
+SECTIONS = ("[Verso 1]", "[Pré-refrão]", "**REFRÃO:**", "[Verso 2]", "**REFRÃO:**", "[Ponte]", "**REFRÃO:**", "[Final]")
+
+
+def synthetic_song(rng: np.random.Generator, seconds: int):
+    """
+    Letra no formato de LyricsGeneratorService (seções com quatro versos) e
+    envelope RMS da voz: frases de 2 a 4 s com sílabas moduladas, separadas
+    por pausas de 0,2 a 1 s.
+    """
+    lines = []
+    for header in SECTIONS:
+        lines.append(header)
+        for _ in range(4):
+            lines.append(" ".join(rng.choice(WORDS, rng.integers(4, 8))).capitalize())
+        lines.append("")
+    lyrics = "\n".join(lines)
+
+    frame_rate = 1.0 / ENVELOPE_WINDOW
+    envelope = np.zeros(int(seconds * frame_rate), dtype=np.float32)
+    position = int(rng.uniform(1.0, 4.0) * frame_rate)
+    while position < len(envelope):
+        length = int(rng.uniform(2.0, 4.0) * frame_rate)
+        t = np.arange(min(length, len(envelope) - position)) / frame_rate
+        envelope[position:position + len(t)] = rng.uniform(0.2, 0.6) * (0.6 + 0.4 * np.abs(np.sin(2 * np.pi * 2.5 * t)))
+        position += length + int(rng.uniform(0.2, 1.0) * frame_rate)
+    return lyrics, envelope, frame_rate
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--songs", type=int, default=100)
+    parser.add_argument("--seconds", type=int, default=180)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+
+    rng = np.random.default_rng(0)
+    songs = [synthetic_song(rng, args.seconds) for _ in range(args.songs)]
+
+    syllable_timings = []
+    alignment_timings = []
+    for _ in range(args.repeat):
+        started_at = time.perf_counter()
+        syllable_count = sum(len(lyric_syllables(lyrics)) for lyrics, _, _ in songs)
+        syllable_timings.append(time.perf_counter() - started_at)
+
+        started_at = time.perf_counter()
+        keyframe_count = sum(len(align_lyrics(*song)["times"]) for song in songs)
+        alignment_timings.append(time.perf_counter() - started_at)
+
+    best = min(alignment_timings)
+    print(f"{args.songs} músicas de {args.seconds}s: {syllable_count} sílabas, {keyframe_count} keyframes de visemas")
+    print(f"Separação silábica: melhor {min(syllable_timings):.3f}s")
+    print(f"Alinhamento (inclui a separação): melhor {best:.3f}s, "
+          f"mediana {sorted(alignment_timings)[len(alignment_timings) // 2]:.3f}s, "
+          f"{best / args.songs * 1e3:.2f} ms por música")
+    budget = TARGET_SECONDS * args.songs / 100
+    print(f"Meta: {args.songs} músicas em até {budget:.2f}s")
+    return 0 if best <= budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
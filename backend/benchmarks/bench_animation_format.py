@@ -0,0 +1,93 @@
+"""
+Benchmark of the .anim container (services/avatar/animation_format.py) against
+JSON: file size and parse time for a full-song clip with 52 float16 blendshape
+channels and a uint8 viseme channel, as written by AnimationSynchronizerService.
+
+Usage (from backend/):
+    python benchmarks/bench_animation_format.py [--seconds 300] [--fps 30] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.avatar.animation_format import decode_animation, encode_animation, read_animation
+
+BLENDSHAPES = 52
+
+
+def synthetic_channels(frame_count: int, fps: float) -> dict:
+    """
+    Smooth random curves in [0, 1] (one per blendshape) plus a viseme track.
+    """
+    rng = np.random.default_rng(0)
+    times = np.arange(frame_count) / fps
+    channels = {}
+    for index in range(BLENDSHAPES):
+        phase, speed = rng.random(2)
+        channels[f"blendshape_{index:02d}"] = (0.5 + 0.5 * np.sin(2 * np.pi * (speed * times + phase))).astype(np.float16)
+    channels["viseme"] = rng.integers(0, 14, frame_count).astype(np.uint8)
+    return channels
+
+
+def best_of(repeat: int, function) -> float:
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frame_count = int(args.seconds * args.fps)
+    channels = synthetic_channels(frame_count, args.fps)
+    metadata = {"fps": args.fps, "style": "anime"}
+
+    binary = encode_animation(args.fps, channels, metadata)
+    text = json.dumps({
+        "fps": args.fps,
+        "metadata": metadata,
+        "channels": {name: values.tolist() for name, values in channels.items()}
+    }).encode("utf-8")
+
+    def parse_json():
+        # Same end result as the container: one NumPy array per channel
+        document = json.loads(text)
+        return {name: np.asarray(values, dtype=np.float32) for name, values in document["channels"].items()}
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "avatar_animated.anim")
+        with open(path, "wb") as f:
+            f.write(binary)
+
+        encode_time = best_of(args.repeat, lambda: encode_animation(args.fps, channels, metadata))
+        decode_time = best_of(args.repeat, lambda: decode_animation(binary))
+        # Reading from disk includes the mmap and touching every value once
+        read_time = best_of(args.repeat, lambda: [float(values.sum(dtype=np.float32))
+                                                  for values in read_animation(path).channels.values()])
+        dumps_time = best_of(args.repeat, lambda: json.dumps({name: values.tolist() for name, values in channels.items()}))
+        loads_time = best_of(args.repeat, parse_json)
+
+    print(f"Clip: {args.seconds}s at {args.fps:g} fps, {len(channels)} channels, {frame_count} frames")
+    print(f"Size: .anim {len(binary) / 1e6:.2f} MB, JSON {len(text) / 1e6:.2f} MB ({len(text) / len(binary):.1f}x smaller)")
+    print(f"Encode: .anim {encode_time * 1e3:.2f} ms, JSON {dumps_time * 1e3:.1f} ms")
+    print(f"Parse: .anim {decode_time * 1e3:.3f} ms (from disk with a full read: {read_time * 1e3:.2f} ms), "
+          f"JSON {loads_time * 1e3:.1f} ms ({loads_time / decode_time:.0f}x slower)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Benchmark of the avatar GLB export (model_exporter.build_avatar_glb) across the
+four styles: size of the static model against the same geometry stored as
+plain float32 without deduplication, and size and build time with a keyframed
+4-minute animation.
+
+Usage (from backend/):
+    python benchmarks/bench_avatar_glb.py [--seconds 240] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.avatar.animation_format import read_animation, write_animation
+from services.avatar.animation_optimizer import AnimationOptimizerService
+from services.avatar.avatar_geometry import STYLE_PROFILES, avatar_parts, ellipsoid
+from services.avatar.model_exporter import build_avatar_glb
+
+FEATURES = {"skin_tone": "medium", "hair_color": "brown", "eye_color": "blue", "hair_style": "long"}
+
+
+def keyframed_animation(directory: str, seconds: int, fps: float = 30.0):
+    """
+    Dense head bob and body movement curves reduced by the animation optimizer,
+    as the avatar pipeline does before export.
+    """
+    frames = np.arange(int(seconds * fps))
+    dense_path = write_animation(os.path.join(directory, "avatar_animated.anim"), fps, {
+        "head_bob": np.exp(-(frames % 15) / 5.0).astype(np.float16),
+        "body_movement": (0.5 + 0.5 * np.sin(frames / 40.0)).astype(np.float16)
+    })
+    keyframes_path = os.path.join(directory, "avatar_keyframes.anim")
+    optimizer = AnimationOptimizerService()
+    optimizer._optimize_file(dense_path, keyframes_path, optimizer.tolerance)
+    return read_animation(keyframes_path)
+
+
+def float32_bytes(style: str) -> int:
+    """
+    Size of the avatar meshes as float32 positions, normals and texcoords with
+    uint32 indices, one copy per part (no quantization, no deduplication).
+    """
+    total = 0
+    for part in avatar_parts(style, FEATURES):
+        positions, normals, texcoords, indices = ellipsoid(part["radii"], *part["detail"])
+        total += len(positions) * (12 + 12 + 8) + indices.size * 4
+    return total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=240)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        animation = keyframed_animation(directory, args.seconds)
+
+        print(f"{'style':<12}{'static':>10}{'float32':>11}{'ratio':>8}{'animated':>11}{'best':>10}{'median':>10}")
+        for style in STYLE_PROFILES:
+            scene = {"style": style, "features": FEATURES}
+            timings = []
+            for _ in range(args.repeat):
+                started_at = time.perf_counter()
+                data = build_avatar_glb(scene, animation)
+                timings.append(time.perf_counter() - started_at)
+
+            # Geometry and texture only, to compare with the float32 meshes
+            static = len(build_avatar_glb(scene))
+            reference = float32_bytes(style)
+            print(
+                f"{style:<12}{static / 1024:>8.1f}KB{reference / 1024:>9.1f}KB{reference / static:>7.1f}x"
+                f"{len(data) / 1024:>9.1f}KB{min(timings) * 1e3:>8.2f}ms{sorted(timings)[len(timings) // 2] * 1e3:>8.2f}ms"
+            )
+
+        del animation
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
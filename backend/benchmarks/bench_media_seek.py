@@ -0,0 +1,115 @@
+"""
+Benchmark de bytes por seek no servidor de mídia (core/media.py): um player
+que salta para posições aleatórias de um vídeo e pede uma janela com Range,
+comparado ao download progressivo sem Range e à revalidação por ETag (304).
+
+Uso (a partir de backend/):
+    python benchmarks/bench_media_seek.py [--megabytes 200] [--seeks 200] [--window 1048576]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+from fastapi import FastAPI, Request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.media import media_response, record_media
+
+# Bytes lidos do disco pelo fallback os.pread (ver MediaResponse._send_chunks)
+disk_bytes = 0
+_pread = os.pread
+
+
+def _counting_pread(fd: int, length: int, offset: int) -> bytes:
+    global disk_bytes
+    chunk = _pread(fd, length, offset)
+    disk_bytes += len(chunk)
+    return chunk
+
+
+def _wire_bytes(response: httpx.Response) -> int:
+    # Linha de status + cabeçalhos + corpo, como no HTTP/1.1
+    head = len(f"HTTP/1.1 {response.status_code} {response.reason_phrase}\r\n") + 2
+    head += sum(len(name) + len(value) + 4 for name, value in response.headers.raw)
+    return head + len(response.content)
+
+
+def _create_video(path: str, size: int) -> None:
+    rng = np.random.default_rng(0)
+    block = 8 * 1024 * 1024
+    with open(path, "wb") as f:
+        for start in range(0, size, block):
+            f.write(rng.integers(0, 256, min(block, size - start), dtype=np.uint8).tobytes())
+    record_media(path)
+
+
+async def run(path: str, size: int, seeks: int, window: int) -> None:
+    global disk_bytes
+    app = FastAPI()
+
+    @app.get("/film/f1/video")
+    async def video(request: Request):
+        return await media_response(request, path, media_type="video/mp4")
+
+    positions = np.random.default_rng(1).integers(0, size - window, seeks)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://media") as client:
+        first = await client.get("/film/f1/video", headers={"range": f"bytes=0-{window - 1}"})
+        etag = first.headers["etag"]
+
+        disk_bytes = 0
+        wire = 0
+        started_at = time.perf_counter()
+        for position in positions:
+            response = await client.get(
+                "/film/f1/video",
+                headers={"range": f"bytes={position}-{position + window - 1}", "if-range": etag}
+            )
+            assert response.status_code == 206 and len(response.content) == window
+            wire += _wire_bytes(response)
+        elapsed = time.perf_counter() - started_at
+        range_disk = disk_bytes
+
+        disk_bytes = 0
+        revalidations = [
+            await client.get("/film/f1/video", headers={"if-none-match": etag}) for _ in range(seeks)
+        ]
+        assert all(response.status_code == 304 for response in revalidations)
+        revalidation_wire = sum(_wire_bytes(response) for response in revalidations)
+
+    # Sem Range, o player baixa do início até o fim da janela pedida
+    progressive = float(np.mean(positions + window))
+
+    print(f"Arquivo: {size / 2**20:.0f} MiB, {seeks} seeks aleatórios, janela de {window / 2**10:.0f} KiB")
+    print(f"Com Range: {wire / seeks / 2**10:.1f} KiB por seek na rede, "
+          f"{range_disk / seeks / 2**10:.1f} KiB lidos do disco, {elapsed / seeks * 1e3:.2f} ms por seek")
+    print(f"Sem Range (download progressivo): {progressive / 2**20:.1f} MiB por seek "
+          f"({progressive / (wire / seeks):.0f}x mais)")
+    print(f"Revalidação (If-None-Match -> 304): {revalidation_wire / seeks:.0f} bytes, "
+          f"{disk_bytes} bytes lidos do disco")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--megabytes", type=int, default=200)
+    parser.add_argument("--seeks", type=int, default=200)
+    parser.add_argument("--window", type=int, default=1024 * 1024)
+    args = parser.parse_args()
+
+    os.pread = _counting_pread
+    size = args.megabytes * 1024 * 1024
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "filme_final.mp4")
+        _create_video(path, size)
+        asyncio.run(run(path, size, args.seeks, args.window))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
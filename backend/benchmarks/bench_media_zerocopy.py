@@ -0,0 +1,132 @@
+"""
+Benchmark do envio de arquivos de mídia por um socket TCP local, medindo vazão
+e tempo de CPU por GB: MediaResponse (core/media.py, os.pread em blocos), a
+FileResponse do Starlette e os.sendfile, que é o que o proxy reverso faz com
+settings.MEDIA_OFFLOAD (X-Accel-Redirect / X-Sendfile).
+
+Uso (a partir de backend/):
+    python benchmarks/bench_media_zerocopy.py [--megabytes 512] [--repeat 3]
+"""
+import argparse
+import asyncio
+import os
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from starlette.responses import FileResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.media import MediaResponse
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _drain(connection: socket.socket, expected: int) -> None:
+    # Cliente: descarta os bytes recebidos num buffer fixo
+    buffer = bytearray(1024 * 1024)
+    received = 0
+    while received < expected:
+        count = connection.recv_into(buffer)
+        if not count:
+            break
+        received += count
+
+
+def _server_send(sock: socket.socket):
+    # Servidor ASGI mínimo: cada corpo vai para o socket com sendall
+    async def send(message) -> None:
+        if message["type"] == "http.response.body" and message["body"]:
+            sock.sendall(message["body"])
+    return send
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def media_response_sender(sock: socket.socket, path: str, size: int) -> None:
+    response = MediaResponse(path, 200, {"content-type": "video/mp4"}, [(b"", 0, size - 1)])
+    await response({"type": "http", "method": "GET"}, _receive, _server_send(sock))
+
+
+async def file_response_sender(sock: socket.socket, path: str, size: int) -> None:
+    response = FileResponse(path, media_type="video/mp4")
+    await response({"type": "http", "method": "GET", "headers": []}, _receive, _server_send(sock))
+
+
+async def sendfile_sender(sock: socket.socket, path: str, size: int) -> None:
+    # O que o proxy faz com o arquivo indicado por X-Accel-Redirect/X-Sendfile
+    with open(path, "rb") as f:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(sock.fileno(), f.fileno(), offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+
+
+SENDERS = (
+    ("MediaResponse (pread)", media_response_sender),
+    ("FileResponse", file_response_sender),
+    ("sendfile (proxy)", sendfile_sender)
+)
+
+
+def measure(path: str, size: int, sender) -> tuple:
+    listener = socket.create_server(("127.0.0.1", 0))
+    client = socket.create_connection(listener.getsockname())
+    server, _ = listener.accept()
+    listener.close()
+
+    reader = threading.Thread(target=_drain, args=(client, size))
+    reader.start()
+
+    cpu_before = _cpu_seconds()
+    started_at = time.perf_counter()
+    asyncio.run(sender(server, path, size))
+    reader.join()
+    elapsed = time.perf_counter() - started_at
+    cpu = _cpu_seconds() - cpu_before
+
+    server.close()
+    client.close()
+    return elapsed, cpu
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--megabytes", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    size = args.megabytes * 1024 * 1024
+    gigabytes = size / 2**30
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "filme_final.mp4")
+        with open(path, "wb") as f:
+            for _ in range(args.megabytes):
+                f.write(os.urandom(1024 * 1024))
+
+        # Uma leitura completa antes: todas as variantes partem do page cache quente
+        measure(path, size, media_response_sender)
+
+        print(f"Arquivo: {args.megabytes} MiB, melhor de {args.repeat} envios por TCP local "
+              "(CPU inclui o cliente que drena o socket)")
+        for label, sender in SENDERS:
+            results = [measure(path, size, sender) for _ in range(args.repeat)]
+            elapsed = min(result[0] for result in results)
+            cpu = min(result[1] for result in results)
+            print(f"{label:<22} {gigabytes / elapsed:6.2f} GB/s, {cpu / gigabytes:6.3f} s de CPU por GB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem flock (ver AssetCache.materialize)
+    fcntl = None
+
+from core.config import settings
+
+# Marcador de entrada completa; seu mtime registra o último uso (ordem LRU)
+COMPLETE_MARKER = ".complete"
+
+# Arquivo de trava compartilhado por todos os processos que usam o diretório
+LOCK_FILE = ".lock"
+
+
+class AssetCache:
+    """
+    Cache em disco de conjuntos de arquivos gerados (ex.: bases de avatar),
+    endereçado por chave de conteúdo (ver core.cache.make_cache_key).
+    Cada uso cria hardlinks dos arquivos no diretório de destino, sem copiar
+    nem regenerar; o número de links (st_nlink) de cada arquivo funciona como
+    contagem de referências. O tamanho total é limitado por despejo LRU,
+    começando pelas entradas que nenhum destino referencia mais.
+
+    Criar os links de uma entrada exige trava compartilhada e despejar exige
+    trava exclusiva (flock em LOCK_FILE), de modo que nenhum processo ou thread
+    apaga uma entrada enquanto outro a materializa.
+    """
+
+    def __init__(self, namespace: str, max_bytes: Optional[int] = None, directory: Optional[str] = None):
+        self.namespace = namespace
+        self.max_bytes = max_bytes or settings.ASSET_CACHE_MAX_BYTES
+        self.directory = directory or f"{settings.STORAGE_DIR}/cache/assets/{namespace}"
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock_path = os.path.join(self.directory, LOCK_FILE)
+
+        # Tamanho estimado do cache; varrido na primeira inserção deste processo
+        self._bytes: Optional[int] = None
+
+        # Contadores de acerto/erro
+        self.hits = 0
+        self.misses = 0
+
+    def materialize(self, key: str, output_dir: str, build: Callable[[str], None]) -> Dict[str, str]:
+        """
+        Coloca em output_dir os arquivos da entrada key, gerando-os com build(diretório)
+        apenas se ainda não estiverem em cache.
+
+        Returns:
+            Dicionário nome do arquivo -> caminho em output_dir
+        """
+        entry_dir = os.path.join(self.directory, key)
+        os.makedirs(output_dir, exist_ok=True)
+
+        with self._locked():
+            paths = self._link_entry(entry_dir, output_dir)
+        if paths is not None:
+            self.hits += 1
+            return paths
+
+        self.misses += 1
+        temp_dir = self._build(build)
+        try:
+            size = sum(os.path.getsize(os.path.join(temp_dir, name)) for name in self._files(temp_dir))
+            with self._locked():
+                inserted = self._publish(temp_dir, entry_dir)
+                paths = self._link_entry(entry_dir, output_dir)
+            if paths is None:
+                # Só sem flock: a entrada foi despejada no meio dos links; usar uma geração nova
+                return self._move_files(self._build(build), output_dir)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        # Despejar apenas quando uma inserção leva o cache além do limite
+        if inserted:
+            if self._bytes is None:
+                self._bytes = sum(size for _, _, size, _ in self._entries())
+            else:
+                self._bytes += size
+            if self._bytes > self.max_bytes:
+                self.evict()
+
+        return paths
+
+    def references(self, key: str) -> int:
+        """
+        Número de destinos que referenciam a entrada (hardlinks além do próprio cache).
+        """
+        entry_dir = os.path.join(self.directory, key)
+        counts = [
+            os.stat(os.path.join(entry_dir, name)).st_nlink - 1
+            for name in self._files(entry_dir)
+        ]
+        return max(counts, default=0)
+
+    def evict(self) -> None:
+        """
+        Despeja entradas em ordem LRU até o cache ocupar no máximo 90% de
+        max_bytes (a folga evita um novo despejo a cada inserção).
+        Entradas sem referências saem primeiro, pois liberam espaço de fato;
+        as referenciadas apenas deixam o cache (os destinos mantêm seus links).
+        """
+        target = int(self.max_bytes * 0.9)
+        with self._locked(exclusive=True):
+            entries = sorted(self._entries())
+            total = sum(size for _, _, size, _ in entries)
+
+            for referenced, _, size, entry_dir in entries:
+                if total <= target:
+                    break
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
+
+        self._bytes = total
+
+    @contextmanager
+    def _locked(self, exclusive: bool = False) -> Iterator[None]:
+        # Cada abertura é uma descrição de arquivo própria: o flock também
+        # exclui threads do mesmo processo
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def _entries(self) -> List[Tuple[bool, float, int, str]]:
+        # (referenciada, último uso, tamanho, diretório) das entradas completas
+        entries = []
+        for key in os.listdir(self.directory):
+            # Ignorar a trava e as gerações ainda não publicadas (.tmp-*)
+            if key.startswith("."):
+                continue
+            entry_dir = os.path.join(self.directory, key)
+            try:
+                last_used = os.path.getmtime(os.path.join(entry_dir, COMPLETE_MARKER))
+                stats = [os.stat(os.path.join(entry_dir, name)) for name in self._files(entry_dir)]
+            except FileNotFoundError:
+                continue
+            referenced = any(stat.st_nlink > 1 for stat in stats)
+            entries.append((referenced, last_used, sum(stat.st_size for stat in stats), entry_dir))
+        return entries
+
+    def _link_entry(self, entry_dir: str, output_dir: str) -> Optional[Dict[str, str]]:
+        # Links da entrada em output_dir; None se ela não existe (ou sumiu no meio)
+        try:
+            # Registrar o uso para a ordem LRU
+            os.utime(os.path.join(entry_dir, COMPLETE_MARKER))
+            paths = {}
+            for name in os.listdir(entry_dir):
+                if name == COMPLETE_MARKER:
+                    continue
+                target = os.path.join(output_dir, name)
+                self._link(os.path.join(entry_dir, name), target)
+                paths[name] = target
+            return paths
+        except FileNotFoundError:
+            return None
+
+    def _build(self, build: Callable[[str], None]) -> str:
+        # Gerar em diretório temporário: outros processos nunca veem uma entrada parcial
+        temp_dir = os.path.join(self.directory, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(temp_dir)
+        try:
+            build(temp_dir)
+            with open(os.path.join(temp_dir, COMPLETE_MARKER), "w"):
+                pass
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        return temp_dir
+
+    def _publish(self, temp_dir: str, entry_dir: str) -> bool:
+        # Renomear a geração para a entrada; em caso de corrida a primeira vence
+        try:
+            os.rename(temp_dir, entry_dir)
+            return True
+        except OSError:
+            if not os.path.exists(os.path.join(entry_dir, COMPLETE_MARKER)):
+                raise
+            return False
+
+    def _move_files(self, temp_dir: str, output_dir: str) -> Dict[str, str]:
+        try:
+            paths = {}
+            for name in self._files(temp_dir):
+                paths[name] = shutil.move(os.path.join(temp_dir, name), os.path.join(output_dir, name))
+            return paths
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _link(self, source: str, target: str) -> None:
+        if os.path.exists(target):
+            if os.path.samefile(source, target):
+                return
+            os.remove(target)
+        try:
+            os.link(source, target)
+        except OSError:
+            # Sistemas de arquivos sem hardlink (ou outro dispositivo): copiar
+            shutil.copyfile(source, target)
+
+    def _files(self, entry_dir: str) -> List[str]:
+        try:
+            return [name for name in os.listdir(entry_dir) if name != COMPLETE_MARKER]
+        except FileNotFoundError:
+            return []
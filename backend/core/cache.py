@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import settings
+
+
+def _normalize(value: Any) -> Any:
+    """
+    Normaliza um componente da chave: texto em minúsculas, NFC e com espaços
+    colapsados; listas ordenadas, para que variações triviais gerem a mesma chave.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        value = unicodedata.normalize("NFC", value).lower()
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple, set)):
+        return sorted(_normalize(item) for item in value)
+    return value
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Gera uma chave de cache endereçada por conteúdo (SHA-256 dos componentes normalizados).
+    """
+    payload = json.dumps([_normalize(part) for part in parts], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ContentCache:
+    """
+    Cache em duas camadas: LRU em memória com TTL e armazenamento em disco
+    em settings.STORAGE_DIR/cache/{namespace}, compartilhado entre processos.
+    O disco é limitado a max_disk_bytes: acima disso, as entradas expiradas e
+    as menos usadas (mtime, atualizado a cada acerto) são removidas.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        disk_dir: Optional[str] = None,
+        max_disk_bytes: Optional[int] = None
+    ):
+        self.namespace = namespace
+        self.max_entries = max_entries or settings.CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.CACHE_TTL
+        self.disk_dir = disk_dir or f"{settings.STORAGE_DIR}/cache/{namespace}"
+        self.max_disk_bytes = max_disk_bytes or settings.CACHE_DISK_MAX_BYTES
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+
+        # Tamanho em disco estimado por este processo (None: ainda não medido);
+        # a varredura só acontece quando a estimativa passa do limite
+        self._disk_bytes: Optional[int] = None
+
+        # Contadores de acerto/erro
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Retorna o valor armazenado para a chave, ou None se ausente ou expirado.
+        """
+        now = time.time()
+
+        # Camada 1: memória
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            del self._memory[key]
+
+        # Camada 2: disco
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry["expires_at"] > now:
+                self._remember(key, entry["expires_at"], entry["value"])
+                # Registrar o uso para a ordem LRU do disco
+                os.utime(path)
+                self.disk_hits += 1
+                return entry["value"]
+            os.remove(path)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Armazena um valor serializável em JSON nas duas camadas.
+        """
+        expires_at = time.time() + self.ttl
+        self._remember(key, expires_at, value)
+
+        try:
+            path = self._disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            # Escrita atômica para que leitores concorrentes nunca vejam arquivo parcial
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"expires_at": expires_at, "value": value}, f, ensure_ascii=False)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Erro ao gravar cache em disco: {str(e)}")
+            return
+
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+        else:
+            self._disk_bytes += size
+        if self._disk_bytes > self.max_disk_bytes:
+            self.evict_disk()
+
+    def evict_disk(self) -> None:
+        """
+        Remove do disco as entradas expiradas e, em ordem LRU, as demais até o
+        total ficar abaixo de 90% de max_disk_bytes (folga para evitar varrer
+        o diretório a cada gravação).
+        """
+        now = time.time()
+        target = int(self.max_disk_bytes * 0.9)
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, _, size in entries)
+
+        for mtime, path, size in entries:
+            if total <= target and not self._expired(path, now):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.disk_evictions += 1
+
+        self._disk_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores de acerto/erro do cache.
+        """
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "disk_bytes": self._disk_bytes,
+            "disk_evictions": self.disk_evictions
+        }
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_entries(self) -> List[Tuple[float, str, int]]:
+        # (mtime, caminho, tamanho) de cada entrada gravada em disco
+        entries = []
+        try:
+            shards = os.listdir(self.disk_dir)
+        except FileNotFoundError:
+            return entries
+        for shard in shards:
+            shard_dir = os.path.join(self.disk_dir, shard)
+            try:
+                names = os.listdir(shard_dir)
+            except (NotADirectoryError, FileNotFoundError):
+                continue
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(shard_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def _expired(self, path: str, now: float) -> bool:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)["expires_at"] <= now
+        except (OSError, ValueError, KeyError):
+            return True
+
+    def _disk_path(self, key: str) -> str:
+        return f"{self.disk_dir}/{key[:2]}/{key}.json"
@@ -0,0 +1,77 @@
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from core.files import file_sha256
+
+
+class CheckpointManifest:
+    """
+    Manifesto de checkpoints de um pipeline em etapas.
+    Cada etapa concluída registra seu resultado e o SHA-256 dos arquivos gerados;
+    ao retomar, a etapa só é pulada se todos os arquivos existirem e conferirem.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._stages = json.load(f).get("stages", {})
+        except (OSError, ValueError):
+            self._stages = {}
+
+    def get(self, stage: str) -> Optional[Any]:
+        """
+        Retorna o resultado salvo da etapa, ou None se ausente ou se algum
+        arquivo de saída estiver faltando ou alterado.
+        """
+        entry = self._stages.get(stage)
+        if entry is None:
+            return None
+
+        for path, digest in entry["outputs"].items():
+            try:
+                if file_sha256(path) != digest:
+                    return None
+            except OSError:
+                return None
+
+        return entry["result"]
+
+    def save(self, stage: str, result: Any, outputs: Iterable[str] = ()) -> None:
+        """
+        Registra a etapa como concluída, com o hash de cada arquivo de saída.
+        """
+        self._stages[stage] = {
+            "result": result,
+            "outputs": {path: file_sha256(path) for path in outputs if path},
+            "completed_at": time.time()
+        }
+        self._flush()
+
+    def invalidate(self, *stages: str) -> None:
+        """
+        Remove os checkpoints das etapas informadas (e de suas subetapas "etapa/...").
+        """
+        for key in list(self._stages):
+            if any(key == stage or key.startswith(f"{stage}/") for stage in stages):
+                del self._stages[key]
+        self._flush()
+
+    def reset(self) -> None:
+        """
+        Descarta todos os checkpoints.
+        """
+        self._stages = {}
+        self._flush()
+
+    def _flush(self) -> None:
+        # Escrita atômica: um crash no meio da gravação não corrompe o manifesto
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"stages": self._stages}, f)
+        os.replace(temp_path, self.path)
@@ -1,5 +1,8 @@
 import os
-from pydantic import BaseSettings
+try:
+    from pydantic_settings import BaseSettings
+except ImportError:  # pydantic 1.x
+    from pydantic import BaseSettings
 
 class Settings(BaseSettings):
     # Informações da aplicação
@@ -15,10 +18,105 @@ class Settings(BaseSettings):
     MUSIC_DIR: str = "./storage/music"
     TEMP_DIR: str = "./storage/temp"
     
+    # Uploads
+    UPLOAD_MAX_BYTES: int = 50 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    
+    # Áudio (mixagem)
+    AUDIO_SAMPLE_RATE: int = 44100
+    AUDIO_BLOCK_SIZE: int = 65536
+    AUDIO_BITRATE: str = "192k"
+    ANALYSIS_SAMPLE_RATE: int = 22050
+    
+    # Animação (erro máximo absoluto por canal na redução de keyframes)
+    ANIMATION_TOLERANCE: float = 0.01
+    
+    # Exportação de avatares (processos em paralelo, um por formato)
+    EXPORT_WORKERS: int = 3
+    
+    # Lotes de avatares (itens por requisição)
+    AVATAR_BATCH_MAX_ITEMS: int = 50
+    
+    # Servidor de mídia (cache de metadados e requisições por intervalo)
+    MEDIA_METADATA_TTL: float = 5.0
+    MEDIA_METADATA_CACHE_SIZE: int = 1024
+    MEDIA_MAX_RANGES: int = 16
+    MEDIA_CHUNK_SIZE: int = 512 * 1024
+    # Envio dos bytes pelo proxy reverso (sendfile no proxy, sem passar pelo Python):
+    # "" = a aplicação envia com os.pread; "x-accel-redirect" = nginx, com uma
+    # location interna em MEDIA_OFFLOAD_PREFIX apontando para STORAGE_DIR, ex.:
+    #     location /protected-media/ { internal; alias /srv/twinverse/storage/; }
+    # "x-sendfile" = Apache (mod_xsendfile) ou lighttpd, com o caminho absoluto.
+    # Validação (ETag/304) continua na aplicação; Range fica a cargo do proxy.
+    MEDIA_OFFLOAD: str = ""
+    MEDIA_OFFLOAD_PREFIX: str = "/protected-media/"
+    
+    # Empacotamento HLS (segmentos fMP4, da maior para a menor rendition)
+    HLS_SEGMENT_DURATION: float = 4.0
+    HLS_RENDITIONS: list = [
+        {"name": "1080p", "height": 1080, "video_bitrate": "5000k", "audio_bitrate": "192k"},
+        {"name": "720p", "height": 720, "video_bitrate": "2800k", "audio_bitrate": "128k"},
+        {"name": "480p", "height": 480, "video_bitrate": "1400k", "audio_bitrate": "96k"},
+        {"name": "360p", "height": 360, "video_bitrate": "800k", "audio_bitrate": "64k"}
+    ]
+    
     # Chaves de API (em produção, usar variáveis de ambiente)
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     SUNO_API_KEY: str = os.getenv("SUNO_API_KEY", "")
     ELEVENLABS_API_KEY: str = os.getenv("ELEVENLABS_API_KEY", "")
+    READY_PLAYER_ME_API_KEY: str = os.getenv("READY_PLAYER_ME_API_KEY", "")
+    RUNWAY_API_KEY: str = os.getenv("RUNWAY_API_KEY", "")
+    
+    # Cliente LLM (OpenAI)
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")
+    LLM_MODEL: str = "gpt-4o"
+    LLM_TIMEOUT: float = 60.0
+    LLM_CONNECT_TIMEOUT: float = 10.0
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_MAX_RETRIES: int = 2
+    
+    # Cache de interpretações e letras
+    CACHE_TTL: int = 7 * 24 * 3600
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_DISK_MAX_BYTES: int = 64 * 1024 * 1024
+    ASSET_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    
+    # Fila de trabalhos e workers
+    JOB_QUEUE_BACKEND: str = "sqlite"
+    JOB_QUEUE_PATH: str = "./storage/jobs.db"
+    JOB_VISIBILITY_TIMEOUT: float = 300.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 5.0
+    JOB_MAX_RETRY_BACKOFF: float = 300.0
+    WORKER_POLL_INTERVAL: float = 1.0
+    WORKER_CONCURRENCY: dict = {"music": 2, "avatar": 2, "avatar_batch": 1, "film": 1, "publication": 4}
+    
+    # Índice de status dos trabalhos
+    STATUS_DB_PATH: str = "./storage/status.db"
+    
+    # Geração de cenas de vídeo
+    VIDEO_BACKEND: str = "runway"  # runway (remoto) ou local
+    VIDEO_MAX_CONCURRENCY: int = 4
+    VIDEO_LOCAL_WORKERS: int = 2
+    VIDEO_SCENE_MAX_ATTEMPTS: int = 2
+    
+    # Edição do filme (perfil fixo dos segmentos, concatenados sem recodificar)
+    FILM_RESOLUTION: str = "1920x1080"
+    FILM_FPS: int = 30
+    FILM_VIDEO_CRF: int = 20
+    EDIT_MAX_CONCURRENCY: int = 2
+    
+    # Linha do tempo do filme (cenas alinhadas aos compassos da música)
+    FILM_BEATS_PER_BAR: int = 4
+    FILM_SECTION_SNAP_BARS: int = 2
+    FILM_DEFAULT_DURATION: float = 120.0  # música sem análise
+    
+    # Eventos de progresso (Server-Sent Events)
+    EVENTS_POLL_INTERVAL: float = 0.25
+    EVENTS_QUEUE_SIZE: int = 64
+    EVENTS_KEEPALIVE: float = 15.0
+    EVENTS_RETENTION: float = 3600.0
     
     # Configurações de CORS
     CORS_ORIGINS: list = ["*"]
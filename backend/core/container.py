@@ -0,0 +1,107 @@
+from fastapi import Request
+
+from core.asset_cache import AssetCache
+from core.cache import ContentCache
+from core.events import EventBroker
+from core.job_queue import create_job_queue
+from core.llm_client import LLMClient
+from core.status_store import StatusStore
+
+# Serviços de música
+from services.phrase_interpreter import PhraseInterpreterService
+from services.lyrics_generator import LyricsGeneratorService
+from services.music_generator import MusicGeneratorService
+from services.music_analyzer import MusicAnalyzerService
+from services.voice_processor import VoiceProcessorService
+from services.stream_packager import StreamPackagerService
+
+# Serviços de avatar
+from services.avatar.visual_processor import VisualProcessorService
+from services.avatar.avatar_creator import AvatarCreatorService
+from services.avatar.animation_synchronizer import AnimationSynchronizerService
+from services.avatar.animation_optimizer import AnimationOptimizerService
+from services.avatar.model_exporter import ModelExporterService
+
+# Serviços de filme
+from services.film.screenplay_generator import ScreenplayGeneratorService
+from services.film.storyboard_creator import StoryboardCreatorService
+from services.film.timeline_planner import TimelinePlannerService
+from services.film.video_generator import VideoGeneratorService
+from services.film.video_editor import VideoEditorService
+
+# Serviços de publicação
+from services.publication.page_template import PageTemplateService
+from services.publication.asset_compiler import AssetCompilerService
+from services.publication.url_generator import URLGeneratorService
+from services.publication.sharing_integration import SharingIntegrationService
+from services.publication.playback_metrics import PlaybackMetricsService
+
+
+class ServiceContainer:
+    """
+    Contêiner de serviços com ciclo de vida da aplicação.
+    Cria cada serviço uma única vez por processo e compartilha entre eles
+    os recursos caros, como o pool de conexões do cliente LLM.
+    """
+
+    def __init__(self):
+        # Recursos compartilhados
+        self.llm_client = LLMClient()
+        self.interpretation_cache = ContentCache("interpretation")
+        self.lyrics_cache = ContentCache("lyrics")
+        self.avatar_base_cache = AssetCache("avatar_base")
+        self.job_queue = create_job_queue()
+        self.status_store = StatusStore()
+        self.event_broker = EventBroker(self.status_store)
+
+        # Música
+        self.phrase_interpreter = PhraseInterpreterService(self.llm_client, self.interpretation_cache)
+        self.lyrics_generator = LyricsGeneratorService(self.llm_client, self.lyrics_cache)
+        self.music_generator = MusicGeneratorService()
+        self.music_analyzer = MusicAnalyzerService()
+        self.voice_processor = VoiceProcessorService()
+        self.stream_packager = StreamPackagerService()
+
+        # Avatar
+        self.visual_processor = VisualProcessorService()
+        self.avatar_creator = AvatarCreatorService(self.avatar_base_cache)
+        self.animation_synchronizer = AnimationSynchronizerService(self.music_analyzer)
+        self.animation_optimizer = AnimationOptimizerService()
+        self.model_exporter = ModelExporterService()
+
+        # Filme
+        self.screenplay_generator = ScreenplayGeneratorService(self.llm_client)
+        self.storyboard_creator = StoryboardCreatorService()
+        self.timeline_planner = TimelinePlannerService(self.music_analyzer)
+        self.video_generator = VideoGeneratorService()
+        self.video_editor = VideoEditorService()
+
+        # Publicação
+        self.asset_compiler = AssetCompilerService()
+        self.page_template = PageTemplateService()
+        self.url_generator = URLGeneratorService()
+        self.sharing_integration = SharingIntegrationService()
+        self.playback_metrics = PlaybackMetricsService()
+
+    async def start(self) -> None:
+        """
+        Inicia as tarefas de fundo do processo da API (distribuição de eventos).
+        """
+        await self.event_broker.start()
+
+    async def aclose(self) -> None:
+        """
+        Libera os recursos compartilhados (pools HTTP, tarefas de fundo).
+        """
+        await self.event_broker.stop()
+        await self.llm_client.aclose()
+        self.video_generator.close()
+        self.model_exporter.close()
+        self.status_store.close()
+
+
+def get_services(request: Request) -> ServiceContainer:
+    """
+    Dependência FastAPI que retorna o contêiner criado no lifespan da aplicação.
+    """
+    return request.app.state.services
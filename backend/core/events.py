@@ -0,0 +1,146 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional, Set
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from core.config import settings
+from core.status_store import StatusStore
+
+# Estados finais: o stream é encerrado após enviá-los
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class EventBroker:
+    """
+    Pub/sub em processo para eventos de progresso dos trabalhos.
+    Uma única tarefa lê o log de transições do StatusStore (escrito pelos workers)
+    e distribui cada evento para todos os assinantes daquele ID, de modo que o
+    custo de leitura não cresce com o número de conexões abertas.
+    """
+
+    def __init__(
+        self,
+        status_store: StatusStore,
+        poll_interval: Optional[float] = None,
+        queue_size: Optional[int] = None
+    ):
+        self.status_store = status_store
+        self.poll_interval = poll_interval or settings.EVENTS_POLL_INTERVAL
+        self.queue_size = queue_size or settings.EVENTS_QUEUE_SIZE
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """
+        Inicia a tarefa de leitura do log de transições.
+        """
+        self._cursor = self.status_store.last_event_seq()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """
+        Registra um assinante para os eventos de um trabalho.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[job_id]
+
+    def publish(self, job_id: str, event: Dict[str, Any]) -> None:
+        """
+        Entrega um evento a todos os assinantes do trabalho.
+        Assinantes lentos perdem os eventos mais antigos, nunca o mais recente.
+        """
+        for queue in self._subscribers.get(job_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def _run(self) -> None:
+        ticks = 0
+        while True:
+            try:
+                if self._subscribers:
+                    events = self.status_store.events_since(self._cursor)
+                    for seq, job_id, event in events:
+                        self._cursor = seq
+                        self.publish(job_id, event)
+                else:
+                    # Sem assinantes: apenas avançar o cursor
+                    self._cursor = self.status_store.last_event_seq()
+
+                # Limpeza periódica do log de transições
+                ticks += 1
+                if ticks * self.poll_interval >= settings.EVENTS_RETENTION / 10:
+                    ticks = 0
+                    self.status_store.prune_events(settings.EVENTS_RETENTION)
+            except Exception as e:
+                print(f"Erro ao ler eventos de progresso: {str(e)}")
+
+            await asyncio.sleep(self.poll_interval)
+
+
+def _format_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _event_stream(broker: EventBroker, job_id: str, request: Request):
+    queue = broker.subscribe(job_id)
+    try:
+        # Estado atual primeiro, para que o cliente não dependa de uma consulta separada
+        status = broker.status_store.get(job_id)
+        yield _format_event("status", status)
+        if status["status"] in TERMINAL_STATUSES:
+            return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_KEEPALIVE)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                # Comentário SSE para manter a conexão aberta em proxies
+                yield ": keepalive\n\n"
+                continue
+
+            yield _format_event("status", event)
+            if event["status"] in TERMINAL_STATUSES:
+                return
+    finally:
+        broker.unsubscribe(job_id, queue)
+
+
+def event_stream_response(broker: EventBroker, job_id: str, request: Request) -> StreamingResponse:
+    """
+    Cria a resposta Server-Sent Events com as transições de etapa e progresso de um trabalho.
+    """
+    if broker.status_store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return StreamingResponse(
+        _event_stream(broker, job_id, request),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -0,0 +1,38 @@
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Tamanho dos blocos de leitura ao calcular hashes de arquivos
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """
+    Calcula o SHA-256 de um arquivo lendo em blocos (memória constante).
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "wb"):
+    """
+    Abre um arquivo temporário no mesmo diretório de path e o renomeia para path
+    ao final, de modo que leitores nunca vejam um arquivo escrito pela metade.
+    Em caso de erro, o temporário é removido e o destino fica intacto.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -0,0 +1,270 @@
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing
+from typing import Any, Callable, Dict, Optional
+
+from core.config import settings
+
+
+class JobQueue(ABC):
+    """
+    Interface da fila de trabalhos de geração.
+    A API apenas enfileira; processos worker reservam, executam e confirmam.
+    Backends incompletos falham já ao serem instanciados.
+    """
+
+    # Chamado com o trabalho ({id, stage, payload, error}) quando a fila desiste
+    # dele: tentativas esgotadas num nack ou worker morto na última tentativa
+    on_give_up: Optional[Callable[[Dict[str, Any]], None]] = None
+
+    @abstractmethod
+    def enqueue(self, stage: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> str:
+        """
+        Enfileira um trabalho para a etapa informada e retorna seu ID.
+        """
+
+    @abstractmethod
+    def reserve(self, stage: str) -> Optional[Dict[str, Any]]:
+        """
+        Reserva o próximo trabalho disponível da etapa, tornando-o invisível
+        para outros workers até o fim do visibility timeout.
+        O trabalho retornado traz um "lease" que identifica esta reserva; as
+        operações seguintes só têm efeito enquanto ela não for retomada por
+        outro worker (visibility timeout expirado).
+        """
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, lease: str) -> bool:
+        """
+        Estende o visibility timeout de um trabalho em execução.
+        Retorna False se a reserva foi perdida.
+        """
+
+    @abstractmethod
+    def ack(self, job_id: str, lease: str) -> bool:
+        """
+        Marca o trabalho como concluído. Retorna False se a reserva foi perdida.
+        """
+
+    @abstractmethod
+    def nack(self, job_id: str, lease: str, error: str) -> Optional[str]:
+        """
+        Registra uma falha: reagenda com backoff exponencial ou marca como falho
+        quando as tentativas se esgotam.
+        Retorna o novo estado ("queued" ou "failed"), ou None se a reserva foi perdida.
+        """
+
+    @abstractmethod
+    def release(self, job_id: str, lease: str) -> bool:
+        """
+        Devolve um trabalho à fila sem consumir tentativa (ex.: worker encerrando).
+        Retorna False se a reserva foi perdida.
+        """
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Implementação local da fila sobre SQLite (modo WAL).
+    Durável entre reinicializações e compartilhada por vários processos na mesma máquina.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        visibility_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        max_retry_backoff: Optional[float] = None
+    ):
+        self.path = path or settings.JOB_QUEUE_PATH
+        self.visibility_timeout = visibility_timeout or settings.JOB_VISIBILITY_TIMEOUT
+        self.max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+        self.retry_backoff = retry_backoff or settings.JOB_RETRY_BACKOFF
+        self.max_retry_backoff = max_retry_backoff or settings.JOB_MAX_RETRY_BACKOFF
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    stage TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    available_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    last_error TEXT,
+                    lease TEXT
+                )
+            """)
+            # Filas criadas antes da coluna de reserva
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "lease" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease TEXT")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (stage, status, available_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # Conexão por operação: segura entre threads e processos
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def enqueue(self, stage: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> str:
+        job_id = f"job_{stage}_{os.urandom(8).hex()}"
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, stage, payload, status, attempts, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', 0, ?, ?, ?, ?)",
+                (job_id, stage, json.dumps(payload), max_attempts or self.max_attempts, now, now, now)
+            )
+        return job_id
+
+    def reserve(self, stage: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            while True:
+                now = time.time()
+                conn.execute("BEGIN IMMEDIATE")
+
+                # Trabalhos na fila, ou em execução cujo visibility timeout expirou
+                row = conn.execute(
+                    "SELECT id, payload, attempts, max_attempts FROM jobs "
+                    "WHERE stage = ? AND status IN ('queued', 'running') AND available_at <= ? "
+                    "ORDER BY available_at LIMIT 1",
+                    (stage, now)
+                ).fetchone()
+
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                job_id, payload, attempts, max_attempts = row
+
+                # Worker morreu na última tentativa permitida
+                if attempts >= max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', lease = NULL, updated_at = ?, "
+                        "last_error = COALESCE(last_error, 'Visibility timeout expired') WHERE id = ?",
+                        (now, job_id)
+                    )
+                    error = conn.execute("SELECT last_error FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+                    conn.execute("COMMIT")
+                    self._give_up(job_id, stage, payload, error)
+                    continue
+
+                # Nova reserva: invalida a do worker anterior, se o timeout expirou
+                lease = os.urandom(8).hex()
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, available_at = ?, updated_at = ?, "
+                    "lease = ? WHERE id = ?",
+                    (now + self.visibility_timeout, now, lease, job_id)
+                )
+                conn.execute("COMMIT")
+
+                return {
+                    "id": job_id,
+                    "stage": stage,
+                    "payload": json.loads(payload),
+                    "attempts": attempts + 1,
+                    "lease": lease
+                }
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id: str, lease: str) -> bool:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET available_at = ?, updated_at = ? WHERE id = ? AND lease = ? AND status = 'running'",
+                (now + self.visibility_timeout, now, job_id, lease)
+            )
+        return cursor.rowcount == 1
+
+    def ack(self, job_id: str, lease: str) -> bool:
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', lease = NULL, updated_at = ? "
+                "WHERE id = ? AND lease = ? AND status = 'running'",
+                (time.time(), job_id, lease)
+            )
+        return cursor.rowcount == 1
+
+    def nack(self, job_id: str, lease: str, error: str) -> Optional[str]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT stage, payload, attempts, max_attempts FROM jobs "
+                "WHERE id = ? AND lease = ? AND status = 'running'",
+                (job_id, lease)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            stage, payload, attempts, max_attempts = row
+            if attempts >= max_attempts:
+                status = "failed"
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', lease = NULL, last_error = ?, updated_at = ? WHERE id = ?",
+                    (error, now, job_id)
+                )
+            else:
+                status = "queued"
+                delay = min(self.retry_backoff * (2 ** (attempts - 1)), self.max_retry_backoff)
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', lease = NULL, available_at = ?, last_error = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (now + delay, error, now, job_id)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        if status == "failed":
+            self._give_up(job_id, stage, payload, error)
+        return status
+
+    def release(self, job_id: str, lease: str) -> bool:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', lease = NULL, attempts = MAX(attempts - 1, 0), available_at = ?, "
+                "updated_at = ? WHERE id = ? AND lease = ? AND status = 'running'",
+                (now, now, job_id, lease)
+            )
+        return cursor.rowcount == 1
+
+
+    def _give_up(self, job_id: str, stage: str, payload: str, error: Optional[str]) -> None:
+        if self.on_give_up is None:
+            return
+        try:
+            self.on_give_up({"id": job_id, "stage": stage, "payload": json.loads(payload), "error": error})
+        except Exception as e:
+            print(f"Erro ao registrar desistência do trabalho {job_id}: {str(e)}")
+
+
+def create_job_queue() -> JobQueue:
+    """
+    Cria a fila configurada em settings.JOB_QUEUE_BACKEND.
+    """
+    if settings.JOB_QUEUE_BACKEND == "sqlite":
+        return SQLiteJobQueue()
+    raise ValueError(f"Backend de fila desconhecido: {settings.JOB_QUEUE_BACKEND}")
@@ -0,0 +1,99 @@
+import asyncio
+from typing import Dict, List, Optional
+
+import httpx
+import openai
+
+from core.config import settings
+
+
+class LLMClient:
+    """
+    Cliente assíncrono compartilhado para chamadas à API da OpenAI.
+    Usa um pool de conexões HTTP limitado, timeout por chamada e permite
+    cancelamento, sem bloquear o event loop do servidor.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        max_retries: Optional[int] = None
+    ):
+        self.timeout = timeout or settings.LLM_TIMEOUT
+
+        # Pool HTTP limitado, reaproveitado por todas as chamadas
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections or settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=max_keepalive_connections or settings.LLM_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=settings.LLM_CONNECT_TIMEOUT)
+        )
+
+        self.client = openai.AsyncOpenAI(
+            api_key=api_key if api_key is not None else settings.OPENAI_API_KEY,
+            base_url=base_url or settings.OPENAI_BASE_URL or None,
+            max_retries=max_retries if max_retries is not None else settings.LLM_MAX_RETRIES,
+            http_client=self.http_client
+        )
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        response_format: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Executa uma chamada de chat completion e retorna o conteúdo da resposta.
+
+        Args:
+            messages: Mensagens da conversa (role/content)
+            model: Modelo a ser usado (padrão: settings.LLM_MODEL)
+            response_format: Formato de resposta (ex.: {"type": "json_object"})
+            timeout: Timeout total da chamada em segundos (padrão: settings.LLM_TIMEOUT)
+
+        Returns:
+            Conteúdo textual da primeira escolha
+
+        Raises:
+            asyncio.TimeoutError: Se a chamada exceder o timeout
+        """
+        kwargs = {
+            "model": model or settings.LLM_MODEL,
+            "messages": messages
+        }
+        if response_format:
+            kwargs["response_format"] = response_format
+
+        # wait_for cancela a requisição em andamento ao estourar o timeout,
+        # e um cancelamento externo (ex.: cliente desconectado) se propaga normalmente
+        response = await asyncio.wait_for(
+            self.client.chat.completions.create(**kwargs),
+            timeout=timeout or self.timeout
+        )
+
+        return response.choices[0].message.content
+
+    async def aclose(self) -> None:
+        """
+        Fecha o pool de conexões HTTP.
+        """
+        await self.http_client.aclose()
+
+
+# Instância compartilhada, criada sob demanda
+_llm_client: Optional[LLMClient] = None
+
+def get_llm_client() -> LLMClient:
+    """
+    Retorna o cliente LLM compartilhado pelo processo.
+    """
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = LLMClient()
+    return _llm_client
@@ -0,0 +1,395 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import HTTPException, Request
+from starlette.responses import Response
+
+from core.config import settings
+from core.files import atomic_write, file_sha256
+
+# As URLs de mídia são estáveis (/film/{id}/video, .../hls/master.m3u8) e uma nova
+# geração regrava o mesmo caminho: o cliente guarda a resposta, mas sempre revalida
+# pelo ETag (304 sem corpo quando nada mudou)
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Arquivos em caminhos endereçados pelo conteúdo (ex.: hls/<digest>/...) nunca
+# mudam sob a mesma URL: o cliente guarda sem revalidar
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Cabeçalho que entrega o envio do arquivo ao proxy reverso (settings.MEDIA_OFFLOAD)
+OFFLOAD_HEADERS = {"x-accel-redirect": "X-Accel-Redirect", "x-sendfile": "X-Sendfile"}
+
+
+def _sidecar_path(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.media.json")
+
+
+def record_media(*paths: str) -> None:
+    """
+    Registra o SHA-256, o tamanho e o mtime de arquivos finalizados num arquivo
+    auxiliar ao lado de cada um (".<nome>.media.json"). Chamado ao fim da geração,
+    para que o servidor de mídia tenha ETags fortes sem reler os arquivos.
+    Caminhos inexistentes são ignorados.
+    """
+    for path in paths:
+        if not path or not os.path.exists(path):
+            continue
+        stat = os.stat(path)
+        with atomic_write(_sidecar_path(path), "w") as f:
+            json.dump({
+                "sha256": file_sha256(path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns
+            }, f)
+
+
+class MediaMetadataCache:
+    """
+    Cache LRU em memória dos metadados de mídia (tamanho, mtime, ETag).
+    Entradas são confiáveis por settings.MEDIA_METADATA_TTL segundos; depois
+    disso um único stat revalida a entrada, e o hash só é recalculado se o
+    arquivo mudou.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_entries = max_entries or settings.MEDIA_METADATA_CACHE_SIZE
+        self.ttl = ttl if ttl is not None else settings.MEDIA_METADATA_TTL
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna os metadados do arquivo, ou None se ele não existir.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(path)
+                return entry[1]
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(path, None)
+            return None
+
+        if entry is not None and (entry[1]["size"], entry[1]["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            info = entry[1]
+        else:
+            info = self._load(path, stat)
+
+        with self._lock:
+            self._entries[path] = (now, info)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return info
+
+    def _load(self, path: str, stat: os.stat_result) -> Dict[str, Any]:
+        # Hash registrado na geração, se ainda corresponder ao arquivo
+        try:
+            with open(_sidecar_path(path), "r", encoding="utf-8") as f:
+                recorded = json.load(f)
+            if (recorded["size"], recorded["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                digest = recorded["sha256"]
+            else:
+                digest = file_sha256(path)
+        except (OSError, ValueError, KeyError):
+            digest = file_sha256(path)
+
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "etag": f'"{digest}"',
+            "last_modified": formatdate(stat.st_mtime, usegmt=True)
+        }
+
+
+# Instância por processo, compartilhada por todas as rotas de mídia
+metadata_cache = MediaMetadataCache()
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Interpreta um cabeçalho Range de bytes.
+
+    Returns:
+        Lista de intervalos (início, fim inclusivo) ordenados e mesclados;
+        lista vazia se nenhum intervalo for satisfazível (416); None se o
+        cabeçalho estiver ausente, for inválido ou pedir intervalos demais,
+        casos em que o arquivo inteiro é enviado
+    """
+    if not header:
+        return None
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs.strip():
+        return None
+
+    ranges = []
+    for spec in specs.split(","):
+        first, dash, last = spec.strip().partition("-")
+        if not dash:
+            return None
+        try:
+            if first:
+                start = int(first)
+                end = int(last) if last else size - 1
+                if last and end < start:
+                    return None
+            else:
+                # Sufixo: os últimos N bytes
+                length = int(last)
+                start, end = max(size - length, 0), size - 1
+                if length == 0:
+                    continue
+        except ValueError:
+            return None
+        if start < size:
+            ranges.append((start, min(end, size - 1)))
+
+    # Mesclar intervalos sobrepostos ou adjacentes
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    if len(merged) > settings.MEDIA_MAX_RANGES:
+        return None
+    return merged
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    # Comparação de ETags: fraca para If-None-Match, forte para If-Range
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _parse_date(value: str) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _not_modified(request: Request, info: Dict[str, Any]) -> bool:
+    # If-None-Match tem precedência; If-Modified-Since só vale sem ele
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, info["etag"], weak=True)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        since = _parse_date(if_modified_since)
+        return since is not None and int(info["mtime_ns"] // 1_000_000_000) <= since
+    return False
+
+
+def _range_applies(request: Request, info: Dict[str, Any]) -> bool:
+    # If-Range: o intervalo só vale se o cliente tiver a mesma versão do arquivo
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return _etag_matches(if_range, info["etag"], weak=False)
+    return if_range == info["last_modified"]
+
+
+class MediaResponse(Response):
+    """
+    Resposta que envia um arquivo inteiro, um intervalo (206) ou vários
+    intervalos como multipart/byteranges, lendo só os bytes pedidos com
+    os.pread em blocos de settings.MEDIA_CHUNK_SIZE. Atrás de um proxy com
+    settings.MEDIA_OFFLOAD, media_response nem chega a usá-la.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        status_code: int,
+        headers: Dict[str, str],
+        parts: List[Tuple[bytes, int, int]],
+        closing: bytes = b""
+    ):
+        headers["content-length"] = str(sum(len(head) + end - start + 1 for head, start, end in parts) + len(closing))
+        super().__init__(status_code=status_code, headers=headers)
+        self.path = path
+        self.parts = parts
+        self.closing = closing
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD" or not self.parts:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        f = await anyio.to_thread.run_sync(open, self.path, "rb", 0)
+        try:
+            for head, start, end in self.parts:
+                if head:
+                    await send({"type": "http.response.body", "body": head, "more_body": True})
+                await self._send_chunks(send, f.fileno(), start, end)
+            await send({"type": "http.response.body", "body": self.closing, "more_body": False})
+        finally:
+            await anyio.to_thread.run_sync(f.close)
+
+    async def _send_chunks(self, send, fd: int, start: int, end: int) -> None:
+        # os.pread não move a posição do arquivo: um bloco por chamada, sem seek
+        chunk_size = settings.MEDIA_CHUNK_SIZE
+        offset = start
+        while offset <= end:
+            chunk = await anyio.to_thread.run_sync(os.pread, fd, min(chunk_size, end - offset + 1), offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+
+def _offload_header(path: str) -> Optional[Tuple[str, str]]:
+    """
+    Cabeçalho que entrega o arquivo ao proxy (settings.MEDIA_OFFLOAD), ou None
+    quando a própria aplicação deve enviá-lo: sem proxy configurado ou com o
+    arquivo fora de settings.STORAGE_DIR.
+    """
+    header = OFFLOAD_HEADERS.get(settings.MEDIA_OFFLOAD.lower())
+    if header is None:
+        return None
+
+    root = os.path.realpath(settings.STORAGE_DIR)
+    path = os.path.realpath(path)
+    if not path.startswith(root + os.sep):
+        return None
+
+    if header == "X-Sendfile":
+        return header, path
+    # URI interna do nginx: prefixo da location + caminho relativo a STORAGE_DIR
+    relative = os.path.relpath(path, root).replace(os.sep, "/")
+    return header, settings.MEDIA_OFFLOAD_PREFIX.rstrip("/") + "/" + quote(relative)
+
+
+async def media_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    filename: Optional[str] = None,
+    not_found: str = "File not found",
+    cache_control: str = REVALIDATE_CACHE_CONTROL
+) -> Response:
+    """
+    Serve um arquivo de mídia com validadores de cache e requisições condicionais
+    e por intervalo: 304 para If-None-Match/If-Modified-Since, 206 para Range
+    (respeitando If-Range) e 416 para intervalos fora do arquivo.
+    Por padrão a resposta exige revalidação (ver REVALIDATE_CACHE_CONTROL); só
+    caminhos endereçados pelo conteúdo devem usar IMMUTABLE_CACHE_CONTROL.
+    Com settings.MEDIA_OFFLOAD, a validação continua aqui e o envio dos bytes
+    (inteiro ou por intervalo) fica com o proxy.
+    Arquivos com hash registrado na geração (record_media) têm o ETag sem
+    reler o arquivo.
+    """
+    # Stat e, se preciso, hash fora do event loop
+    info = await anyio.to_thread.run_sync(metadata_cache.get, path)
+    if info is None:
+        raise HTTPException(status_code=404, detail=not_found)
+
+    headers = {
+        "etag": info["etag"],
+        "last-modified": info["last_modified"],
+        "cache-control": cache_control,
+        "accept-ranges": "bytes"
+    }
+
+    if _not_modified(request, info):
+        return Response(status_code=304, headers=headers)
+
+    if filename:
+        headers["content-disposition"] = f'attachment; filename="{filename}"'
+
+    # Atrás do proxy: só os cabeçalhos; o proxy envia o arquivo e atende Range
+    offload = _offload_header(path)
+    if offload:
+        headers["content-type"] = media_type
+        headers[offload[0]] = offload[1]
+        return Response(status_code=200, headers=headers)
+
+    size = info["size"]
+    ranges = parse_range(request.headers.get("range"), size) if _range_applies(request, info) else None
+
+    if ranges is None:
+        headers["content-type"] = media_type
+        return MediaResponse(path, 200, headers, [(b"", 0, size - 1)] if size else [])
+
+    if not ranges:
+        headers["content-range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["content-type"] = media_type
+        headers["content-range"] = f"bytes {start}-{end}/{size}"
+        return MediaResponse(path, 206, headers, [(b"", start, end)])
+
+    # Vários intervalos: multipart/byteranges, cada parte com seu Content-Range
+    boundary = os.urandom(12).hex()
+    headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+    parts = [
+        (
+            f"\r\n--{boundary}\r\nContent-Type: {media_type}\r\nContent-Range: bytes {start}-{end}/{size}\r\n\r\n".encode(),
+            start,
+            end
+        )
+        for start, end in ranges
+    ]
+    return MediaResponse(path, 206, headers, parts, f"\r\n--{boundary}--\r\n".encode())
+
+
+async def package_file_response(
+    request: Request,
+    package_dir: str,
+    relative_path: str,
+    media_types: Dict[str, str],
+    not_found: str = "File not found",
+    revalidate: Tuple[str, ...] = ()
+) -> Response:
+    """
+    Serve um arquivo de dentro de um diretório de pacote (ex.: playlists e
+    segmentos HLS). Caminhos que saiam do diretório ou com extensão fora de
+    media_types respondem 404.
+    Os arquivos do pacote são endereçados pelo conteúdo e servidos como
+    imutáveis, exceto os caminhos relativos em revalidate (pontos de entrada
+    com URL estável, como a playlist mestre).
+    """
+    root = os.path.realpath(package_dir)
+    path = os.path.realpath(os.path.join(root, relative_path))
+    media_type = media_types.get(os.path.splitext(path)[1])
+    if not path.startswith(root + os.sep) or media_type is None:
+        raise HTTPException(status_code=404, detail=not_found)
+
+    stable = os.path.relpath(path, root) in revalidate
+    return await media_response(
+        request,
+        path,
+        media_type=media_type,
+        not_found=not_found,
+        cache_control=REVALIDATE_CACHE_CONTROL if stable else IMMUTABLE_CACHE_CONTROL
+    )
@@ -0,0 +1,70 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+StageFunction = Callable[[Dict[str, Any]], Awaitable[Any]]
+StageCallback = Callable[[str], None]
+
+
+class Pipeline:
+    """
+    Pequeno grafo de dependências (DAG) de etapas assíncronas.
+    Cada etapa inicia assim que suas dependências terminam, de modo que etapas
+    independentes rodam em paralelo. O tempo de cada etapa é registrado em timings.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, tuple] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, func: StageFunction, depends_on: Iterable[str] = ()) -> "Pipeline":
+        """
+        Adiciona uma etapa. func recebe o dicionário de resultados das etapas anteriores.
+        As dependências precisam ter sido adicionadas antes (garante ausência de ciclos).
+        """
+        depends_on = tuple(depends_on)
+        for dependency in depends_on:
+            if dependency not in self._stages:
+                raise ValueError(f"Etapa '{name}' depende de etapa desconhecida: '{dependency}'")
+        self._stages[name] = (func, depends_on)
+        return self
+
+    async def run(
+        self,
+        on_stage_start: Optional[StageCallback] = None,
+        on_stage_end: Optional[StageCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Executa o grafo e retorna o resultado de cada etapa.
+        Se uma etapa falhar, as demais são canceladas e a exceção é propagada.
+        """
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str, func: StageFunction, depends_on: tuple) -> Any:
+            if depends_on:
+                await asyncio.gather(*(tasks[dependency] for dependency in depends_on))
+
+            if on_stage_start:
+                on_stage_start(name)
+            started_at = time.perf_counter()
+            result = await func(results)
+            self.timings[name] = round(time.perf_counter() - started_at, 3)
+            results[name] = result
+            if on_stage_end:
+                on_stage_end(name)
+            return result
+
+        # Etapas são adicionadas em ordem topológica, então as dependências já têm tarefa
+        for name, (func, depends_on) in self._stages.items():
+            tasks[name] = asyncio.create_task(run_stage(name, func, depends_on))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return results
@@ -0,0 +1,294 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import settings
+
+
+class StatusStore:
+    """
+    Índice persistente de status dos trabalhos de geração (música, avatar, filme, publicação).
+    Armazena em SQLite (modo WAL) estado, etapa, progresso, tempos e erro de cada ID,
+    com um cache em memória na frente para responder consultas sem acessar o disco.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.STATUS_DB_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # Uma conexão por processo, protegida por lock
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Dict[str, Any]] = {}
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_status (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL NOT NULL DEFAULT 0,
+                    error TEXT,
+                    result TEXT NOT NULL DEFAULT '{}',
+                    timings TEXT NOT NULL DEFAULT '{}',
+                    stage_started_at REAL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # Log de transições, consumido pelo EventBroker (core/events.py)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self._data_version = self._read_data_version()
+
+    def create(self, job_id: str, kind: str, result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Registra um novo trabalho no estado "queued".
+        """
+        now = time.time()
+        record = {
+            "id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "stage": None,
+            "progress": 0.0,
+            "error": None,
+            "result": result or {},
+            "timings": {},
+            "stage_started_at": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "updated_at": now
+        }
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._write(record)
+            self._conn.execute("COMMIT")
+        return self._public(record)
+
+    def enqueued(self, job_id: str) -> None:
+        """
+        Volta o trabalho ao estado "queued" após etapas executadas na própria API.
+        """
+        def apply(record, now):
+            self._close_stage(record, now)
+            record["status"] = "queued"
+        self._update(job_id, apply)
+
+    def start(self, job_id: str) -> None:
+        """
+        Marca o trabalho como em execução (também ao ser retomado após uma falha).
+        """
+        def apply(record, now):
+            record["status"] = "running"
+            record["error"] = None
+            record["started_at"] = record["started_at"] or now
+            record["finished_at"] = None
+        self._update(job_id, apply)
+
+    def stage(self, job_id: str, stage: str, progress: float) -> None:
+        """
+        Registra o início de uma etapa e o progresso percentual do trabalho.
+        Fecha o tempo da etapa anterior.
+        """
+        def apply(record, now):
+            self._close_stage(record, now)
+            record["status"] = "running"
+            record["stage"] = stage
+            record["progress"] = float(progress)
+            record["stage_started_at"] = now
+        self._update(job_id, apply)
+
+    def progress(self, job_id: str, stage: str, progress: float) -> None:
+        """
+        Atualiza etapa e progresso sem medir tempo; usado quando etapas rodam em
+        paralelo e os tempos são registrados à parte (ver record_timings).
+        """
+        def apply(record, now):
+            record["status"] = "running"
+            record["stage"] = stage
+            record["progress"] = float(progress)
+        self._update(job_id, apply)
+
+    def record_timings(self, job_id: str, timings: Dict[str, float]) -> None:
+        """
+        Mescla tempos de etapas medidos externamente (ex.: core/pipeline.py).
+        """
+        def apply(record, now):
+            record["timings"].update(timings)
+        self._update(job_id, apply)
+
+    def complete(self, job_id: str, result: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Marca o trabalho como concluído.
+        """
+        def apply(record, now):
+            self._close_stage(record, now)
+            record["status"] = "completed"
+            record["progress"] = 100.0
+            record["error"] = None
+            record["finished_at"] = now
+            record["result"].update(result or {})
+        self._update(job_id, apply)
+
+    def retrying(self, job_id: str, error: str) -> None:
+        """
+        Registra o erro de uma tentativa que a fila vai repetir. O estado
+        "retrying" não é terminal: o trabalho volta a "running" na próxima tentativa.
+        """
+        def apply(record, now):
+            self._close_stage(record, now)
+            record["status"] = "retrying"
+            record["error"] = error
+        self._update(job_id, apply)
+
+    def fail(self, job_id: str, error: Optional[str] = None) -> None:
+        """
+        Marca o trabalho como falho (estado terminal), preservando a etapa em que
+        o erro ocorreu. Sem error, mantém o erro registrado pela última tentativa.
+        """
+        def apply(record, now):
+            self._close_stage(record, now)
+            record["status"] = "failed"
+            record["error"] = error or record["error"]
+            record["finished_at"] = now
+        self._update(job_id, apply)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o status do trabalho, ou None se o ID for desconhecido.
+        """
+        with self._lock:
+            # Escritas de outros processos (workers) mudam o data_version: invalidar o cache
+            data_version = self._read_data_version()
+            if data_version != self._data_version:
+                self._cache.clear()
+                self._data_version = data_version
+
+            record = self._cache.get(job_id)
+            if record is None:
+                record = self._read(job_id)
+                if record is None:
+                    return None
+                self._cache[job_id] = record
+
+        return self._public(record)
+
+    def last_event_seq(self) -> int:
+        """
+        Retorna o número de sequência da transição mais recente.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(seq) FROM job_events").fetchone()
+        return row[0] or 0
+
+    def events_since(self, seq: int, limit: int = 1000) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """
+        Retorna as transições posteriores a seq, como (seq, job_id, status).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, job_id, payload FROM job_events WHERE seq > ? ORDER BY seq LIMIT ?",
+                (seq, limit)
+            ).fetchall()
+        return [(row[0], row[1], json.loads(row[2])) for row in rows]
+
+    def prune_events(self, max_age: float) -> None:
+        """
+        Remove transições mais antigas que max_age segundos.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM job_events WHERE created_at < ?", (time.time() - max_age,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _update(self, job_id: str, apply) -> None:
+        with self._lock:
+            # Sempre ler do banco, em transação: outro processo pode ter alterado o registro
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                record = self._read(job_id)
+                if record is not None:
+                    now = time.time()
+                    apply(record, now)
+                    record["updated_at"] = now
+                    self._write(record)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                self._cache.pop(job_id, None)
+                raise
+
+    def _close_stage(self, record: Dict[str, Any], now: float) -> None:
+        if record["stage"] and record["stage_started_at"]:
+            record["timings"][record["stage"]] = round(now - record["stage_started_at"], 3)
+            record["stage_started_at"] = None
+
+    def _read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT id, kind, status, stage, progress, error, result, timings, stage_started_at, "
+            "created_at, started_at, finished_at, updated_at FROM job_status WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "stage": row[3],
+            "progress": row[4],
+            "error": row[5],
+            "result": json.loads(row[6]),
+            "timings": json.loads(row[7]),
+            "stage_started_at": row[8],
+            "created_at": row[9],
+            "started_at": row[10],
+            "finished_at": row[11],
+            "updated_at": row[12]
+        }
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO job_status (id, kind, status, stage, progress, error, result, timings, "
+            "stage_started_at, created_at, started_at, finished_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                record["id"], record["kind"], record["status"], record["stage"], record["progress"],
+                record["error"], json.dumps(record["result"]), json.dumps(record["timings"]),
+                record["stage_started_at"], record["created_at"], record["started_at"],
+                record["finished_at"], record["updated_at"]
+            )
+        )
+        self._conn.execute(
+            "INSERT INTO job_events (job_id, payload, created_at) VALUES (?, ?, ?)",
+            (record["id"], json.dumps(self._public(record)), record["updated_at"])
+        )
+        self._cache[record["id"]] = record
+
+    def _read_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _public(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        # Cópia sem campos internos, para que chamadores não alterem o cache
+        public = {key: value for key, value in record.items() if key != "stage_started_at"}
+        public["result"] = dict(record["result"])
+        public["timings"] = dict(record["timings"])
+        return public
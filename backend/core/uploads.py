@@ -0,0 +1,86 @@
+import hashlib
+import os
+import re
+from typing import Any, Dict, Optional
+
+from fastapi import UploadFile
+
+from core.config import settings
+
+
+class UploadTooLargeError(ValueError):
+    """
+    Arquivo enviado excede o tamanho máximo permitido.
+    """
+
+
+async def ingest_upload(
+    upload: UploadFile,
+    max_bytes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    directory: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Grava um upload em disco em blocos, com limite de tamanho e hash incremental,
+    num caminho endereçado por conteúdo. A memória usada é constante, qualquer
+    que seja o tamanho do arquivo; uploads idênticos são gravados uma única vez.
+
+    Args:
+        upload: Arquivo recebido pela requisição
+        max_bytes: Tamanho máximo em bytes (padrão: settings.UPLOAD_MAX_BYTES)
+        chunk_size: Tamanho de cada bloco lido (padrão: settings.UPLOAD_CHUNK_SIZE)
+        directory: Diretório de destino (padrão: settings.TEMP_DIR/uploads)
+
+    Returns:
+        Dicionário com caminho, SHA-256, tamanho e nome original do arquivo
+
+    Raises:
+        UploadTooLargeError: Se o arquivo exceder max_bytes
+    """
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    directory = directory or f"{settings.TEMP_DIR}/uploads"
+    os.makedirs(directory, exist_ok=True)
+
+    # Manter apenas uma extensão segura do nome original
+    extension = os.path.splitext(upload.filename or "")[1].lower()
+    if not re.fullmatch(r"\.[a-z0-9]{1,10}", extension):
+        extension = ""
+
+    digest = hashlib.sha256()
+    size = 0
+    temp_path = f"{directory}/.{os.urandom(8).hex()}.part"
+
+    try:
+        with open(temp_path, "wb") as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Arquivo excede o limite de {max_bytes} bytes")
+                digest.update(chunk)
+                f.write(chunk)
+
+        sha256 = digest.hexdigest()
+        path = f"{directory}/{sha256}{extension}"
+
+        # Conteúdo já recebido antes: reaproveitar o arquivo existente
+        if os.path.exists(path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        await upload.close()
+
+    return {
+        "path": path,
+        "sha256": sha256,
+        "size": size,
+        "filename": upload.filename
+    }
@@ -1,6 +1,7 @@
 from fastapi import FastAPI, HTTPException, Depends, File, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
+from contextlib import asynccontextmanager
 from typing import Optional
 import uvicorn
 import os
@@ -8,16 +9,31 @@ from dotenv import load_dotenv
 
 # Importações dos módulos internos
 from api import router as api_router
+from api.avatar import router as avatar_router
+from api.film import router as film_router
+from api.publication import router as publication_router
 from core.config import settings
+from core.container import ServiceContainer
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
+# Ciclo de vida: serviços criados uma vez por processo e encerrados no shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.services = ServiceContainer()
+    await app.state.services.start()
+    try:
+        yield
+    finally:
+        await app.state.services.aclose()
+
 # Criar aplicação FastAPI
 app = FastAPI(
     title="Twinverse-AI API",
     description="API para transformar frases criativas em músicas originais",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -31,6 +47,9 @@ app.add_middleware(
 
 # Incluir routers
 app.include_router(api_router.router, prefix="/api")
+app.include_router(avatar_router.router, prefix="/api")
+app.include_router(film_router.router, prefix="/api")
+app.include_router(publication_router.router, prefix="/api")
 
 # Rota raiz
 @app.get("/")
@@ -0,0 +1,255 @@
+import re
+import unicodedata
+import numpy as np
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+from services.audio.pcm import iter_windows, open_wav, to_float
+
+# Inventário de visemas (o índice é o valor gravado nas trilhas)
+VISEMES = ("rest", "A", "E", "I", "O", "U", "MBP", "FV", "L", "S", "CH", "R", "DT", "KG")
+VISEME_INDEX = {name: index for index, name in enumerate(VISEMES)}
+
+# Cabeçalhos de seção usados por LyricsGeneratorService
+SECTION_NAMES = ("VERSO", "PRÉ-REFRÃO", "REFRÃO", "PONTE", "INTRO", "INTRODUÇÃO", "OUTRO", "FINAL")
+
+VOWELS = set("aeiouáéíóúâêôãõàü")
+STRONG_VOWELS = set("aeoáéíóúâêôãõà")
+NASAL_DIPHTHONGS = ("ão", "õe", "ãe", "ãi")
+
+# Encontros consonantais que iniciam sílaba juntos
+ONSET_CLUSTERS = {
+    "bl", "br", "cl", "cr", "dr", "fl", "fr", "gl", "gr", "pl", "pr", "tr", "vr", "tl",
+    "ch", "lh", "nh", "qu", "gu"
+}
+
+# Resolução do envelope de energia da voz (segundos)
+ENVELOPE_WINDOW = 0.01
+
+# Pausa mínima (segundos) para fechar a boca entre frases
+MIN_REST = 0.15
+
+def parse_sections(lyrics: str) -> List[Dict[str, Any]]:
+    """
+    Divide a letra nas seções marcadas por LyricsGeneratorService (VERSO 1, REFRÃO...).
+    Linhas antes do primeiro cabeçalho formam uma seção sem nome.
+
+    Returns:
+        Lista de seções com nome e linhas
+    """
+    sections: List[Dict[str, Any]] = []
+    current = {"name": "", "lines": []}
+
+    for raw_line in lyrics.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        # Cabeçalhos podem vir com markdown do LLM: "**REFRÃO:**", "[Verso 1]"
+        header = re.sub(r"[\*\[\]\(\):#]", "", line).strip().upper()
+        if header.split(" ")[0] in SECTION_NAMES:
+            if current["lines"] or current["name"]:
+                sections.append(current)
+            current = {"name": header, "lines": []}
+        else:
+            current["lines"].append(line)
+
+    if current["lines"]:
+        sections.append(current)
+
+    return sections
+
+def _is_vowel(word: str, index: int) -> bool:
+    char = word[index]
+    if char not in VOWELS:
+        return False
+    # "u" de "qu"/"gu" antes de vogal é mudo ou semivogal: pertence ao ataque (quan-do, á-gua)
+    if char in "uü" and index > 0 and word[index - 1] in "qg" and index + 1 < len(word) and word[index + 1] in VOWELS:
+        return False
+    return True
+
+def _is_hiatus(word: str, index: int) -> bool:
+    # A vogal em index (precedida de vogal) abre um novo núcleo?
+    if word[index - 1:index + 1] in NASAL_DIPHTHONGS:
+        return False
+    # Vogal forte, inclusive í/ú acentuadas, não é semivogal: po-e-si-a, sa-ú-de, pi-au-í
+    if word[index] in STRONG_VOWELS:
+        return True
+    # i/u átonas fechadas por l, m, n, r, z ou antes de nh: sa-ir, ra-iz, a-in-da, ra-i-nha
+    following = word[index + 1:index + 3]
+    return bool(following) and following[0] in "lmnrz" and following[1:2] not in VOWELS
+
+@lru_cache(maxsize=16384)
+def syllabify(word: str) -> Tuple[str, ...]:
+    """
+    Separação silábica heurística para o português: núcleos vocálicos com ditongos
+    decrescentes e nasais, hiato antes de vogal forte ou de i/u que fecham sílaba
+    (ver _is_hiatus) e divisão das consoantes intervocálicas respeitando dígrafos
+    e encontros consonantais.
+    """
+    word = unicodedata.normalize("NFC", word.lower())
+    word = "".join(char for char in word if char.isalpha())
+    if not word:
+        return ()
+
+    # Núcleos: (início, fim) de cada grupo vocálico
+    nuclei: List[List[int]] = []
+    for index in range(len(word)):
+        if not _is_vowel(word, index):
+            continue
+        if nuclei and nuclei[-1][1] == index and not _is_hiatus(word, index):
+            # Duas semivogais após vogal forte: a primeira forma ditongo com a segunda (sa-iu, ca-iu)
+            if index - nuclei[-1][0] >= 2 and word[index - 1] not in STRONG_VOWELS:
+                nuclei[-1][1] = index - 1
+                nuclei.append([index - 1, index + 1])
+            else:
+                nuclei[-1][1] = index + 1
+            continue
+        nuclei.append([index, index + 1])
+
+    if not nuclei:
+        return (word,)
+
+    # Fronteiras: consoantes entre núcleos
+    boundaries = [0]
+    for (_, end), (start, _) in zip(nuclei, nuclei[1:]):
+        consonants = word[end:start]
+        if len(consonants) <= 1:
+            boundaries.append(end)
+        elif consonants[-2:] in ONSET_CLUSTERS:
+            boundaries.append(start - 2)
+        else:
+            boundaries.append(start - 1)
+    boundaries.append(len(word))
+
+    return tuple(word[a:b] for a, b in zip(boundaries, boundaries[1:]))
+
+def _vowel_viseme(syllable: str) -> int:
+    for char in syllable:
+        base = unicodedata.normalize("NFD", char)[0]
+        if base in "aeiou" and char in VOWELS:
+            return VISEME_INDEX[base.upper()]
+    return VISEME_INDEX["A"]
+
+def _consonant_viseme(syllable: str) -> int:
+    # Visema do ataque da sílaba (-1 se começa por vogal)
+    onset = syllable[:2]
+    if not onset or onset[0] in VOWELS:
+        return -1
+    if onset[0] in "mbp":
+        return VISEME_INDEX["MBP"]
+    if onset[0] in "fv":
+        return VISEME_INDEX["FV"]
+    if onset in ("ch", "lh", "nh") or onset[0] in "jx" or (onset[0] == "g" and onset[1:] in ("e", "i")):
+        return VISEME_INDEX["CH"]
+    if onset[0] == "l":
+        return VISEME_INDEX["L"]
+    if onset[0] in "szç" or (onset[0] == "c" and onset[1:] in ("e", "i")):
+        return VISEME_INDEX["S"]
+    if onset[0] == "r":
+        return VISEME_INDEX["R"]
+    if onset[0] in "cgkq":
+        return VISEME_INDEX["KG"]
+    return VISEME_INDEX["DT"]
+
+def lyric_syllables(lyrics: str) -> List[str]:
+    """
+    Sílabas cantadas da letra, na ordem, ignorando os cabeçalhos de seção.
+    """
+    return [
+        syllable
+        for section in parse_sections(lyrics)
+        for line in section["lines"]
+        for word in line.split()
+        for syllable in syllabify(word)
+    ]
+
+def voice_envelope(voice_path: str) -> Tuple[np.ndarray, float]:
+    """
+    Envelope RMS da voz em janelas de ENVELOPE_WINDOW segundos, lido do WAV
+    intermediário via memmap (ver services/audio/pcm.py).
+
+    Returns:
+        Tupla (envelope, janelas por segundo)
+    """
+    samples, sample_rate = open_wav(voice_path)
+    window_size = max(1, int(sample_rate * ENVELOPE_WINDOW))
+    frame_count = len(samples) // window_size
+
+    envelope = np.zeros(frame_count, dtype=np.float32)
+    block_windows = 4096
+    for start, block in iter_windows(samples[:frame_count * window_size], block_windows * window_size):
+        mono = to_float(block).mean(axis=1).reshape(-1, window_size)
+        first = start // window_size
+        envelope[first:first + len(mono)] = np.sqrt(np.mean(mono * mono, axis=1))
+
+    return envelope, sample_rate / window_size
+
+def align_lyrics(lyrics: str, envelope: np.ndarray, frame_rate: float) -> Dict[str, np.ndarray]:
+    """
+    Distribui as sílabas da letra sobre o envelope de energia da voz e gera
+    keyframes de visemas. Cada sílaba recebe uma fatia igual da "massa" cantada
+    (trechos com voz, ponderados pela energia), de modo que pausas não recebem
+    sílabas e trechos fortes recebem mais.
+
+    Returns:
+        Arrays de keyframes (times em segundos, visemes em VISEMES) e início de cada sílaba
+    """
+    syllables = lyric_syllables(lyrics)
+    empty = {
+        "times": np.zeros(0, dtype=np.float32),
+        "visemes": np.zeros(0, dtype=np.uint8),
+        "syllable_starts": np.zeros(0, dtype=np.float32)
+    }
+    if not syllables or len(envelope) == 0 or envelope.max() <= 0:
+        return empty
+
+    # Trechos com voz: acima de -40 dB do pico
+    level = envelope / envelope.max()
+    voiced = level > 0.01
+    weight = np.where(voiced, np.sqrt(level), 0.0)
+    mass = np.concatenate([[0.0], np.cumsum(weight)])
+    if mass[-1] <= 0:
+        return empty
+
+    # Início e fim de cada sílaba: quantis iguais da massa cantada
+    quantiles = np.arange(len(syllables) + 1) * (mass[-1] / len(syllables))
+    edges = np.searchsorted(mass, quantiles, side="left").clip(1, len(envelope)) - 1
+    starts = edges[:-1] / frame_rate
+    durations = np.maximum(np.diff(edges) / frame_rate, 1.0 / frame_rate)
+
+    consonants = np.array([_consonant_viseme(syllable) for syllable in syllables])
+    vowels = np.array([_vowel_viseme(syllable) for syllable in syllables])
+
+    # Consoante no início da sílaba; vogal após 30% da duração (ou no início)
+    has_onset = consonants >= 0
+    vowel_times = starts + np.where(has_onset, 0.3 * durations, 0.0)
+
+    # Boca em repouso no início de cada pausa longa
+    transitions = np.diff(voiced.astype(np.int8), prepend=0, append=0)
+    pause_starts = np.nonzero(transitions == -1)[0]
+    pause_ends = np.nonzero(transitions == 1)[0]
+    pause_ends = np.append(pause_ends[1:], len(voiced))[:len(pause_starts)]
+    long_pauses = pause_starts[(pause_ends - pause_starts) / frame_rate >= MIN_REST]
+
+    times = np.concatenate([starts[has_onset], vowel_times, long_pauses / frame_rate])
+    visemes = np.concatenate([
+        consonants[has_onset],
+        vowels,
+        np.full(len(long_pauses), VISEME_INDEX["rest"])
+    ])
+    order = np.argsort(times, kind="stable")
+
+    return {
+        "times": times[order].astype(np.float32),
+        "visemes": visemes[order].astype(np.uint8),
+        "syllable_starts": starts.astype(np.float32)
+    }
+
+def viseme_track(keyframes: Dict[str, np.ndarray], frame_times: np.ndarray) -> np.ndarray:
+    """
+    Amostra os keyframes de visemas nos instantes pedidos (visema vigente em cada um).
+    """
+    if len(keyframes["times"]) == 0:
+        return np.zeros(len(frame_times), dtype=np.uint8)
+    index = np.searchsorted(keyframes["times"], frame_times, side="right") - 1
+    return np.where(index >= 0, keyframes["visemes"][np.maximum(index, 0)], VISEME_INDEX["rest"]).astype(np.uint8)
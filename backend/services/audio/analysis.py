@@ -0,0 +1,270 @@
+import os
+import tempfile
+import numpy as np
+from typing import Any, Dict, Tuple
+from core.config import settings
+from services.audio.pcm import decode_to_wav, release_pages, to_float
+
+# Parâmetros da STFT
+N_FFT = 2048
+HOP_LENGTH = 512
+BANDS = 16
+
+# Faixa de andamento considerada e andamento mais provável (BPM)
+MIN_TEMPO = 60.0
+MAX_TEMPO = 180.0
+PRIOR_TEMPO = 120.0
+
+# Versão do formato em cache; incrementar ao mudar o cálculo
+ANALYSIS_VERSION = 1
+
+def _band_matrix(sample_rate: int) -> np.ndarray:
+    # Agrupa as raias da FFT em bandas espaçadas logaritmicamente (raias, bandas)
+    frequencies = np.fft.rfftfreq(N_FFT, 1.0 / sample_rate)
+    edges = np.geomspace(40.0, sample_rate / 2, BANDS + 1)
+    band = np.searchsorted(edges, frequencies, side="right") - 1
+    matrix = np.zeros((len(frequencies), BANDS), dtype=np.float32)
+    valid = (band >= 0) & (band < BANDS)
+    matrix[np.nonzero(valid)[0], band[valid]] = 1.0
+    return matrix
+
+def compute_features(samples: np.ndarray, sample_rate: int, frames_per_chunk: int = 1024) -> Dict[str, np.ndarray]:
+    """
+    STFT vetorizada em quadros sobre um buffer (quadros, canais), percorrido em
+    pedaços de frames_per_chunk quadros de análise para que a memória seja limitada.
+
+    Returns:
+        Força de onset (fluxo espectral), envelope RMS e energia por banda, por quadro
+        (o quadro i é centrado em i * HOP_LENGTH + N_FFT / 2)
+    """
+    window = np.hanning(N_FFT).astype(np.float32)
+    bands = _band_matrix(sample_rate)
+    frame_count = max(0, 1 + (len(samples) - N_FFT) // HOP_LENGTH)
+
+    onset = np.zeros(frame_count, dtype=np.float32)
+    rms = np.zeros(frame_count, dtype=np.float32)
+    band_energy = np.zeros((frame_count, BANDS), dtype=np.float32)
+    previous = None
+
+    for first in range(0, frame_count, frames_per_chunk):
+        last = min(first + frames_per_chunk, frame_count)
+        start = first * HOP_LENGTH
+        end = (last - 1) * HOP_LENGTH + N_FFT
+
+        mono = to_float(samples[start:end]).mean(axis=1)
+        frames = np.lib.stride_tricks.sliding_window_view(mono, N_FFT)[::HOP_LENGTH]
+
+        rms[first:last] = np.sqrt(np.mean(frames * frames, axis=1))
+
+        magnitude = np.abs(np.fft.rfft(frames * window, axis=1)).astype(np.float32)
+        log_magnitude = np.log1p(100.0 * magnitude)
+        band_energy[first:last] = log_magnitude @ bands
+
+        # Fluxo espectral: soma das variações positivas em relação ao quadro anterior,
+        # com o último quadro do pedaço anterior carregado para a fronteira
+        if previous is None:
+            previous = log_magnitude[:1]
+        difference = np.diff(np.concatenate([previous, log_magnitude]), axis=0)
+        onset[first:last] = np.maximum(difference, 0.0).sum(axis=1)
+        previous = log_magnitude[-1:]
+
+        # Quadros que o próximo pedaço não relê deixam o RSS
+        release_pages(samples, start, last * HOP_LENGTH)
+
+    if frame_count and onset.max() > 0:
+        onset /= onset.max()
+
+    return {"onset_strength": onset, "rms": rms, "band_energy": band_energy}
+
+def estimate_tempo(onset: np.ndarray, frame_rate: float) -> float:
+    """
+    Estima o andamento (BPM) pela autocorrelação da força de onset, ponderada
+    por uma distribuição log-normal em torno de PRIOR_TEMPO.
+    """
+    if len(onset) < 4:
+        return PRIOR_TEMPO
+
+    # Autocorrelação via FFT
+    centered = onset - onset.mean()
+    size = 1 << int(np.ceil(np.log2(2 * len(centered))))
+    spectrum = np.fft.rfft(centered, size)
+    autocorrelation = np.fft.irfft(spectrum * np.conj(spectrum), size)[:len(centered)]
+
+    min_lag = max(1, int(frame_rate * 60.0 / MAX_TEMPO))
+    max_lag = min(len(autocorrelation) - 1, int(frame_rate * 60.0 / MIN_TEMPO))
+    if max_lag <= min_lag:
+        return PRIOR_TEMPO
+
+    lags = np.arange(min_lag, max_lag + 1)
+    tempos = 60.0 * frame_rate / lags
+    weights = np.exp(-0.5 * (np.log2(tempos / PRIOR_TEMPO) ** 2))
+    scores = autocorrelation[lags] * weights
+    peak = int(np.argmax(scores))
+    best = float(lags[peak])
+
+    # Interpolação parabólica em torno do pico, para precisão abaixo de um quadro
+    if 0 < peak < len(scores) - 1:
+        left, center, right = scores[peak - 1], scores[peak], scores[peak + 1]
+        curvature = left - 2 * center + right
+        if curvature < 0:
+            best += 0.5 * (left - right) / curvature
+
+    return float(60.0 * frame_rate / best)
+
+def track_beats(onset: np.ndarray, frame_rate: float, tempo: float) -> Tuple[np.ndarray, float]:
+    """
+    Grade de batidas regular: escolhe período (em torno do andamento estimado) e fase
+    que maximizam a soma da força de onset sobre os pontos da grade, avaliando todos
+    os candidatos de uma vez. Refinar o período evita que a grade deslize ao longo
+    de faixas longas.
+
+    Returns:
+        Tupla (instantes das batidas em segundos, andamento refinado em BPM)
+    """
+    period = 60.0 * frame_rate / tempo
+    if len(onset) == 0 or period <= 0:
+        return np.zeros(0, dtype=np.float32), tempo
+
+    # Candidatos (períodos, fases, passos)
+    periods = period * np.linspace(0.98, 1.02, 41)
+    phases = np.arange(int(np.ceil(period)))
+    steps = np.arange(int(len(onset) / periods.min()) + 1)
+    grid = np.rint(phases[None, :, None] + periods[:, None, None] * steps[None, None, :]).astype(np.int64)
+    inside = grid < len(onset)
+    scores = np.where(inside, onset[np.minimum(grid, len(onset) - 1)], 0.0).sum(axis=2)
+
+    best_period, best_phase = np.unravel_index(np.argmax(scores), scores.shape)
+    best = grid[best_period, best_phase]
+    best = best[best < len(onset)]
+
+    # Quadro i é centrado em i * HOP_LENGTH + N_FFT / 2
+    times = (best + N_FFT / (2 * HOP_LENGTH)) / frame_rate
+    return times.astype(np.float32), float(60.0 * frame_rate / periods[best_period])
+
+def find_sections(
+    band_energy: np.ndarray,
+    beats: np.ndarray,
+    frame_rate: float,
+    duration: float,
+    beats_per_bar: int = 4,
+    context_bars: int = 4
+) -> np.ndarray:
+    """
+    Detecta fronteiras de seção comparando o timbre médio (energia por banda) dos
+    compassos anteriores e posteriores a cada compasso.
+
+    Returns:
+        Instantes de início de cada seção em segundos (sempre inclui 0)
+    """
+    bar_starts = beats[::beats_per_bar]
+    if len(bar_starts) < 2 * context_bars + 1:
+        return np.zeros(1, dtype=np.float32)
+
+    # Timbre médio por compasso, normalizado
+    bounds = np.minimum((np.append(bar_starts, duration) * frame_rate).astype(np.int64), len(band_energy))
+    sums = np.add.reduceat(band_energy, np.minimum(bounds[:-1], len(band_energy) - 1), axis=0)
+    counts = np.maximum(np.diff(bounds), 1)[:, None]
+    bars = sums / counts
+    bars = (bars - bars.mean(axis=0)) / (bars.std() + 1e-6)
+
+    # Novidade: distância entre médias móveis antes e depois de cada compasso
+    cumulative = np.concatenate([np.zeros((1, BANDS)), np.cumsum(bars, axis=0)])
+    index = np.arange(context_bars, len(bars) - context_bars + 1)
+    before = (cumulative[index] - cumulative[index - context_bars]) / context_bars
+    after = (cumulative[index + context_bars] - cumulative[index]) / context_bars
+    novelty = np.linalg.norm(after - before, axis=1)
+
+    # Picos acima da média + desvio (e de metade do maior pico),
+    # separados por pelo menos context_bars compassos
+    threshold = max(novelty.mean() + novelty.std(), 0.5 * novelty.max())
+    boundaries = []
+    for position in np.argsort(novelty)[::-1]:
+        if novelty[position] < threshold:
+            break
+        if all(abs(position - other) >= context_bars for other in boundaries):
+            boundaries.append(position)
+
+    starts = bar_starts[np.sort(index[boundaries]).astype(np.int64)] if boundaries else np.zeros(0)
+    return np.concatenate([[0.0], starts]).astype(np.float32)
+
+def analyze(samples: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+    """
+    Análise completa de um buffer (quadros, canais): onset, andamento, batidas,
+    envelope RMS e seções.
+    """
+    frame_rate = sample_rate / HOP_LENGTH
+    duration = len(samples) / sample_rate
+
+    features = compute_features(samples, sample_rate)
+    tempo = estimate_tempo(features["onset_strength"], frame_rate)
+    beats, tempo = track_beats(features["onset_strength"], frame_rate, tempo)
+    sections = find_sections(features["band_energy"], beats, frame_rate, duration)
+
+    return {
+        "tempo": tempo,
+        "duration": duration,
+        "frame_rate": frame_rate,
+        "beats": beats,
+        "sections": sections,
+        "onset_strength": features["onset_strength"],
+        "rms": features["rms"]
+    }
+
+def _fingerprint(music_path: str) -> np.ndarray:
+    # Identifica a versão do arquivo analisado (tamanho e data de modificação)
+    stat = os.stat(music_path)
+    return np.array([ANALYSIS_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+def load_analysis(music_path: str) -> Dict[str, Any]:
+    """
+    Retorna a análise da música, lida do cache analysis.npz ao lado do arquivo
+    ou calculada (e gravada) se ausente ou desatualizada.
+    """
+    music_dir = os.path.dirname(music_path)
+    cache_path = os.path.join(music_dir, "analysis.npz")
+    fingerprint = _fingerprint(music_path)
+
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as data:
+            if np.array_equal(data["fingerprint"], fingerprint):
+                return {
+                    "tempo": float(data["tempo"]),
+                    "duration": float(data["duration"]),
+                    "frame_rate": float(data["frame_rate"]),
+                    "beats": data["beats"],
+                    "sections": data["sections"],
+                    "onset_strength": data["onset_strength"].astype(np.float32),
+                    "rms": data["rms"].astype(np.float32)
+                }
+
+    # Preferir o PCM da mixagem (services/audio/pcm.py) a decodificar o MP3
+    mix_path = os.path.join(music_dir, "mix.wav")
+    source_path = mix_path if os.path.exists(mix_path) else music_path
+    # Nome exclusivo: análises simultâneas da mesma música não compartilham o PCM,
+    # e cada uma remove apenas o próprio arquivo
+    fd, pcm_path = tempfile.mkstemp(prefix=".analysis-", suffix=".wav", dir=music_dir)
+    os.close(fd)
+    try:
+        samples = decode_to_wav(source_path, pcm_path, settings.ANALYSIS_SAMPLE_RATE, channels=1)
+        result = analyze(samples, settings.ANALYSIS_SAMPLE_RATE)
+        del samples
+    finally:
+        os.remove(pcm_path)
+
+    # Gravação atômica: outras etapas podem ler o cache ao mesmo tempo
+    fd, temp_path = tempfile.mkstemp(prefix=".analysis-", suffix=".npz.tmp", dir=music_dir)
+    with os.fdopen(fd, "wb") as f:
+        np.savez_compressed(
+            f,
+            fingerprint=fingerprint,
+            tempo=result["tempo"],
+            duration=result["duration"],
+            frame_rate=result["frame_rate"],
+            beats=result["beats"],
+            sections=result["sections"],
+            onset_strength=result["onset_strength"].astype(np.float16),
+            rms=result["rms"].astype(np.float16)
+        )
+    os.replace(temp_path, cache_path)
+
+    return result
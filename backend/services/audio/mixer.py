@@ -0,0 +1,147 @@
+import numpy as np
+from typing import Optional
+from core.config import settings
+from services.audio.pcm import release_pages, to_float
+
+def db_to_gain(db: float) -> float:
+    """
+    Converte decibéis em ganho linear.
+    """
+    return float(10.0 ** (db / 20.0))
+
+class AudioMixer:
+    """
+    Motor de mixagem de instrumental e voz com DSP vetorizado em NumPy:
+    ganho, ducking do instrumental sob a voz e limitador de pico.
+    Processa em blocos de tamanho fixo, de modo que a memória de trabalho
+    não depende da duração da faixa; entradas e saída podem ser visões memmap
+    (ver services/audio/pcm.py).
+    """
+
+    def __init__(
+        self,
+        sample_rate: Optional[int] = None,
+        block_size: Optional[int] = None,
+        window_size: int = 1024,
+        instrumental_gain_db: float = -3.0,
+        voice_gain_db: float = 0.0,
+        ducking_db: float = -6.0,
+        ducking_threshold_db: float = -30.0,
+        ceiling_db: float = -1.0
+    ):
+        self.sample_rate = sample_rate or settings.AUDIO_SAMPLE_RATE
+        self.window_size = window_size
+
+        # Bloco sempre múltiplo da janela de análise
+        block_size = block_size or settings.AUDIO_BLOCK_SIZE
+        self.block_size = max(window_size, block_size - block_size % window_size)
+
+        self.instrumental_gain = db_to_gain(instrumental_gain_db)
+        self.voice_gain = db_to_gain(voice_gain_db)
+        self.ducking_gain = db_to_gain(ducking_db)
+        self.ducking_threshold = db_to_gain(ducking_threshold_db)
+        self.ceiling = db_to_gain(ceiling_db)
+
+    def mix(self, instrumental: np.ndarray, voice: np.ndarray, output: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Mixa dois buffers float32 (quadros, canais) bloco a bloco.
+
+        Args:
+            instrumental: Buffer do instrumental
+            voice: Buffer da voz
+            output: Buffer de saída opcional (ex.: create_wav); criado se ausente
+
+        Returns:
+            Buffer mixado, com a duração do maior dos dois
+        """
+        frame_count = max(len(instrumental), len(voice))
+        channels = instrumental.shape[1] if len(instrumental) else voice.shape[1]
+        if output is None:
+            output = np.empty((frame_count, channels), dtype=np.float32)
+
+        # Estado carregado entre blocos para que os ganhos sejam contínuos
+        state = {"duck": 1.0, "limit": 1.0}
+
+        for start in range(0, frame_count, self.block_size):
+            end = min(start + self.block_size, frame_count)
+            # Cada bloco lê também a primeira janela do seguinte: o lookahead do
+            # limitador atravessa a fronteira e a curva já desce antes do transiente
+            lookahead_end = min(end + self.window_size, frame_count)
+            output[start:end] = self._mix_block(
+                self._block(instrumental, start, lookahead_end, channels),
+                self._block(voice, start, lookahead_end, channels),
+                state,
+                end - start
+            )
+
+            # Páginas já mixadas deixam o RSS (continuam no page cache)
+            for samples in (instrumental, voice, output):
+                release_pages(samples, start, end)
+
+        return output
+
+    def _block(self, samples: np.ndarray, start: int, end: int, channels: int) -> np.ndarray:
+        # Trecho do buffer, completado com silêncio além do fim
+        block = to_float(samples[start:end])
+        if len(block) < end - start:
+            block = np.concatenate([block, np.zeros((end - start - len(block), channels), dtype=np.float32)])
+        return block
+
+    def _mix_block(self, instrumental: np.ndarray, voice: np.ndarray, state: dict, frames: int) -> np.ndarray:
+        # Os buffers podem trazer, após os frames do bloco, a janela de lookahead
+        # do bloco seguinte; ela é processada aqui só para calcular os ganhos
+        total = len(instrumental)
+        last = -(-frames // self.window_size) - 1
+
+        # Ducking: atenua o instrumental proporcionalmente à energia da voz
+        voice_rms = self._window_rms(voice)
+        presence = np.clip(voice_rms / self.ducking_threshold, 0.0, 1.0)
+        duck = 1.0 - (1.0 - self.ducking_gain) * presence
+        duck_curve = self._interpolate(duck, total, state["duck"])
+        state["duck"] = float(duck[last])
+
+        mixed = instrumental * (self.instrumental_gain * duck_curve)[:, None] + voice * self.voice_gain
+
+        # Limitador: ganho por janela com lookahead de uma janela, interpolado por amostra
+        peaks = self._window_peak(mixed)
+        target = np.minimum(1.0, self.ceiling / np.maximum(peaks, 1e-9))
+        target = np.minimum(target, np.append(target[1:], target[-1]))
+        limit_curve = self._interpolate(target, frames, state["limit"])
+        state["limit"] = float(target[last])
+
+        mixed = mixed[:frames]
+        mixed *= limit_curve[:, None]
+
+        # Garantia final contra picos residuais da interpolação
+        return np.clip(mixed, -self.ceiling, self.ceiling, out=mixed)
+
+    def _windows(self, samples: np.ndarray) -> np.ndarray:
+        # Visão (janelas, quadros por janela) do sinal mono; última janela completada com zeros
+        mono = samples.mean(axis=1)
+        padding = (-len(mono)) % self.window_size
+        if padding:
+            mono = np.concatenate([mono, np.zeros(padding, dtype=mono.dtype)])
+        return mono.reshape(-1, self.window_size)
+
+    def _window_rms(self, samples: np.ndarray) -> np.ndarray:
+        windows = self._windows(samples)
+        return np.sqrt(np.mean(windows * windows, axis=1))
+
+    def _window_peak(self, samples: np.ndarray) -> np.ndarray:
+        # Pico entre todos os canais
+        peak = np.abs(samples).max(axis=1)
+        padding = (-len(peak)) % self.window_size
+        if padding:
+            peak = np.concatenate([peak, np.zeros(padding, dtype=peak.dtype)])
+        return peak.reshape(-1, self.window_size).max(axis=1)
+
+    def _interpolate(self, values: np.ndarray, frames: int, previous: float) -> np.ndarray:
+        # Curva por amostra a partir de valores no centro de cada janela,
+        # partindo do último valor do bloco anterior
+        centers = np.arange(len(values)) * self.window_size + self.window_size / 2
+        positions = np.arange(frames, dtype=np.float32)
+        return np.interp(
+            positions,
+            np.concatenate([[-self.window_size / 2], centers]),
+            np.concatenate([[previous], values])
+        ).astype(np.float32)
@@ -0,0 +1,241 @@
+import mmap
+import os
+import shutil
+import struct
+import subprocess
+import numpy as np
+from typing import Iterator, Optional, Tuple
+from core.config import settings
+
+# Códigos de formato do chunk "fmt " de arquivos WAV
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+
+# Cabeçalho RIFF + fmt (18 bytes) + fact + início do chunk data
+HEADER_SIZE = 12 + 26 + 12 + 8
+
+def _header(frames: int, channels: int, sample_rate: int) -> bytes:
+    data_size = frames * channels * 4
+    return b"".join([
+        struct.pack("<4sI4s", b"RIFF", HEADER_SIZE - 8 + data_size, b"WAVE"),
+        struct.pack(
+            "<4sIHHIIHHH", b"fmt ", 18, WAVE_FORMAT_IEEE_FLOAT, channels, sample_rate,
+            sample_rate * channels * 4, channels * 4, 32, 0
+        ),
+        struct.pack("<4sII", b"fact", 4, frames * channels),
+        struct.pack("<4sI", b"data", data_size)
+    ])
+
+def create_wav(path: str, frames: int, channels: int, sample_rate: int) -> np.memmap:
+    """
+    Cria um WAV float32 com o tamanho final e retorna uma visão memmap
+    (quadros, canais) gravável sobre os dados.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(_header(frames, channels, sample_rate))
+        f.truncate(HEADER_SIZE + frames * channels * 4)
+
+    if frames == 0:
+        return np.zeros((0, channels), dtype=np.float32)
+    return np.memmap(path, dtype=np.float32, mode="r+", offset=HEADER_SIZE, shape=(frames, channels))
+
+def open_wav(path: str, mode: str = "r") -> Tuple[np.memmap, int]:
+    """
+    Abre um WAV PCM 16 bits ou float32 como visão memmap (quadros, canais),
+    sem carregar os dados em memória.
+
+    Returns:
+        Tupla (amostras, taxa de amostragem)
+    """
+    with open(path, "rb") as f:
+        riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError(f"Arquivo não é WAV: {path}")
+
+        fmt = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise ValueError(f"Chunk de dados ausente: {path}")
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", f.read(16))
+                f.seek(chunk_size - 16 + chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+    if fmt is None:
+        raise ValueError(f"Chunk fmt ausente: {path}")
+
+    format_code, channels, sample_rate, _, _, bits = fmt
+    if format_code == WAVE_FORMAT_IEEE_FLOAT and bits == 32:
+        dtype = np.float32
+    elif format_code == WAVE_FORMAT_PCM and bits == 16:
+        dtype = np.int16
+    else:
+        raise ValueError(f"Formato WAV não suportado ({format_code}, {bits} bits): {path}")
+
+    # O tamanho declarado pode estar errado em arquivos gerados por streaming
+    frame_size = channels * np.dtype(dtype).itemsize
+    frames = (os.path.getsize(path) - offset) // frame_size
+    if frames == 0:
+        return np.zeros((0, channels), dtype=dtype), sample_rate
+    return np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=(frames, channels)), sample_rate
+
+# Margem liberada atrás de cada trecho (tamanho máximo de uma folio de arquivo)
+RELEASE_LAG_BYTES = 2 << 20
+
+def release_pages(samples: np.ndarray, start: int, end: int) -> None:
+    """
+    Desfaz o mapeamento das páginas dos quadros [start, end) de uma visão memmap
+    já processada, para que o RSS do processo não cresça com a duração da faixa.
+    O mapeamento é compartilhado: os dados (inclusive os gravados) continuam no
+    page cache e um novo acesso apenas os remapeia. Buffers em memória são ignorados.
+
+    Um page fault pode mapear uma folio inteira do page cache (até 2 MiB), que
+    avança sobre quadros já liberados; por isso até RELEASE_LAG_BYTES antes de
+    start são liberados de novo. O chamador deve percorrer o buffer em ordem.
+    """
+    mapped = getattr(samples, "_mmap", None)
+    advice = getattr(mmap, "MADV_DONTNEED", None)
+    if mapped is None or advice is None or end <= start or mapped.closed:
+        return
+
+    # Endereço do início do mmap (o array temporário libera o buffer ao sair de escopo)
+    base = np.frombuffer(mapped, dtype=np.uint8, count=1).ctypes.data
+    offset = samples.ctypes.data - base + start * samples.strides[0]
+    aligned = max(offset - RELEASE_LAG_BYTES, 0)
+    aligned -= aligned % mmap.PAGESIZE
+    length = min(offset + (end - start) * samples.strides[0], len(mapped)) - aligned
+    if length > 0:
+        mapped.madvise(advice, aligned, length)
+
+def iter_windows(samples: np.ndarray, window_size: int) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Percorre o buffer em janelas consecutivas, como visões (sem cópia).
+    A última janela pode ser menor. Em visões memmap, as páginas de cada janela
+    são liberadas quando o consumidor pede a seguinte (ver release_pages).
+
+    Returns:
+        Iterador de (quadro inicial, janela)
+    """
+    for start in range(0, len(samples), window_size):
+        yield start, samples[start:start + window_size]
+        release_pages(samples, start, start + window_size)
+
+def to_float(block: np.ndarray) -> np.ndarray:
+    """
+    Converte um bloco PCM 16 bits para float32 em [-1, 1]; float32 passa sem cópia.
+    """
+    if block.dtype == np.int16:
+        return block.astype(np.float32) / 32768.0
+    return np.asarray(block, dtype=np.float32)
+
+def decode_to_wav(
+    source_path: str,
+    output_path: str,
+    sample_rate: int,
+    channels: int = 2,
+    chunk_size: Optional[int] = None
+) -> np.memmap:
+    """
+    Decodifica qualquer formato suportado pelo ffmpeg para um WAV float32 na taxa e
+    número de canais pedidos. A saída do ffmpeg é copiada em pedaços para o disco,
+    de modo que a memória usada não depende da duração do áudio.
+
+    Returns:
+        Visão memmap (quadros, canais) do WAV gerado
+    """
+    # WAV já no formato de trabalho: usar diretamente, sem decodificar
+    try:
+        samples, rate = open_wav(source_path)
+        if rate == sample_rate and samples.shape[1] == channels:
+            return samples
+    except (ValueError, struct.error):
+        pass
+
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg não encontrado para decodificar o áudio")
+
+    chunk_size = chunk_size or settings.AUDIO_BLOCK_SIZE * channels * 4
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    process = subprocess.Popen(
+        [
+            "ffmpeg", "-v", "error", "-i", source_path,
+            "-f", "f32le", "-acodec", "pcm_f32le", "-ac", str(channels), "-ar", str(sample_rate), "-"
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+    data_size = 0
+    with open(output_path, "wb") as f:
+        f.write(_header(0, channels, sample_rate))
+        while True:
+            chunk = process.stdout.read(chunk_size)
+            if not chunk:
+                break
+            f.write(chunk)
+            data_size += len(chunk)
+
+        # Reescrever o cabeçalho com o tamanho final
+        f.seek(0)
+        f.write(_header(data_size // (channels * 4), channels, sample_rate))
+
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        raise RuntimeError(f"Falha ao decodificar {source_path}: {stderr.decode(errors='ignore').strip()}")
+
+    samples, _ = open_wav(output_path)
+    return samples
+
+def encode_wav(wav_path: str, output_path: str, bitrate: str = "192k") -> str:
+    """
+    Codifica um WAV em MP3 com o ffmpeg lendo direto do disco.
+    """
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg não encontrado para codificar o áudio")
+
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-y", "-i", wav_path, "-b:a", bitrate, output_path],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao codificar {wav_path}: {result.stderr.decode(errors='ignore').strip()}")
+    return output_path
+
+def measure_loudness(samples: np.ndarray, sample_rate: int, window_seconds: float = 0.4) -> dict:
+    """
+    Mede pico, RMS integrado e RMS máximo por janela (dBFS) percorrendo o
+    buffer em janelas, sem carregá-lo inteiro em memória.
+    """
+    window_size = max(1, int(sample_rate * window_seconds))
+    peak = 0.0
+    energy = 0.0
+    max_window_rms = 0.0
+
+    for _, window in iter_windows(samples, window_size):
+        block = to_float(window)
+        square_sum = float(np.einsum("ij,ij->", block, block))
+        energy += square_sum
+        peak = max(peak, float(np.abs(block).max()))
+        max_window_rms = max(max_window_rms, (square_sum / block.size) ** 0.5)
+
+    total = samples.size or 1
+
+    def to_db(value: float) -> float:
+        return round(20.0 * float(np.log10(max(value, 1e-9))), 2)
+
+    return {
+        "duration": round(len(samples) / sample_rate, 3),
+        "peak_db": to_db(peak),
+        "rms_db": to_db((energy / total) ** 0.5),
+        "max_window_rms_db": to_db(max_window_rms)
+    }
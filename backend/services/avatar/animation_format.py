@@ -0,0 +1,178 @@
+import json
+import mmap
+import struct
+import numpy as np
+from typing import Any, Dict, Optional, Union
+from core.files import atomic_write
+
+# Binary animation container (.anim)
+#
+# Layout (little-endian):
+#   header          magic "TWAN", version u16, reserved u16, fps f32,
+#                   frame_count u32, channel_count u32, metadata_size u32
+#   metadata        UTF-8 JSON object (metadata_size bytes)
+#   channel table   per channel: name (32 bytes, UTF-8, NUL-padded),
+#                   dtype code u8, 3 reserved bytes, value count u32,
+#                   data offset u64
+#   channel data    value count values per channel, each array starting on
+#                   an 8-byte boundary so it can be viewed without copying
+#
+# Version 1 files have no value count (reserved, zero): every channel holds
+# frame_count values. Version 2 allows shorter channels, e.g. keyframe times
+# and values produced by services/avatar/animation_optimizer.py.
+MAGIC = b"TWAN"
+VERSION = 2
+MEDIA_TYPE = "application/vnd.twinverse.animation"
+
+HEADER = struct.Struct("<4sHHfIII")
+CHANNEL_ENTRY = struct.Struct("<32sB3xIQ")
+ALIGNMENT = 8
+
+DTYPE_CODES = {
+    1: np.dtype("<f2"),
+    2: np.dtype("<f4"),
+    3: np.dtype("u1"),
+    4: np.dtype("<u2"),
+    5: np.dtype("<u4")
+}
+DTYPE_BY_NAME = {dtype: code for code, dtype in DTYPE_CODES.items()}
+
+
+class AnimationClip:
+    """
+    Parsed animation container. Channel arrays are read-only NumPy views over
+    the source buffer (bytes, memoryview or mmap), so parsing never copies
+    per-frame data.
+    """
+
+    def __init__(
+        self,
+        fps: float,
+        frame_count: int,
+        channels: Dict[str, np.ndarray],
+        metadata: Dict[str, Any],
+        version: int = VERSION
+    ):
+        self.fps = fps
+        self.frame_count = frame_count
+        self.channels = channels
+        self.metadata = metadata
+        self.version = version
+
+    @property
+    def duration(self) -> float:
+        return self.frame_count / self.fps if self.fps else 0.0
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def encode_animation(
+    fps: float,
+    channels: Dict[str, np.ndarray],
+    metadata: Optional[Dict[str, Any]] = None,
+    frame_count: Optional[int] = None
+) -> bytes:
+    """
+    Serializes channels (blendshapes, bones, visemes) into the container.
+    Arrays must be float16, float32, uint8, uint16 or uint32. Without an explicit
+    frame_count, every channel is per-frame and must share the same length.
+    """
+    if frame_count is None:
+        frame_counts = {len(values) for values in channels.values()}
+        if len(frame_counts) > 1:
+            raise ValueError(f"Channels have different frame counts: {sorted(frame_counts)}")
+        frame_count = frame_counts.pop() if frame_counts else 0
+
+    arrays = {}
+    for name, values in channels.items():
+        if len(name.encode("utf-8")) > 32:
+            raise ValueError(f"Channel name too long: {name}")
+        array = np.ascontiguousarray(values)
+        dtype = array.dtype.newbyteorder("<") if array.dtype.itemsize > 1 else array.dtype
+        if dtype not in DTYPE_BY_NAME:
+            raise ValueError(f"Unsupported channel dtype for {name}: {array.dtype}")
+        arrays[name] = array.astype(dtype, copy=False)
+
+    metadata_bytes = json.dumps(metadata or {}, separators=(",", ":")).encode("utf-8")
+
+    # Compute data offsets after header, metadata and channel table
+    offset = _align(HEADER.size + len(metadata_bytes) + CHANNEL_ENTRY.size * len(arrays))
+    table = []
+    offsets = []
+    for name, array in arrays.items():
+        offsets.append(offset)
+        table.append(CHANNEL_ENTRY.pack(name.encode("utf-8"), DTYPE_BY_NAME[array.dtype], len(array), offset))
+        offset = _align(offset + array.nbytes)
+
+    buffer = bytearray(offset)
+    HEADER.pack_into(buffer, 0, MAGIC, VERSION, 0, float(fps), frame_count, len(arrays), len(metadata_bytes))
+    position = HEADER.size
+    buffer[position:position + len(metadata_bytes)] = metadata_bytes
+    position += len(metadata_bytes)
+    for entry in table:
+        buffer[position:position + CHANNEL_ENTRY.size] = entry
+        position += CHANNEL_ENTRY.size
+    for start, array in zip(offsets, arrays.values()):
+        buffer[start:start + array.nbytes] = array.tobytes()
+
+    return bytes(buffer)
+
+
+def decode_animation(buffer: Union[bytes, bytearray, memoryview, mmap.mmap]) -> AnimationClip:
+    """
+    Parses a container without copying channel data. Channels are read-only
+    even over a writable buffer.
+    """
+    view = memoryview(buffer).toreadonly()
+    if len(view) < HEADER.size:
+        raise ValueError("Animation buffer too small")
+
+    magic, version, _, fps, frame_count, channel_count, metadata_size = HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a Twinverse animation file")
+    if version > VERSION:
+        raise ValueError(f"Unsupported animation version: {version}")
+
+    position = HEADER.size
+    metadata = json.loads(bytes(view[position:position + metadata_size]) or b"{}")
+    position += metadata_size
+
+    channels = {}
+    for _ in range(channel_count):
+        raw_name, code, count, offset = CHANNEL_ENTRY.unpack_from(view, position)
+        position += CHANNEL_ENTRY.size
+        if code not in DTYPE_CODES:
+            raise ValueError(f"Unknown channel dtype code: {code}")
+        name = raw_name.rstrip(b"\0").decode("utf-8")
+        if version < 2:
+            count = frame_count
+        channels[name] = np.frombuffer(view, dtype=DTYPE_CODES[code], count=count, offset=offset)
+
+    return AnimationClip(fps, frame_count, channels, metadata, version)
+
+
+def write_animation(
+    path: str,
+    fps: float,
+    channels: Dict[str, np.ndarray],
+    metadata: Optional[Dict[str, Any]] = None,
+    frame_count: Optional[int] = None
+) -> str:
+    """
+    Writes a container to disk atomically (temporary file + rename).
+    """
+    data = encode_animation(fps, channels, metadata, frame_count)
+    with atomic_write(path) as f:
+        f.write(data)
+    return path
+
+
+def read_animation(path: str) -> AnimationClip:
+    """
+    Memory-maps a container from disk; channels are views over the mapping.
+    """
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return decode_animation(mapping)
@@ -0,0 +1,209 @@
+import os
+import asyncio
+import numpy as np
+from typing import Dict, Any, Optional, Tuple
+from core.config import settings
+from services.avatar.animation_format import read_animation, write_animation
+
+# Share of the error tolerance that quantization may use when picking uint8
+QUANTIZATION_BUDGET = 0.25
+
+class AnimationOptimizerService:
+    """
+    Service responsible for shrinking per-frame avatar animations into
+    error-bounded keyframes before export.
+    Continuous channels are simplified with a vectorized Ramer-Douglas-Peucker
+    pass and quantized; discrete channels (visemes, sections) keep only the
+    frames where their value changes.
+    """
+
+    def __init__(self, tolerance: Optional[float] = None):
+        self.tolerance = tolerance if tolerance is not None else settings.ANIMATION_TOLERANCE
+
+    async def optimize(
+        self,
+        animated_avatar: Dict[str, Any],
+        tolerance: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Optimizes the animation container of an animated avatar.
+
+        Args:
+            animated_avatar: Dictionary returned by AnimationSynchronizerService
+            tolerance: Maximum absolute error per continuous channel
+
+        Returns:
+            Animated avatar information with the keyframe container path and
+            optimization statistics (compression ratio, max error)
+        """
+        animation_path = animated_avatar.get("animation_path")
+        if not animation_path:
+            # Basic animation has no per-frame channels to optimize
+            return animated_avatar
+
+        try:
+            keyframes_path = os.path.join(os.path.dirname(animation_path), "avatar_keyframes.anim")
+
+            # Curve simplification is CPU-bound: keep it off the event loop
+            stats = await asyncio.to_thread(
+                self._optimize_file,
+                animation_path,
+                keyframes_path,
+                self.tolerance if tolerance is None else tolerance
+            )
+
+            print(
+                f"Animation optimized: {stats['compression_ratio']:.1f}x smaller, "
+                f"max error {stats['max_error']:.4f}"
+            )
+
+            return {**animated_avatar, "keyframes_path": keyframes_path, "optimization": stats}
+
+        except Exception as e:
+            # Export can still use the dense per-frame animation
+            print(f"Error optimizing animation: {str(e)}")
+            return animated_avatar
+
+    def _optimize_file(self, animation_path: str, keyframes_path: str, tolerance: float) -> Dict[str, Any]:
+        clip = read_animation(animation_path)
+
+        channels: Dict[str, np.ndarray] = {}
+        encoding: Dict[str, Any] = {}
+        max_error = 0.0
+
+        # Keyframe times as frame indices, in the narrowest type that fits
+        time_dtype = np.uint16 if clip.frame_count <= np.iinfo(np.uint16).max else np.uint32
+
+        for name, values in clip.channels.items():
+            if np.issubdtype(values.dtype, np.integer):
+                keys = step_keyframes(values)
+                keyframes, channel_encoding, error = values[keys], {"interpolation": "step"}, 0.0
+            else:
+                keys, keyframes, channel_encoding, error = keyframe_curve(values, tolerance)
+
+            # Keyframes that are not smaller than the dense channel are not worth it
+            times = keys.astype(time_dtype)
+            if times.nbytes + keyframes.nbytes >= values.nbytes:
+                channels[name] = values
+                continue
+
+            channels[f"{name}.t"] = times
+            channels[name] = keyframes
+            encoding[name] = channel_encoding
+            max_error = max(max_error, error)
+
+        write_animation(
+            keyframes_path,
+            clip.fps,
+            channels,
+            metadata={**clip.metadata, "encoding": "keyframes", "channels": encoding, "tolerance": tolerance},
+            frame_count=clip.frame_count
+        )
+
+        original_size = os.path.getsize(animation_path)
+        optimized_size = os.path.getsize(keyframes_path)
+        keyframes = sum(len(channels[f"{name}.t"] if name in encoding else channels[name]) for name in clip.channels)
+
+        return {
+            "original_bytes": original_size,
+            "optimized_bytes": optimized_size,
+            "compression_ratio": round(original_size / max(optimized_size, 1), 2),
+            "max_error": round(max_error, 6),
+            "keyframes": keyframes,
+            "frames": clip.frame_count * len(clip.channels)
+        }
+
+
+def step_keyframes(values: np.ndarray) -> np.ndarray:
+    """
+    Frame indices where a discrete channel changes value (always includes frame 0).
+    """
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate([[0], np.nonzero(np.diff(values))[0] + 1])
+
+
+def keyframe_curve(values: np.ndarray, tolerance: float) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any], float]:
+    """
+    Simplifies and quantizes a continuous channel so that the linearly
+    interpolated keyframes stay within tolerance of every original frame.
+
+    Returns:
+        Tuple (keyframe indices, keyframe values, channel encoding, max error)
+    """
+    original = values.astype(np.float64)
+    minimum, scale, dtype = quantization_range(original, tolerance)
+
+    # Quantization error (half a step) is taken out of the simplification budget;
+    # it only reaches zero for constant channels, which quantize exactly
+    quantized = np.issubdtype(dtype, np.integer)
+    keys = simplify_curve(original, max(tolerance - scale / 2, 0.0) if quantized else tolerance)
+    if quantized:
+        keyframes = np.rint((original[keys] - minimum) / scale).astype(dtype)
+    else:
+        keyframes = original[keys].astype(dtype)
+
+    # Error of the reconstructed curve against every original frame
+    restored = np.interp(np.arange(len(original)), keys, keyframes * scale + minimum)
+    error = float(np.abs(restored - original).max()) if len(original) else 0.0
+
+    return keys, keyframes, {"interpolation": "linear", "offset": minimum, "scale": scale}, error
+
+
+def simplify_curve(values: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Ramer-Douglas-Peucker keyframe reduction with a bound on the absolute value
+    error. Instead of recursing segment by segment, each pass measures the error
+    of all segments at once and splits every segment above the tolerance at its
+    worst frame, so the number of Python-level iterations is logarithmic.
+
+    Returns:
+        Sorted frame indices of the kept keyframes
+    """
+    frame_count = len(values)
+    if frame_count <= 2:
+        return np.arange(frame_count)
+
+    frames = np.arange(frame_count)
+    keep = np.zeros(frame_count, dtype=bool)
+    keep[[0, -1]] = True
+
+    while True:
+        keys = np.nonzero(keep)[0]
+        error = np.abs(values - np.interp(frames, keys, values[keys]))
+
+        # Worst frame of each segment [keys[i], keys[i + 1])
+        segment = np.searchsorted(keys, frames, side="right") - 1
+        segment_max = np.maximum.reduceat(error, keys[:-1])
+        worst_error = segment_max[segment[:-1]]
+        candidates = np.nonzero((error[:-1] == worst_error) & (worst_error > tolerance))[0]
+        if len(candidates) == 0:
+            return keys
+
+        # A single split per segment (the first frame reaching its maximum)
+        first = np.unique(segment[candidates], return_index=True)[1]
+        keep[candidates[first]] = True
+
+
+def quantization_range(values: np.ndarray, tolerance: float) -> Tuple[float, float, type]:
+    """
+    Linear quantization over the value range of a channel: uint8 when half a
+    step fits in QUANTIZATION_BUDGET of the tolerance, uint16 when half a step
+    still leaves part of the tolerance to the simplification, float32 (no
+    quantization) otherwise.
+
+    Returns:
+        Tuple (offset, scale, dtype) with value = quantized * scale + offset
+    """
+    if len(values) == 0:
+        return 0.0, 1.0, np.uint8
+    minimum = float(values.min())
+    span = float(values.max()) - minimum
+    if span <= 0:
+        return minimum, 1.0, np.uint8
+
+    for dtype, budget in ((np.uint8, QUANTIZATION_BUDGET), (np.uint16, 1.0)):
+        scale = span / np.iinfo(dtype).max
+        if scale / 2 < budget * tolerance:
+            return minimum, scale, dtype
+    return 0.0, 1.0, np.float32
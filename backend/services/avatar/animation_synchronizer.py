@@ -1,6 +1,13 @@
 import os
-from typing import Dict, Any, List, Optional
-from core.config import settings
+import json
+import asyncio
+import numpy as np
+from typing import Dict, Any, Optional
+from services.audio.alignment import VISEMES, align_lyrics, viseme_track, voice_envelope
+from services.avatar.animation_format import write_animation
+
+# Frame rate of the generated animation tracks
+ANIMATION_FPS = 30
 
 class AnimationSynchronizerService:
     """
@@ -8,14 +15,15 @@ class AnimationSynchronizerService:
     Handles lip-syncing, emotional expressions, and movement coordination.
     """
     
-    def __init__(self):
-        pass
+    def __init__(self, music_analyzer=None):
+        self.music_analyzer = music_analyzer
         
     async def synchronize(
         self,
         avatar_base: Dict[str, Any],
         music_path: str,
-        output_dir: str
+        output_dir: str,
+        analysis: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Synchronizes avatar animations with music.
@@ -24,6 +32,7 @@ class AnimationSynchronizerService:
             avatar_base: Dictionary containing avatar base information
             music_path: Path to the music file
             output_dir: Directory to save synchronized avatar files
+            analysis: Music analysis already loaded by the caller (batches share one per music)
             
         Returns:
             Dictionary containing animated avatar information
@@ -32,30 +41,57 @@ class AnimationSynchronizerService:
             # Create output directory if it doesn't exist
             os.makedirs(output_dir, exist_ok=True)
             
-            # In production, would analyze music for beats, lyrics, and emotional cues
-            # Then apply appropriate animations to the avatar
+            # Beat, energy and section analysis (shared, cached next to the music)
+            if analysis is None and self.music_analyzer:
+                analysis = await self.music_analyzer.analyze(music_path)
+            if analysis is None:
+                return self._create_basic_animation(avatar_base, music_path, output_dir)
             
             # Log the synchronization process
-            print(f"Synchronizing avatar with music: {music_path}")
+            print(f"Synchronizing avatar with music: {music_path} ({analysis['tempo']:.1f} BPM)")
             print(f"Avatar style: {avatar_base.get('style', 'unknown')}")
             
-            # Create placeholder for animated avatar
-            animated_path = f"{output_dir}/avatar_animated.json"
+            # Lip-sync: lyrics aligned over the voice energy envelope
+            lip_sync = await asyncio.to_thread(self._align_lyrics, music_path, analysis)
+            np.savez(f"{output_dir}/lipsync.npz", **lip_sync)
             
-            # Write placeholder data
+            # Per-frame channels go into the binary container; the JSON keeps the metadata
+            channels = self._build_channels(analysis)
+            frame_times = np.arange(len(channels["head_bob"])) / ANIMATION_FPS
+            channels["viseme"] = viseme_track(lip_sync, frame_times)
+            
+            animation_path = write_animation(
+                f"{output_dir}/avatar_animated.anim",
+                ANIMATION_FPS,
+                channels,
+                metadata={
+                    "tempo": round(analysis["tempo"], 2),
+                    "beats": np.round(analysis["beats"], 3).tolist(),
+                    "sections": np.round(analysis["sections"], 3).tolist(),
+                    "visemes": list(VISEMES)
+                }
+            )
+            
+            animated_path = f"{output_dir}/avatar_animated.json"
             with open(animated_path, "w") as f:
-                f.write(f"""{{
-                    "base": {str(avatar_base)},
-                    "music_path": "{music_path}",
-                    "animations": {{
-                        "lip_sync": true,
-                        "emotional_expressions": true,
-                        "body_movements": true
-                    }}
-                }}""")
+                json.dump({
+                    "base": avatar_base,
+                    "music_path": music_path,
+                    "animation_path": animation_path,
+                    "fps": ANIMATION_FPS,
+                    "frame_count": len(frame_times),
+                    "duration": round(analysis["duration"], 3),
+                    "channels": list(channels),
+                    "animations": {
+                        "lip_sync": True,
+                        "emotional_expressions": True,
+                        "body_movements": True
+                    }
+                }, f)
             
             return {
                 "animated_path": animated_path,
+                "animation_path": animation_path,
                 "base_path": avatar_base.get("base_path"),
                 "preview_path": avatar_base.get("preview_path"),
                 "style": avatar_base.get("style"),
@@ -69,6 +105,57 @@ class AnimationSynchronizerService:
             # Return basic animation in case of error
             return self._create_basic_animation(avatar_base, music_path, output_dir)
     
+    def _align_lyrics(self, music_path: str, analysis: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Aligns lyrics.txt with the voice stem, falling back to the full mix
+        energy envelope when the voice intermediate is not available.
+        """
+        music_dir = os.path.dirname(music_path)
+        lyrics_path = os.path.join(music_dir, "lyrics.txt")
+        voice_path = os.path.join(music_dir, "voice.wav")
+        
+        lyrics = ""
+        if os.path.exists(lyrics_path):
+            with open(lyrics_path) as f:
+                lyrics = f.read()
+        
+        if os.path.exists(voice_path):
+            envelope, frame_rate = voice_envelope(voice_path)
+        else:
+            envelope, frame_rate = analysis["rms"], analysis["frame_rate"]
+        
+        return align_lyrics(lyrics, envelope, frame_rate)
+    
+    def _build_channels(self, analysis: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Turns the music analysis into per-frame animation curves.
+        """
+        frame_count = max(1, int(np.ceil(analysis["duration"] * ANIMATION_FPS)))
+        frame_times = np.arange(frame_count) / ANIMATION_FPS
+        
+        # Body movement follows the RMS energy envelope, resampled to the animation rate
+        rms = analysis["rms"]
+        analysis_times = np.arange(len(rms)) / analysis["frame_rate"]
+        energy = np.interp(frame_times, analysis_times, rms) if len(rms) else np.zeros(frame_count)
+        energy = energy / energy.max() if energy.max() > 0 else energy
+        
+        # Head bob peaks on every beat and decays until the next one
+        beats = analysis["beats"]
+        head_bob = np.zeros(frame_count)
+        if len(beats):
+            index = np.clip(np.searchsorted(beats, frame_times, side="right") - 1, 0, len(beats) - 1)
+            since_beat = np.where(frame_times >= beats[index], frame_times - beats[index], np.inf)
+            head_bob = np.exp(-since_beat * analysis["tempo"] / 20.0)
+        
+        # Expression changes at each section boundary
+        section = np.searchsorted(analysis["sections"], frame_times, side="right") - 1
+        
+        return {
+            "body_movement": energy.astype(np.float16),
+            "head_bob": head_bob.astype(np.float16),
+            "section": np.clip(section, 0, 255).astype(np.uint8)
+        }
+    
     def _create_basic_animation(
         self,
         avatar_base: Dict[str, Any],
@@ -83,18 +170,20 @@ class AnimationSynchronizerService:
         
         # Write placeholder data
         with open(animated_path, "w") as f:
-            f.write(f"""{{
-                "base": {str(avatar_base)},
-                "music_path": "{music_path}",
-                "animations": {{
-                    "lip_sync": true,
-                    "emotional_expressions": false,
-                    "body_movements": false
-                }}
-            }}""")
+            json.dump({
+                "base": avatar_base,
+                "music_path": music_path,
+                "animation_path": None,
+                "animations": {
+                    "lip_sync": True,
+                    "emotional_expressions": False,
+                    "body_movements": False
+                }
+            }, f)
         
         return {
             "animated_path": animated_path,
+            "animation_path": None,
             "base_path": avatar_base.get("base_path"),
             "preview_path": avatar_base.get("preview_path"),
             "style": avatar_base.get("style"),
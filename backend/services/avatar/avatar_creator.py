@@ -1,7 +1,10 @@
 import requests
+import json
 from typing import Dict, Any, Optional
 import os
 from core.config import settings
+from core.asset_cache import AssetCache
+from core.cache import make_cache_key
 
 class AvatarCreatorService:
     """
@@ -9,8 +12,9 @@ class AvatarCreatorService:
     or similar avatar creation APIs.
     """
     
-    def __init__(self):
+    def __init__(self, base_cache: Optional[AssetCache] = None):
         self.api_key = settings.READY_PLAYER_ME_API_KEY
+        self.base_cache = base_cache
         
     async def create(
         self,
@@ -98,26 +102,15 @@ class AvatarCreatorService:
         Creates avatar from textual description.
         In production, would use text-to-image and Ready Player Me APIs.
         """
-        # Simulate API call and processing time
-        # In production, would convert description to avatar via API
-        
-        # Create placeholder files
-        base_path = f"{output_dir}/avatar_base.json"
-        preview_path = f"{output_dir}/avatar_preview.png"
-        
-        # Write placeholder data
-        with open(base_path, "w") as f:
-            f.write(f"{{\"style\": \"{style}\", \"source\": \"description\", \"features\": {str(visual_data.get('features', {}))}}}")
-        
-        # Create empty preview file
-        with open(preview_path, "w") as f:
-            f.write("Placeholder for avatar preview image")
+        # Descriptions map to a handful of feature sets: reuse the cached base
+        features = visual_data.get('features', {})
+        paths = self._create_base(style, "description", features, output_dir)
         
         return {
-            "base_path": base_path,
-            "preview_path": preview_path,
+            "base_path": paths["avatar_base.json"],
+            "preview_path": paths["avatar_preview.png"],
             "style": style,
-            "features": visual_data.get('features', {}),
+            "features": features,
             "source_type": "description"
         }
     
@@ -129,10 +122,6 @@ class AvatarCreatorService:
         """
         Creates default avatar when no input is provided.
         """
-        # Create placeholder files
-        base_path = f"{output_dir}/avatar_base.json"
-        preview_path = f"{output_dir}/avatar_preview.png"
-        
         # Default features
         default_features = {
             "face_shape": "oval",
@@ -142,18 +131,57 @@ class AvatarCreatorService:
             "eye_color": "brown"
         }
         
-        # Write placeholder data
-        with open(base_path, "w") as f:
-            f.write(f"{{\"style\": \"{style}\", \"source\": \"default\", \"features\": {str(default_features)}}}")
-        
-        # Create empty preview file
-        with open(preview_path, "w") as f:
-            f.write("Placeholder for avatar preview image")
+        paths = self._create_base(style, "default", default_features, output_dir)
         
         return {
-            "base_path": base_path,
-            "preview_path": preview_path,
+            "base_path": paths["avatar_base.json"],
+            "preview_path": paths["avatar_preview.png"],
             "style": style,
             "features": default_features,
             "source_type": "default"
         }
+    
+    def _create_base(
+        self,
+        style: str,
+        source: str,
+        features: Dict[str, Any],
+        output_dir: str
+    ) -> Dict[str, str]:
+        """
+        Places the base avatar assets in output_dir. Identical (style, source,
+        features) combinations are generated once and hardlinked from the cache.
+        """
+        def build(directory: str) -> None:
+            self._write_base_assets(directory, style, source, features)
+        
+        if self.base_cache is None:
+            build(output_dir)
+            return {
+                "avatar_base.json": f"{output_dir}/avatar_base.json",
+                "avatar_preview.png": f"{output_dir}/avatar_preview.png"
+            }
+        
+        key = make_cache_key(style, source, json.dumps(features, sort_keys=True))
+        return self.base_cache.materialize(key, output_dir, build)
+    
+    def _write_base_assets(
+        self,
+        directory: str,
+        style: str,
+        source: str,
+        features: Dict[str, Any]
+    ) -> None:
+        """
+        Writes the base avatar files.
+        In production, would download the base model from Ready Player Me.
+        """
+        os.makedirs(directory, exist_ok=True)
+        
+        # Write placeholder data
+        with open(f"{directory}/avatar_base.json", "w") as f:
+            json.dump({"style": style, "source": source, "features": features}, f)
+        
+        # Create empty preview file
+        with open(f"{directory}/avatar_preview.png", "w") as f:
+            f.write("Placeholder for avatar preview image")
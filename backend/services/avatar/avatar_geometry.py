@@ -0,0 +1,158 @@
+import zlib
+import struct
+import numpy as np
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+# Mesh resolution and proportions per visual style
+STYLE_PROFILES = {
+    "realistic": {
+        "segments": 48, "rings": 32, "head": (0.10, 0.125, 0.11), "eye": (0.012, 0.012, 0.008),
+        "roughness": 0.6, "metallic": 0.0, "emissive": None
+    },
+    "cartoon": {
+        "segments": 24, "rings": 16, "head": (0.17, 0.17, 0.17), "eye": (0.03, 0.035, 0.015),
+        "roughness": 1.0, "metallic": 0.0, "emissive": None
+    },
+    "anime": {
+        "segments": 32, "rings": 24, "head": (0.13, 0.15, 0.13), "eye": (0.028, 0.04, 0.01),
+        "roughness": 0.8, "metallic": 0.0, "emissive": None
+    },
+    "futuristic": {
+        "segments": 32, "rings": 24, "head": (0.11, 0.13, 0.115), "eye": (0.015, 0.012, 0.008),
+        "roughness": 0.25, "metallic": 0.9, "emissive": (0.1, 0.8, 1.0)
+    }
+}
+
+SKIN_TONES = {
+    "light": (0.96, 0.84, 0.75), "medium": (0.82, 0.64, 0.52), "tan": (0.72, 0.53, 0.38), "dark": (0.45, 0.3, 0.2)
+}
+HAIR_COLORS = {
+    "black": (0.05, 0.04, 0.04), "brown": (0.3, 0.18, 0.1), "blonde": (0.9, 0.78, 0.45), "red": (0.6, 0.2, 0.1)
+}
+EYE_COLORS = {
+    "brown": (0.35, 0.2, 0.1), "blue": (0.2, 0.45, 0.8), "green": (0.25, 0.55, 0.3), "black": (0.05, 0.05, 0.05)
+}
+OUTFIT_COLORS = {
+    "realistic": ((0.15, 0.2, 0.3), (0.3, 0.35, 0.45)),
+    "cartoon": ((0.95, 0.35, 0.3), (1.0, 0.8, 0.2)),
+    "anime": ((0.2, 0.2, 0.5), (0.9, 0.9, 0.95)),
+    "futuristic": ((0.1, 0.1, 0.12), (0.1, 0.8, 1.0))
+}
+
+
+@lru_cache(maxsize=64)
+def ellipsoid(radii: Tuple[float, float, float], segments: int, rings: int) -> Tuple[np.ndarray, ...]:
+    """
+    UV ellipsoid built with vectorized NumPy. Cached per process, so every
+    avatar of the same style reuses the same arrays.
+
+    Returns:
+        Tuple (positions, normals, texcoords, indices)
+    """
+    theta = np.linspace(0.0, np.pi, rings + 1)[:, None]
+    phi = np.linspace(0.0, 2 * np.pi, segments + 1)[None, :]
+
+    unit = np.stack([
+        np.sin(theta) * np.cos(phi),
+        np.cos(theta) * np.ones_like(phi),
+        np.sin(theta) * np.sin(phi)
+    ], axis=-1).reshape(-1, 3)
+
+    radii_array = np.asarray(radii)
+    positions = (unit * radii_array).astype(np.float32)
+    normals = unit / radii_array
+    normals = (normals / np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-9)).astype(np.float32)
+
+    u, v = np.meshgrid(np.linspace(0, 1, segments + 1), np.linspace(0, 1, rings + 1))
+    texcoords = np.stack([u.ravel(), v.ravel()], axis=1).astype(np.float32)
+
+    # Two triangles per quad of the grid
+    row = np.arange(rings)[:, None] * (segments + 1)
+    column = np.arange(segments)[None, :]
+    a = (row + column).ravel()
+    b = a + segments + 1
+    indices = np.stack([a, b, a + 1, a + 1, b, b + 1], axis=1).reshape(-1, 3).astype(np.uint32)
+
+    for array in (positions, normals, texcoords, indices):
+        array.setflags(write=False)
+    return positions, normals, texcoords, indices
+
+
+def _png(pixels: np.ndarray) -> bytes:
+    # Minimal RGB PNG encoder (filter 0 on every row)
+    height, width, _ = pixels.shape
+    raw = b"".join(b"\0" + pixels[y].astype(np.uint8).tobytes() for y in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(raw, 9)),
+        chunk(b"IEND", b"")
+    ])
+
+
+@lru_cache(maxsize=16)
+def outfit_texture(style: str) -> bytes:
+    """
+    Small procedural gradient texture for the outfit, shared by every avatar of a style.
+    """
+    top, bottom = (np.asarray(color) for color in OUTFIT_COLORS.get(style, OUTFIT_COLORS["realistic"]))
+    blend = np.linspace(0.0, 1.0, 16)[:, None, None]
+    pixels = (top * (1 - blend) + bottom * blend) * 255.0
+    return _png(np.rint(np.broadcast_to(pixels, (16, 16, 3))))
+
+
+def _material(name: str, color, profile: Dict[str, Any], emissive=None) -> Dict[str, Any]:
+    material = {
+        "name": name,
+        "pbrMetallicRoughness": {
+            "baseColorFactor": [round(float(value), 4) for value in color] + [1.0],
+            "metallicFactor": profile["metallic"],
+            "roughnessFactor": profile["roughness"]
+        }
+    }
+    if emissive:
+        material["emissiveFactor"] = list(emissive)
+    return material
+
+
+def avatar_parts(style: str, features: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Describes the procedural avatar for a style and set of visual features:
+    one entry per node, with the ellipsoid to instantiate, its placement and material
+    (textured parts use outfit_texture). Parts in the "head" group follow the head
+    animation.
+    Symmetric parts (eyes, arms, legs) use the same geometry and material,
+    so the GLB writer stores them once.
+    """
+    profile = STYLE_PROFILES.get(style, STYLE_PROFILES["realistic"])
+    features = features or {}
+    segments, rings = profile["segments"], profile["rings"]
+
+    skin = _material("skin", SKIN_TONES.get(features.get("skin_tone"), SKIN_TONES["medium"]), profile)
+    hair = _material("hair", HAIR_COLORS.get(features.get("hair_color"), HAIR_COLORS["brown"]), profile)
+    eyes = _material(
+        "eyes", EYE_COLORS.get(features.get("eye_color"), EYE_COLORS["brown"]), profile, emissive=profile["emissive"]
+    )
+    outfit = _material("outfit", (1.0, 1.0, 1.0), profile)
+
+    head = profile["head"]
+    eye = profile["eye"]
+    hair_radii = (head[0] * 1.05, head[1] * (1.25 if features.get("hair_style") == "long" else 0.75), head[2] * 1.05)
+
+    detail = (segments // 2, rings // 2)
+    return [
+        {"name": "torso", "radii": (0.17, 0.3, 0.11), "detail": (segments, rings), "translation": (0, 1.25, 0), "material": outfit, "textured": True},
+        {"name": "head", "group": "head", "radii": head, "detail": (segments, rings), "translation": (0, 1.55 + head[1], 0), "material": skin},
+        {"name": "hair", "group": "head", "radii": hair_radii, "detail": (segments, rings), "translation": (0, 1.6 + head[1], -0.01), "material": hair},
+        {"name": "eye_left", "group": "head", "radii": eye, "detail": detail, "translation": (-head[0] * 0.4, 1.57 + head[1], head[2] * 0.92), "material": eyes},
+        {"name": "eye_right", "group": "head", "radii": eye, "detail": detail, "translation": (head[0] * 0.4, 1.57 + head[1], head[2] * 0.92), "material": eyes},
+        {"name": "arm_left", "radii": (0.045, 0.32, 0.045), "detail": detail, "translation": (-0.23, 1.22, 0), "material": outfit, "textured": True},
+        {"name": "arm_right", "radii": (0.045, 0.32, 0.045), "detail": detail, "translation": (0.23, 1.22, 0), "material": outfit, "textured": True},
+        {"name": "leg_left", "radii": (0.065, 0.45, 0.065), "detail": detail, "translation": (-0.09, 0.47, 0), "material": outfit, "textured": True},
+        {"name": "leg_right", "radii": (0.065, 0.45, 0.065), "detail": detail, "translation": (0.09, 0.47, 0), "material": outfit, "textured": True}
+    ]
@@ -0,0 +1,297 @@
+import json
+import struct
+import hashlib
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+# glTF constants
+GLB_MAGIC = 0x46546C67
+GLB_VERSION = 2
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+BYTE = 5120
+UNSIGNED_BYTE = 5121
+SHORT = 5122
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+FLOAT = 5126
+
+COMPONENT_TYPES = {
+    np.dtype("i1"): BYTE,
+    np.dtype("u1"): UNSIGNED_BYTE,
+    np.dtype("<i2"): SHORT,
+    np.dtype("<u2"): UNSIGNED_SHORT,
+    np.dtype("<u4"): UNSIGNED_INT,
+    np.dtype("<f4"): FLOAT
+}
+ACCESSOR_TYPES = {1: "SCALAR", 2: "VEC2", 3: "VEC3", 4: "VEC4"}
+
+QUANTIZATION_EXTENSION = "KHR_mesh_quantization"
+
+
+def _digest(*parts: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _pad_vertices(values: np.ndarray) -> np.ndarray:
+    # Vertex attributes must start every element on a 4-byte boundary:
+    # pad the component axis so each vertex is a multiple of 4 bytes
+    row_bytes = values.shape[1] * values.dtype.itemsize
+    padding = (-row_bytes % 4) // values.dtype.itemsize
+    if padding:
+        values = np.concatenate([values, np.zeros((len(values), padding), dtype=values.dtype)], axis=1)
+    return np.ascontiguousarray(values)
+
+
+def quantize_positions(positions: np.ndarray) -> Tuple[np.ndarray, List[float], List[float]]:
+    """
+    Quantizes positions to SHORT integers over their bounding box
+    (KHR_mesh_quantization). The returned translation and scale dequantize
+    them on the node: position = quantized * scale + translation.
+    """
+    minimum = positions.min(axis=0)
+    maximum = positions.max(axis=0)
+    center = (minimum + maximum) / 2
+    extent = float(np.max(maximum - minimum)) / 2 or 1.0
+    scale = extent / 32767.0
+    quantized = np.rint((positions - center) / scale).astype("<i2")
+    return quantized, center.astype(float).tolist(), [scale] * 3
+
+
+def quantize_normals(normals: np.ndarray) -> np.ndarray:
+    """
+    Quantizes unit normals to normalized BYTE components.
+    """
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    unit = normals / np.where(lengths > 0, lengths, 1.0)
+    return np.rint(unit * 127.0).astype("i1")
+
+
+def quantize_texcoords(texcoords: np.ndarray) -> np.ndarray:
+    """
+    Quantizes texture coordinates in [0, 1] to normalized UNSIGNED_SHORT.
+    """
+    return np.rint(np.clip(texcoords, 0.0, 1.0) * 65535.0).astype("<u2")
+
+
+class GLBBuilder:
+    """
+    Minimal glTF 2.0 binary writer.
+    All data goes into a single BIN chunk with 4-byte aligned buffer views.
+    Buffer views, accessors, meshes, materials, images and textures are
+    deduplicated by content, so identical parts are stored once per file.
+    """
+
+    def __init__(self):
+        self.gltf: Dict[str, Any] = {
+            "asset": {"version": "2.0", "generator": "Twinverse-AI"},
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "materials": [],
+            "images": [],
+            "textures": [],
+            "samplers": [],
+            "accessors": [],
+            "bufferViews": [],
+            "animations": [],
+            "buffers": []
+        }
+        self._chunks: List[bytes] = []
+        self._offset = 0
+        self._index: Dict[Tuple[str, str], int] = {}
+        self._extensions = set()
+
+    def _dedup(self, kind: str, key: str, create) -> int:
+        index = self._index.get((kind, key))
+        if index is None:
+            index = create()
+            self._index[(kind, key)] = index
+        return index
+
+    def _append(self, kind: str, item: Dict[str, Any]) -> int:
+        self.gltf[kind].append(item)
+        return len(self.gltf[kind]) - 1
+
+    def add_buffer_view(self, data: bytes, target: Optional[int] = None, byte_stride: Optional[int] = None) -> int:
+        """
+        Appends bytes to the BIN chunk (aligned to 4 bytes) and returns the buffer view.
+        """
+        def create() -> int:
+            padding = -self._offset % 4
+            if padding:
+                self._chunks.append(b"\0" * padding)
+                self._offset += padding
+            view = {"buffer": 0, "byteOffset": self._offset, "byteLength": len(data)}
+            if target is not None:
+                view["target"] = target
+            if byte_stride is not None:
+                view["byteStride"] = byte_stride
+            self._chunks.append(data)
+            self._offset += len(data)
+            return self._append("bufferViews", view)
+
+        key = _digest(data, f"{target}:{byte_stride}".encode())
+        return self._dedup("bufferView", key, create)
+
+    def add_accessor(
+        self,
+        values: np.ndarray,
+        target: Optional[int] = None,
+        normalized: bool = False,
+        components: Optional[int] = None,
+        bounds: bool = False
+    ) -> int:
+        """
+        Adds an accessor over a (count, components) or (count,) array.
+        Vertex attributes are padded so each element is 4-byte aligned.
+        """
+        values = np.asarray(values)
+        if values.ndim == 1:
+            values = values[:, None]
+        components = components or values.shape[1]
+        count = len(values)
+
+        stride = None
+        if target == ARRAY_BUFFER:
+            values = _pad_vertices(values)
+            if values.shape[1] != components:
+                stride = values.shape[1] * values.dtype.itemsize
+
+        view = self.add_buffer_view(np.ascontiguousarray(values).tobytes(), target, stride)
+
+        accessor = {
+            "bufferView": view,
+            "componentType": COMPONENT_TYPES[values.dtype.newbyteorder("<") if values.dtype.itemsize > 1 else values.dtype],
+            "count": count,
+            "type": ACCESSOR_TYPES[components]
+        }
+        if normalized:
+            accessor["normalized"] = True
+        if bounds:
+            used = values[:, :components]
+            cast = float if values.dtype.kind == "f" else int
+            accessor["min"] = [cast(value) for value in used.min(axis=0)]
+            accessor["max"] = [cast(value) for value in used.max(axis=0)]
+
+        key = json.dumps(accessor, sort_keys=True)
+        return self._dedup("accessor", key, lambda: self._append("accessors", accessor))
+
+    def add_image(self, data: bytes, mime_type: str = "image/png") -> int:
+        def create() -> int:
+            view = self.add_buffer_view(data)
+            return self._append("images", {"bufferView": view, "mimeType": mime_type})
+        return self._dedup("image", _digest(data), create)
+
+    def add_texture(self, image_data: bytes, mime_type: str = "image/png") -> int:
+        image = self.add_image(image_data, mime_type)
+
+        def create() -> int:
+            if not self.gltf["samplers"]:
+                self._append("samplers", {"magFilter": 9729, "minFilter": 9987})
+            return self._append("textures", {"source": image, "sampler": 0})
+        return self._dedup("texture", str(image), create)
+
+    def add_material(self, material: Dict[str, Any]) -> int:
+        key = json.dumps(material, sort_keys=True)
+        return self._dedup("material", key, lambda: self._append("materials", material))
+
+    def add_mesh(
+        self,
+        name: str,
+        positions: np.ndarray,
+        normals: np.ndarray,
+        indices: np.ndarray,
+        material: int,
+        texcoords: Optional[np.ndarray] = None
+    ) -> Tuple[int, List[float], List[float]]:
+        """
+        Adds a quantized triangle mesh.
+
+        Returns:
+            Tuple (mesh index, node translation, node scale); the node that
+            instantiates the mesh must apply the dequantization transform
+        """
+        self._extensions.add(QUANTIZATION_EXTENSION)
+        quantized, translation, scale = quantize_positions(positions)
+
+        attributes = {
+            "POSITION": self.add_accessor(quantized, ARRAY_BUFFER, components=3, bounds=True),
+            "NORMAL": self.add_accessor(quantize_normals(normals), ARRAY_BUFFER, normalized=True, components=3)
+        }
+        if texcoords is not None:
+            attributes["TEXCOORD_0"] = self.add_accessor(
+                quantize_texcoords(texcoords), ARRAY_BUFFER, normalized=True, components=2
+            )
+
+        index_dtype = "<u2" if len(positions) <= 65535 else "<u4"
+        primitive = {
+            "attributes": attributes,
+            "indices": self.add_accessor(indices.astype(index_dtype).ravel(), ELEMENT_ARRAY_BUFFER),
+            "material": material,
+            "mode": 4
+        }
+
+        # Identical geometry and material share one mesh, regardless of name
+        key = json.dumps(primitive, sort_keys=True)
+        mesh = self._dedup("mesh", key, lambda: self._append("meshes", {"name": name, "primitives": [primitive]}))
+        return mesh, translation, scale
+
+    def add_node(self, node: Dict[str, Any], parent: Optional[int] = None) -> int:
+        index = self._append("nodes", node)
+        if parent is None:
+            self.gltf["scenes"][0]["nodes"].append(index)
+        else:
+            self.gltf["nodes"][parent].setdefault("children", []).append(index)
+        return index
+
+    def add_animation(self, name: str, channels: List[Tuple[int, str, np.ndarray, np.ndarray]]) -> int:
+        """
+        Adds a linear animation. Each channel is (node, path, times, values).
+        """
+        samplers = []
+        targets = []
+        for node, path, times, values in channels:
+            input_accessor = self.add_accessor(times.astype("<f4"), bounds=True)
+            output_accessor = self.add_accessor(values.astype("<f4"))
+            samplers.append({"input": input_accessor, "output": output_accessor, "interpolation": "LINEAR"})
+            targets.append({"sampler": len(samplers) - 1, "target": {"node": node, "path": path}})
+        return self._append("animations", {"name": name, "samplers": samplers, "channels": targets})
+
+    def build(self) -> bytes:
+        """
+        Serializes the GLB: 12-byte header, JSON chunk (space padded) and
+        BIN chunk (zero padded), both 4-byte aligned.
+        """
+        binary = b"".join(self._chunks)
+        binary += b"\0" * (-len(binary) % 4)
+
+        # glTF arrays, scene node lists included, must not be empty when present
+        gltf = {key: value for key, value in self.gltf.items() if value != []}
+        gltf["scenes"] = [{key: value for key, value in scene.items() if value != []} for scene in gltf["scenes"]]
+        if binary:
+            gltf["buffers"] = [{"byteLength": len(binary)}]
+        if self._extensions:
+            gltf["extensionsUsed"] = sorted(self._extensions)
+            gltf["extensionsRequired"] = sorted(self._extensions)
+
+        json_chunk = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+        json_chunk += b" " * (-len(json_chunk) % 4)
+
+        length = 12 + 8 + len(json_chunk) + (8 + len(binary) if binary else 0)
+        parts = [
+            struct.pack("<III", GLB_MAGIC, GLB_VERSION, length),
+            struct.pack("<II", len(json_chunk), CHUNK_JSON),
+            json_chunk
+        ]
+        if binary:
+            parts += [struct.pack("<II", len(binary), CHUNK_BIN), binary]
+        return b"".join(parts)
@@ -1,121 +1,253 @@
 import os
-from typing import Dict, Any, List, Optional
+import copy
+import time
+import asyncio
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from core.config import settings
+from core.files import atomic_write
+from services.avatar.animation_format import read_animation
+from services.avatar.avatar_geometry import avatar_parts, ellipsoid, outfit_texture
+from services.avatar.gltf_writer import GLBBuilder
+
+# Output file name per export format
+EXPORT_FILES = {
+    "mp4": "avatar_video.mp4",
+    "glb": "avatar_model.glb",
+    "fbx": "avatar_model.fbx"
+}
+
+# Scenes already loaded by this worker process, keyed by animation path and mtime
+_loaded_animations: Dict[Tuple[str, int], Any] = {}
+
+def load_scene(animated_avatar: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Builds the scene representation shared by every export format: avatar
+    attributes plus the animation container to sample (keyframes when the
+    optimizer ran, dense per-frame channels otherwise).
+    Kept small and picklable so it can be sent to the export processes.
+    """
+    animation_path = animated_avatar.get("keyframes_path") or animated_avatar.get("animation_path")
+
+    scene = {
+        "style": animated_avatar.get("style"),
+        "features": animated_avatar.get("features"),
+        "base_path": animated_avatar.get("base_path"),
+        "animation_path": animation_path,
+        "animation_mtime": os.stat(animation_path).st_mtime_ns if animation_path else None,
+        "fps": None,
+        "frame_count": 0,
+        "channels": []
+    }
+
+    if animation_path:
+        clip = read_animation(animation_path)
+        scene["fps"] = clip.fps
+        scene["frame_count"] = clip.frame_count
+        scene["channels"] = list(clip.channels)
+
+    return scene
+
+def _scene_animation(scene: Dict[str, Any]):
+    # The container is memory-mapped once per process; the OS page cache
+    # shares its pages between all export processes
+    if not scene["animation_path"]:
+        return None
+    key = (scene["animation_path"], scene["animation_mtime"])
+    if key not in _loaded_animations:
+        _loaded_animations.clear()
+        _loaded_animations[key] = read_animation(scene["animation_path"])
+    return _loaded_animations[key]
+
+def _export_format(format: str, scene: Dict[str, Any], output_path: str) -> Tuple[str, float]:
+    """
+    Exports one format. Module-level so it can run in a worker process of the
+    export pool; the output is written atomically.
+
+    Returns:
+        Tuple (output path, seconds spent)
+    """
+    started_at = time.perf_counter()
+    animation = _scene_animation(scene)
+
+    if format == "mp4":
+        _write_video(scene, animation, output_path)
+    elif format == "glb":
+        _write_glb(scene, animation, output_path)
+    elif format == "fbx":
+        _write_fbx(scene, animation, output_path)
+    else:
+        raise ValueError(f"Unsupported export format: {format}")
+
+    return output_path, round(time.perf_counter() - started_at, 3)
+
+def _write_video(scene: Dict[str, Any], animation, output_path: str) -> None:
+    # In production, would render the 3D avatar to video
+    # For now, create a placeholder file
+    with atomic_write(output_path, "w") as f:
+        f.write(f"Placeholder for avatar video in MP4 format. Style: {scene['style']}")
+
+def _write_glb(scene: Dict[str, Any], animation, output_path: str) -> None:
+    data = build_avatar_glb(scene, animation)
+    with atomic_write(output_path) as f:
+        f.write(data)
+
+def _channel_curve(animation, name: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    # (times, values) of a continuous channel, from keyframes or dense frames
+    if animation is None or name not in animation.channels:
+        return None
+    values = animation.channels[name]
+    encoding = animation.metadata.get("channels", {}).get(name)
+    if encoding:
+        times = animation.channels[f"{name}.t"].astype(np.float32) / animation.fps
+        values = values.astype(np.float32) * encoding["scale"] + encoding["offset"]
+    else:
+        times = np.arange(len(values), dtype=np.float32) / animation.fps
+        values = values.astype(np.float32)
+    if len(times) < 2:
+        return None
+    return times, values
+
+def build_avatar_glb(scene: Dict[str, Any], animation=None) -> bytes:
+    """
+    Builds the avatar GLB: procedural per-style meshes with quantized
+    attributes, one texture per style and, when available, head bob and
+    body movement animations sampled from the animation container.
+    """
+    builder = GLBBuilder()
+    style = scene["style"] or "realistic"
+
+    root = builder.add_node({"name": "avatar"})
+    groups = {"head": builder.add_node({"name": "head_group"}, parent=root)}
+
+    for part in avatar_parts(style, scene["features"]):
+        material = copy.deepcopy(part["material"])
+        if part.get("textured"):
+            material["pbrMetallicRoughness"]["baseColorTexture"] = {
+                "index": builder.add_texture(outfit_texture(style))
+            }
+
+        positions, normals, texcoords, indices = ellipsoid(part["radii"], *part["detail"])
+        mesh, center, scale = builder.add_mesh(
+            part["name"], positions, normals, indices, builder.add_material(material), texcoords
+        )
+
+        # The node applies the dequantization transform of the mesh
+        builder.add_node({
+            "name": part["name"],
+            "mesh": mesh,
+            "translation": [float(a + b) for a, b in zip(part["translation"], center)],
+            "scale": scale
+        }, parent=groups.get(part.get("group"), root))
+
+    channels = []
+    head_bob = _channel_curve(animation, "head_bob")
+    if head_bob:
+        times, values = head_bob
+        translation = np.zeros((len(values), 3), dtype=np.float32)
+        translation[:, 1] = -0.015 * values
+        channels.append((groups["head"], "translation", times, translation))
+
+    body_movement = _channel_curve(animation, "body_movement")
+    if body_movement:
+        times, values = body_movement
+        channels.append((root, "scale", times, np.repeat((1.0 + 0.02 * values)[:, None], 3, axis=1)))
+
+    if channels:
+        builder.add_animation("music_sync", channels)
+
+    return builder.build()
+
+def _write_fbx(scene: Dict[str, Any], animation, output_path: str) -> None:
+    # In production, would convert the avatar to FBX format
+    # For now, create a placeholder file
+    with atomic_write(output_path, "w") as f:
+        f.write(f"Placeholder for avatar 3D model in FBX format. Style: {scene['style']}")
 
 class ModelExporterService:
     """
     Service responsible for exporting animated avatars as video and 3D model files.
     Handles rendering, format conversion, and optimization.
+    Formats are independent, so they are exported concurrently in a process pool.
     """
-    
+
     def __init__(self):
-        pass
-        
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
     async def export(
         self,
         animated_avatar: Dict[str, Any],
         formats: List[str] = ["mp4", "glb"],
-        output_dir: str = None
+        output_dir: str = None,
+        on_format_exported: Optional[Callable[[str, float], None]] = None
     ) -> Dict[str, str]:
         """
         Exports animated avatar as video and 3D model files.
-        
+
         Args:
             animated_avatar: Dictionary containing animated avatar information
             formats: List of export formats (mp4, glb, fbx)
             output_dir: Directory to save exported files
-            
+            on_format_exported: Called with the format and its export time in seconds
+
         Returns:
             Dictionary containing paths to exported files
         """
+        formats = [format.lower() for format in formats if format.lower() in EXPORT_FILES]
+
         try:
             # Use provided output directory or default from animated avatar
             if output_dir is None:
                 output_dir = os.path.dirname(animated_avatar.get("animated_path", ""))
-            
+
             # Create output directory if it doesn't exist
             os.makedirs(output_dir, exist_ok=True)
-            
+
             # Log the export process
             print(f"Exporting avatar in formats: {formats}")
             print(f"Output directory: {output_dir}")
-            
-            # Initialize result dictionary
-            result = {}
-            
-            # Export in each requested format
-            for format in formats:
-                if format.lower() == "mp4":
-                    result["mp4"] = await self._export_video(animated_avatar, output_dir)
-                elif format.lower() == "glb":
-                    result["glb"] = await self._export_glb(animated_avatar, output_dir)
-                elif format.lower() == "fbx":
-                    result["fbx"] = await self._export_fbx(animated_avatar, output_dir)
-            
-            return result
-                
+
+            # Load the scene once; every format exports from it
+            scene = load_scene(animated_avatar)
+
+            loop = asyncio.get_running_loop()
+            pool = self._get_process_pool()
+
+            async def export_format(format: str) -> Tuple[str, str]:
+                path, seconds = await loop.run_in_executor(
+                    pool,
+                    _export_format,
+                    format,
+                    scene,
+                    os.path.join(output_dir, EXPORT_FILES[format])
+                )
+                if on_format_exported:
+                    on_format_exported(format, seconds)
+                return format, path
+
+            exported = await asyncio.gather(*(export_format(format) for format in formats))
+
+            return dict(exported)
+
         except Exception as e:
             print(f"Error exporting avatar: {str(e)}")
             # Return basic export in case of error
             return self._create_placeholder_exports(formats, output_dir)
-    
-    async def _export_video(
-        self,
-        animated_avatar: Dict[str, Any],
-        output_dir: str
-    ) -> str:
-        """
-        Exports animated avatar as MP4 video.
-        In production, would use 3D rendering and video encoding.
-        """
-        # Create placeholder video file
-        video_path = f"{output_dir}/avatar_video.mp4"
-        
-        # In production, would render 3D avatar to video
-        # For now, create a placeholder file
-        with open(video_path, "w") as f:
-            f.write(f"Placeholder for avatar video in MP4 format. Style: {animated_avatar.get('style')}")
-        
-        return video_path
-    
-    async def _export_glb(
-        self,
-        animated_avatar: Dict[str, Any],
-        output_dir: str
-    ) -> str:
-        """
-        Exports animated avatar as GLB 3D model.
-        In production, would use 3D model conversion tools.
-        """
-        # Create placeholder GLB file
-        glb_path = f"{output_dir}/avatar_model.glb"
-        
-        # In production, would convert avatar to GLB format
-        # For now, create a placeholder file
-        with open(glb_path, "w") as f:
-            f.write(f"Placeholder for avatar 3D model in GLB format. Style: {animated_avatar.get('style')}")
-        
-        return glb_path
-    
-    async def _export_fbx(
-        self,
-        animated_avatar: Dict[str, Any],
-        output_dir: str
-    ) -> str:
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=settings.EXPORT_WORKERS)
+        return self._process_pool
+
+    def close(self) -> None:
         """
-        Exports animated avatar as FBX 3D model.
-        In production, would use 3D model conversion tools.
+        Shuts down the export pool, if it was started.
         """
-        # Create placeholder FBX file
-        fbx_path = f"{output_dir}/avatar_model.fbx"
-        
-        # In production, would convert avatar to FBX format
-        # For now, create a placeholder file
-        with open(fbx_path, "w") as f:
-            f.write(f"Placeholder for avatar 3D model in FBX format. Style: {animated_avatar.get('style')}")
-        
-        return fbx_path
-    
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
     def _create_placeholder_exports(
         self,
         formats: List[str],
@@ -125,22 +257,11 @@ class ModelExporterService:
         Creates placeholder export files when export fails.
         """
         result = {}
-        
+
         for format in formats:
-            if format.lower() == "mp4":
-                video_path = f"{output_dir}/avatar_video.mp4"
-                with open(video_path, "w") as f:
-                    f.write("Placeholder for avatar video (error recovery)")
-                result["mp4"] = video_path
-            elif format.lower() == "glb":
-                glb_path = f"{output_dir}/avatar_model.glb"
-                with open(glb_path, "w") as f:
-                    f.write("Placeholder for avatar 3D model in GLB format (error recovery)")
-                result["glb"] = glb_path
-            elif format.lower() == "fbx":
-                fbx_path = f"{output_dir}/avatar_model.fbx"
-                with open(fbx_path, "w") as f:
-                    f.write("Placeholder for avatar 3D model in FBX format (error recovery)")
-                result["fbx"] = fbx_path
-        
+            path = os.path.join(output_dir, EXPORT_FILES[format])
+            with atomic_write(path, "w") as f:
+                f.write(f"Placeholder for avatar {format.upper()} export (error recovery)")
+            result[format] = path
+
         return result
@@ -1,6 +1,5 @@
 import requests
 from typing import Optional, Dict, Any
-from fastapi import UploadFile
 import os
 from core.config import settings
 
@@ -16,7 +15,7 @@ class VisualProcessorService:
     async def process(
         self,
         description: Optional[str] = None,
-        image_file: Optional[UploadFile] = None,
+        image_path: Optional[str] = None,
         style: str = "realistic"
     ) -> Dict[str, Any]:
         """
@@ -24,7 +23,7 @@ class VisualProcessorService:
         
         Args:
             description: Textual description of desired avatar appearance
-            image_file: User's selfie or reference image
+            image_path: Path of the user's selfie or reference image (already on disk)
             style: Visual style (realistic, cartoon, anime, futuristic)
             
         Returns:
@@ -35,9 +34,9 @@ class VisualProcessorService:
             os.makedirs(settings.TEMP_DIR, exist_ok=True)
             
             # Process based on input type
-            if image_file:
+            if image_path:
                 # Process uploaded image
-                return await self._process_image(image_file, style)
+                return await self._process_image(image_path, style)
             elif description:
                 # Process textual description
                 return await self._process_description(description, style)
@@ -50,17 +49,11 @@ class VisualProcessorService:
             # Return default features in case of error
             return self._generate_default_avatar(style)
     
-    async def _process_image(self, image_file: UploadFile, style: str) -> Dict[str, Any]:
+    async def _process_image(self, image_path: str, style: str) -> Dict[str, Any]:
         """
         Processes uploaded image to extract features.
         In production, would use computer vision APIs.
         """
-        # Save uploaded file temporarily
-        temp_path = f"{settings.TEMP_DIR}/{image_file.filename}"
-        with open(temp_path, "wb") as f:
-            content = await image_file.read()
-            f.write(content)
-        
         # In production, would call vision API to extract features
         # For now, return simulated features
         return {
@@ -78,7 +71,7 @@ class VisualProcessorService:
                     "mouth": "medium"
                 }
             },
-            "source_path": temp_path
+            "source_path": image_path
         }
     
     async def _process_description(self, description: str, style: str) -> Dict[str, Any]:
@@ -1,7 +1,6 @@
-import openai
 from typing import Dict, Any, Optional
 import os
-from core.config import settings
+from core.llm_client import LLMClient, get_llm_client
 
 class ScreenplayGeneratorService:
     """
@@ -9,8 +8,8 @@ class ScreenplayGeneratorService:
     based on music and avatar.
     """
     
-    def __init__(self):
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+    def __init__(self, llm_client: Optional[LLMClient] = None):
+        self.llm_client = llm_client or get_llm_client()
         
     async def generate(
         self,
@@ -66,7 +65,7 @@ class ScreenplayGeneratorService:
             Format the screenplay with scene descriptions, character actions, and minimal dialogue.
             """
             
-            # In production, would call OpenAI API
+            # In production, would call self.llm_client.chat with the prompt
             # For now, generate a placeholder screenplay
             screenplay_text = self._generate_placeholder_screenplay(lyrics)
             
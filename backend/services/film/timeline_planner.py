@@ -0,0 +1,122 @@
+import numpy as np
+from typing import Dict, Any, List, Optional
+from core.config import settings
+
+def _bar_grid(beats: np.ndarray, duration: float, beats_per_bar: int) -> np.ndarray:
+    # Bar starts strictly inside the track (candidate scene boundaries)
+    bars = np.asarray(beats, dtype=np.float64)[::beats_per_bar]
+    return bars[(bars > 0.0) & (bars < duration)]
+
+def plan_scenes(
+    scene_count: int,
+    duration: float,
+    beats: Optional[np.ndarray] = None,
+    sections: Optional[np.ndarray] = None,
+    beats_per_bar: int = 4
+) -> List[Dict[str, Any]]:
+    """
+    Splits [0, duration) into scene_count consecutive scenes of roughly equal
+    length whose boundaries fall on bar starts. A section start close to an
+    ideal boundary (within FILM_SECTION_SNAP_BARS bars) wins over the nearest
+    bar, so cuts follow the structure of the song. Without a usable bar grid
+    the track is split evenly.
+    """
+    if scene_count <= 0:
+        return []
+
+    grid = _bar_grid(beats if beats is not None else np.zeros(0), duration, beats_per_bar)
+    boundaries = [0.0]
+
+    if len(grid) >= scene_count - 1:
+        bar_length = float(np.median(np.diff(grid))) if len(grid) > 1 else duration
+        section_starts = np.asarray(sections if sections is not None else [], dtype=np.float64)
+        is_section = np.array([np.isclose(section_starts, bar, atol=1e-3).any() for bar in grid], dtype=bool)
+        snap_window = settings.FILM_SECTION_SNAP_BARS * bar_length
+
+        previous = -1
+        for k in range(1, scene_count):
+            ideal = k * duration / scene_count
+            # Leave at least one bar for each remaining scene
+            candidates = np.arange(previous + 1, len(grid) - (scene_count - 1 - k))
+            distances = np.abs(grid[candidates] - ideal)
+            near_sections = is_section[candidates] & (distances <= snap_window)
+            if near_sections.any():
+                choice = candidates[near_sections][np.argmin(distances[near_sections])]
+            else:
+                choice = candidates[np.argmin(distances)]
+            boundaries.append(float(grid[choice]))
+            previous = choice
+    else:
+        bar_length = None
+        boundaries.extend(k * duration / scene_count for k in range(1, scene_count))
+
+    boundaries.append(duration)
+    # Round the cuts before taking differences, so the rounded durations add up to the track length
+    boundaries = [round(boundary, 3) for boundary in boundaries]
+
+    scenes = []
+    for index, (start, end) in enumerate(zip(boundaries[:-1], boundaries[1:])):
+        scenes.append({
+            "order": index + 1,
+            "start": start,
+            "end": end,
+            "duration": round(end - start, 3),
+            "bars": int(round((end - start) / bar_length)) if bar_length else None
+        })
+
+    return scenes
+
+class TimelinePlannerService:
+    """
+    Service responsible for planning the film timeline from the music:
+    scene durations add up to the track length and scene cuts snap to bars
+    and section starts, so scenes are rendered with exactly the footage the
+    edit will use.
+    """
+
+    def __init__(self, music_analyzer=None):
+        self.music_analyzer = music_analyzer
+
+    async def plan(self, music_path: str, scene_count: int) -> Dict[str, Any]:
+        """
+        Plans the scene durations for a film over the given music.
+
+        Args:
+            music_path: Path to the music file
+            scene_count: Number of scenes in the storyboard
+
+        Returns:
+            Dictionary containing the film duration, tempo and the planned
+            scenes (start, end, duration and bar count of each one)
+        """
+        # Beat and section analysis (shared, cached next to the music)
+        analysis = await self.music_analyzer.analyze(music_path) if self.music_analyzer else None
+
+        if analysis is None or analysis["duration"] <= 0:
+            # Unanalyzable music: fall back to an even split of the default length
+            duration = settings.FILM_DEFAULT_DURATION
+            print(f"Planning film timeline without music analysis: {scene_count} scenes over {duration}s")
+            return {
+                "duration": duration,
+                "tempo": None,
+                "source": "default",
+                "scenes": plan_scenes(scene_count, duration)
+            }
+
+        duration = round(float(analysis["duration"]), 3)
+        scenes = plan_scenes(
+            scene_count,
+            duration,
+            analysis["beats"],
+            analysis["sections"],
+            settings.FILM_BEATS_PER_BAR
+        )
+
+        print(f"Planning film timeline: {scene_count} scenes over {duration}s ({analysis['tempo']:.1f} BPM)")
+
+        return {
+            "duration": duration,
+            "tempo": round(float(analysis["tempo"]), 2),
+            "source": "analysis",
+            "scenes": scenes
+        }
@@ -1,16 +1,91 @@
 import os
-from typing import Dict, Any, List, Optional
+import json
+import shutil
+import asyncio
+import hashlib
+import subprocess
+from typing import Dict, Any, List
 from core.config import settings
+from core.files import atomic_write, file_sha256
+
+# Version of the segment encoding; bump to force every segment to be re-encoded
+TIMELINE_VERSION = 1
+
+def _segment_key(source_hash: str, in_point: float, out_point: float) -> str:
+    # A segment only depends on its source content, trim points and the encoding profile
+    profile = [TIMELINE_VERSION, settings.FILM_RESOLUTION, settings.FILM_FPS, settings.FILM_VIDEO_CRF]
+    payload = json.dumps([source_hash, round(in_point, 3), round(out_point, 3), profile])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _run_ffmpeg(arguments: List[str], description: str) -> None:
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-y", *arguments],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to {description}: {result.stderr.decode(errors='ignore').strip()}")
+
+def encode_segment(source_path: str, in_point: float, out_point: float, segment_path: str) -> str:
+    """
+    Trims a scene to [in_point, out_point) and encodes it with the fixed film
+    profile (resolution, frame rate, pixel format, codec and timescale), so
+    all segments can be concatenated without re-encoding.
+    """
+    width, height = settings.FILM_RESOLUTION.split("x")
+    temp_path = f"{segment_path}.tmp.mp4"
+    _run_ffmpeg([
+        "-ss", f"{in_point:.3f}", "-i", source_path, "-t", f"{out_point - in_point:.3f}",
+        "-vf", (
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,fps={settings.FILM_FPS},format=yuv420p"
+        ),
+        "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "high", "-crf", str(settings.FILM_VIDEO_CRF),
+        "-video_track_timescale", "90000", "-an", temp_path
+    ], f"encode segment {segment_path}")
+    os.replace(temp_path, segment_path)
+    return segment_path
+
+def remux_film(segment_paths: List[str], music_path: str, output_path: str) -> str:
+    """
+    Concatenates the segments in copy mode and muxes the music track, which
+    starts with the first frame (the timeline covers the track from 0).
+    Only the audio is encoded.
+    """
+    list_path = f"{output_path}.segments.txt"
+    with open(list_path, "w") as f:
+        for path in segment_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    
+    temp_path = f"{output_path}.tmp.mp4"
+    try:
+        _run_ffmpeg([
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-i", music_path,
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy", "-c:a", "aac", "-b:a", settings.AUDIO_BITRATE,
+            "-shortest", "-movflags", "+faststart", temp_path
+        ], f"remux {output_path}")
+        os.replace(temp_path, output_path)
+    finally:
+        for path in (list_path, temp_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return output_path
 
 class VideoEditorService:
     """
     Service responsible for editing the final short film by combining
     generated scenes, music, and avatar.
+    Edits are incremental: a timeline manifest records each scene's content
+    hash and in/out points, only segments whose inputs changed are
+    re-encoded, and the film is remuxed from the segments in copy mode.
     """
     
     def __init__(self):
         pass
-        
+    
     async def edit(
         self,
         scenes: List[Dict[str, Any]],
@@ -26,7 +101,7 @@ class VideoEditorService:
             music_path: Path to the music file
             avatar_path: Path to the avatar video file
             output_path: Path to save the final film
-            
+        
         Returns:
             Dictionary containing final film information
         """
@@ -40,34 +115,136 @@ class VideoEditorService:
             print(f"Avatar: {avatar_path}")
             print(f"Output: {output_path}")
             
-            # In production, would use FFmpeg or similar to combine videos
-            # For now, create a placeholder final video
-            
             # Calculate total duration
-            total_duration = sum(scene.get("duration", 30) for scene in scenes)
+            total_duration = sum(
+                scene.get("out_point", scene["duration"]) - scene.get("in_point", 0.0)
+                for scene in scenes
+            )
             
-            # Create placeholder final film file
-            with open(output_path, "w") as f:
-                f.write(f"""Placeholder for final film video
+            if shutil.which("ffmpeg") is None:
+                # No encoder available: create a placeholder final video
+                with open(output_path, "w") as f:
+                    f.write(f"""Placeholder for final film video
 Contains {len(scenes)} scenes
 Total duration: {total_duration} seconds
 Music: {os.path.basename(music_path)}
 Avatar: {os.path.basename(avatar_path)}
 """)
+                edit_stats = {}
+            else:
+                edit_stats = await self._render_incremental(scenes, music_path, output_path)
             
             return {
                 "file_path": output_path,
                 "duration": total_duration,
                 "scene_count": len(scenes),
                 "music_path": music_path,
-                "avatar_path": avatar_path
+                "avatar_path": avatar_path,
+                **edit_stats
             }
-                
+        
         except Exception as e:
             print(f"Error editing final film: {str(e)}")
             # Create basic film in case of error
             return self._create_basic_film(music_path, avatar_path, output_path)
     
+    async def _render_incremental(
+        self,
+        scenes: List[Dict[str, Any]],
+        music_path: str,
+        output_path: str
+    ) -> Dict[str, Any]:
+        """
+        Re-encodes only the segments whose scene content or trim points changed
+        since the last edit, then remuxes the film if anything changed.
+        """
+        film_dir = os.path.dirname(output_path)
+        timeline_path = f"{film_dir}/timeline.json"
+        segments_dir = f"{film_dir}/segments"
+        os.makedirs(segments_dir, exist_ok=True)
+        
+        previous = self._load_timeline(timeline_path)
+        
+        # Hash sources off the event loop (scene files can be large)
+        source_hashes = await asyncio.gather(*(
+            asyncio.to_thread(file_sha256, scene["file_path"]) for scene in scenes
+        ))
+        music_hash = await asyncio.to_thread(file_sha256, music_path)
+        
+        entries = []
+        for index, (scene, source_hash) in enumerate(zip(scenes, source_hashes)):
+            in_point = float(scene.get("in_point", 0.0))
+            out_point = float(scene.get("out_point", scene["duration"]))
+            key = _segment_key(source_hash, in_point, out_point)
+            entries.append({
+                "order": index + 1,
+                "title": scene.get("title"),
+                "source_path": scene["file_path"],
+                "source_hash": source_hash,
+                "in_point": in_point,
+                "out_point": out_point,
+                "segment_key": key,
+                "segment_path": f"{segments_dir}/segment_{key[:16]}.mp4"
+            })
+        
+        # Segments are addressed by key: unchanged scenes (even if reordered) reuse theirs
+        changed = [entry for entry in entries if not os.path.exists(entry["segment_path"])]
+        semaphore = asyncio.Semaphore(settings.EDIT_MAX_CONCURRENCY)
+        
+        async def encode(entry: Dict[str, Any]) -> None:
+            async with semaphore:
+                await asyncio.to_thread(
+                    encode_segment, entry["source_path"], entry["in_point"], entry["out_point"], entry["segment_path"]
+                )
+        
+        await asyncio.gather(*(encode(entry) for entry in changed))
+        
+        audio = {"path": music_path, "hash": music_hash}
+        film_key = hashlib.sha256(
+            json.dumps([[entry["segment_key"] for entry in entries], music_hash]).encode("utf-8")
+        ).hexdigest()
+        
+        # Remux only if the segment sequence or the audio changed
+        remuxed = previous.get("film_key") != film_key or not os.path.exists(output_path)
+        if remuxed:
+            await asyncio.to_thread(
+                remux_film, [entry["segment_path"] for entry in entries], music_path, output_path
+            )
+        
+        with atomic_write(timeline_path, "w") as f:
+            json.dump({
+                "version": TIMELINE_VERSION,
+                "film_key": film_key,
+                "output_path": output_path,
+                "audio": audio,
+                "scenes": entries
+            }, f, indent=2)
+        
+        # Drop segments no longer referenced by the timeline
+        referenced = {os.path.basename(entry["segment_path"]) for entry in entries}
+        for name in os.listdir(segments_dir):
+            if name not in referenced:
+                os.remove(os.path.join(segments_dir, name))
+        
+        print(f"Film edit: {len(changed)} of {len(entries)} segments re-encoded, remuxed: {remuxed}")
+        
+        return {
+            "timeline_path": timeline_path,
+            "segments_reencoded": [entry["segment_key"] for entry in changed],
+            "segments_reused": [entry["segment_key"] for entry in entries if entry not in changed],
+            "remuxed": remuxed
+        }
+    
+    def _load_timeline(self, timeline_path: str) -> Dict[str, Any]:
+        try:
+            with open(timeline_path, "r", encoding="utf-8") as f:
+                timeline = json.load(f)
+            if timeline.get("version") == TIMELINE_VERSION:
+                return timeline
+        except (OSError, ValueError):
+            pass
+        return {}
+    
     def _create_basic_film(
         self,
         music_path: str,
@@ -1,8 +1,22 @@
+import asyncio
 import requests
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Any, List, Optional
 import os
 from core.config import settings
 
+def _render_scene_locally(title: str, duration: float, scene_path: str) -> str:
+    """
+    Renders a scene video of the given duration on the local machine.
+    Module-level so it can run in a worker process of the render pool.
+    """
+    # In production, would render the scene with a local video model
+    # For now, create placeholder video files
+    with open(scene_path, "w") as f:
+        f.write(f"Placeholder for scene video: {title} ({duration}s)")
+    
+    return scene_path
+
 class VideoGeneratorService:
     """
     Service responsible for generating video scenes based on screenplay and storyboard.
@@ -11,12 +25,19 @@ class VideoGeneratorService:
     
     def __init__(self):
         self.api_key = settings.RUNWAY_API_KEY
+        self.backend = settings.VIDEO_BACKEND
+        self.max_concurrency = settings.VIDEO_MAX_CONCURRENCY
+        self.max_attempts = settings.VIDEO_SCENE_MAX_ATTEMPTS
+        self._process_pool: Optional[ProcessPoolExecutor] = None
         
     async def generate(
         self,
         screenplay: Dict[str, Any],
         storyboard: Dict[str, Any],
-        output_dir: str
+        output_dir: str,
+        timeline: Optional[List[Dict[str, Any]]] = None,
+        completed_scenes: Optional[Dict[int, Dict[str, Any]]] = None,
+        on_scene_generated: Optional[Callable[[int, Dict[str, Any]], None]] = None
     ) -> List[Dict[str, Any]]:
         """
         Generates video scenes based on screenplay and storyboard.
@@ -25,6 +46,10 @@ class VideoGeneratorService:
             screenplay: Dictionary containing screenplay information
             storyboard: Dictionary containing storyboard information
             output_dir: Directory to save generated scene videos
+            timeline: Planned scenes (see TimelinePlannerService); each scene is
+                rendered with exactly its planned duration
+            completed_scenes: Scenes already rendered in a previous run, by index (skipped)
+            on_scene_generated: Called with (index, scene) as soon as each scene is rendered
             
         Returns:
             List of dictionaries containing scene information
@@ -39,25 +64,40 @@ class VideoGeneratorService:
             
             # Get key scenes from storyboard
             scenes = storyboard.get("scenes", [])
+            durations = self._scene_durations(len(scenes), timeline)
             
-            # Generate video for each scene
-            generated_scenes = []
+            # Render scenes concurrently, bounded by max_concurrency
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            generated_scenes: List[Optional[Dict[str, Any]]] = [None] * len(scenes)
+            completed_scenes = completed_scenes or {}
+            for i, scene in completed_scenes.items():
+                if i < len(scenes):
+                    generated_scenes[i] = scene
+            pending = [i for i in range(len(scenes)) if generated_scenes[i] is None]
             
-            for i, scene in enumerate(scenes):
-                scene_path = f"{output_dir}/scene_{i+1}.mp4"
+            # Retry only the scenes that failed
+            for attempt in range(self.max_attempts):
+                results = await asyncio.gather(
+                    *(self._generate_scene(semaphore, i, scenes[i], durations[i], output_dir, on_scene_generated)
+                      for i in pending),
+                    return_exceptions=True
+                )
                 
-                # In production, would call Runway ML or Pika Labs API
-                # For now, create placeholder video files
-                with open(scene_path, "w") as f:
-                    f.write(f"Placeholder for scene video: {scene.get('title')}")
+                failed = []
+                for i, result in zip(pending, results):
+                    if isinstance(result, Exception):
+                        print(f"Error generating scene {i+1} (attempt {attempt+1}): {str(result)}")
+                        failed.append(i)
+                    else:
+                        generated_scenes[i] = result
                 
-                generated_scenes.append({
-                    "title": scene.get("title"),
-                    "description": scene.get("description"),
-                    "file_path": scene_path,
-                    "duration": 30,  # Placeholder duration in seconds
-                    "order": i+1
-                })
+                pending = failed
+                if not pending:
+                    break
+            
+            # Scenes that still failed get a basic placeholder; the others are kept
+            for i in pending:
+                generated_scenes[i] = self._generate_basic_scene(i, scenes[i].get("title"), durations[i], output_dir)
             
             return generated_scenes
                 
@@ -66,11 +106,108 @@ class VideoGeneratorService:
             # Generate basic scenes in case of error
             return self._generate_basic_scenes(output_dir)
     
+    async def _generate_scene(
+        self,
+        semaphore: asyncio.Semaphore,
+        index: int,
+        scene: Dict[str, Any],
+        duration: float,
+        output_dir: str,
+        on_scene_generated: Optional[Callable[[int, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Generates a single scene video, holding a slot of the concurrency limit.
+        """
+        scene_path = f"{output_dir}/scene_{index+1}.mp4"
+        
+        async with semaphore:
+            if self.backend == "local":
+                # CPU-bound rendering runs in the process pool, off the event loop
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(
+                    self._get_process_pool(),
+                    _render_scene_locally,
+                    scene.get("title"),
+                    duration,
+                    scene_path
+                )
+            else:
+                await self._request_remote_scene(scene, duration, scene_path)
+        
+        generated_scene = {
+            "title": scene.get("title"),
+            "description": scene.get("description"),
+            "file_path": scene_path,
+            "duration": duration,
+            "in_point": 0.0,
+            "out_point": duration,
+            "order": index+1
+        }
+        
+        if on_scene_generated:
+            on_scene_generated(index, generated_scene)
+        
+        return generated_scene
+    
+    async def _request_remote_scene(self, scene: Dict[str, Any], duration: float, scene_path: str) -> str:
+        """
+        Requests a scene video of the given duration from the remote generation API.
+        In production, would call Runway ML or Pika Labs API and download the result.
+        """
+        # For now, create placeholder video files
+        with open(scene_path, "w") as f:
+            f.write(f"Placeholder for scene video: {scene.get('title')} ({duration}s)")
+        
+        return scene_path
+    
+    def _scene_durations(self, scene_count: int, timeline: Optional[List[Dict[str, Any]]]) -> List[float]:
+        """
+        Duration to render for each scene: the planned one, or an even split of
+        the default film length when no timeline was planned.
+        """
+        if timeline and len(timeline) == scene_count:
+            return [planned["duration"] for planned in timeline]
+        return [round(settings.FILM_DEFAULT_DURATION / max(scene_count, 1), 3)] * scene_count
+    
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=settings.VIDEO_LOCAL_WORKERS)
+        return self._process_pool
+    
+    def close(self) -> None:
+        """
+        Shuts down the local render pool, if it was started.
+        """
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+    
+    def _generate_basic_scene(self, index: int, title: Optional[str], duration: float, output_dir: str) -> Dict[str, Any]:
+        """
+        Generates a basic placeholder for a single scene that could not be rendered.
+        """
+        scene_path = f"{output_dir}/scene_{index+1}.mp4"
+        
+        # Create placeholder file
+        with open(scene_path, "w") as f:
+            f.write(f"Placeholder for basic scene video: {title} (error recovery)")
+        
+        return {
+            "title": title,
+            "description": f"Basic scene {index+1}",
+            "file_path": scene_path,
+            "duration": duration,
+            "in_point": 0.0,
+            "out_point": duration,
+            "order": index+1
+        }
+    
     def _generate_basic_scenes(self, output_dir: str) -> List[Dict[str, Any]]:
         """
         Generates basic scene videos when normal generation fails.
         """
         basic_scenes = []
+        duration = self._scene_durations(3, None)[0]
         
         # Create three basic scenes (intro, conflict, resolution)
         for i, title in enumerate(["Introduction", "Conflict", "Resolution"]):
@@ -84,7 +221,9 @@ class VideoGeneratorService:
                 "title": f"ACT {i+1}: {title.upper()}",
                 "description": f"Basic {title.lower()} scene",
                 "file_path": scene_path,
-                "duration": 30,  # Placeholder duration in seconds
+                "duration": duration,
+                "in_point": 0.0,
+                "out_point": duration,
                 "order": i+1
             })
         
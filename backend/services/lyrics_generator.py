@@ -1,6 +1,6 @@
-import openai
 from typing import Dict, Optional
-from core.config import settings
+from core.cache import ContentCache, make_cache_key
+from core.llm_client import LLMClient, get_llm_client
 
 class LyricsGeneratorService:
     """
@@ -8,15 +8,21 @@ class LyricsGeneratorService:
     emoção dominante, palavras-chave e gênero musical.
     """
     
-    def __init__(self):
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+    def __init__(
+        self,
+        llm_client: Optional[LLMClient] = None,
+        cache: Optional[ContentCache] = None
+    ):
+        self.llm_client = llm_client or get_llm_client()
+        self.cache = cache or ContentCache("lyrics")
     
     async def generate(
         self,
         phrase: str,
         emotion: str,
         genre: str,
-        keywords: list
+        keywords: list,
+        use_cache: bool = True
     ) -> str:
         """
         Gera letra de música com estrutura definida.
@@ -26,10 +32,18 @@ class LyricsGeneratorService:
             emotion: Emoção dominante
             genre: Gênero musical
             keywords: Palavras-chave extraídas da frase
+            use_cache: Se False, ignora o cache e sempre gera uma nova letra
             
         Returns:
             Letra completa da música
         """
+        # Reutilizar letra já gerada para a mesma combinação de entrada
+        cache_key = make_cache_key(phrase, emotion, genre, keywords)
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         prompt = f"""
         Crie uma letra de música em português brasileiro baseada na seguinte frase criativa:
         "{phrase}"
@@ -46,15 +60,15 @@ class LyricsGeneratorService:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
+            lyrics = await self.llm_client.chat(
                 messages=[
                     {"role": "system", "content": "Você é um compositor de músicas talentoso."},
                     {"role": "user", "content": prompt}
                 ]
             )
             
-            lyrics = response.choices[0].message.content
+            # Apenas letras da IA são armazenadas; a letra genérica de erro não
+            self.cache.set(cache_key, lyrics)
             return lyrics
             
         except Exception as e:
@@ -0,0 +1,31 @@
+import asyncio
+from typing import Any, Dict, Optional
+from services.audio.analysis import load_analysis
+
+class MusicAnalyzerService:
+    """
+    Serviço responsável pela análise rítmica da música finalizada: força de onset,
+    andamento, grade de batidas, envelope de energia e seções.
+    O resultado fica em cache (analysis.npz) ao lado da música e é reutilizado
+    pelas etapas de avatar, filme e edição.
+    """
+
+    async def analyze(self, music_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Analisa a música (ou lê a análise em cache).
+
+        Args:
+            music_path: Caminho do arquivo de música
+
+        Returns:
+            Dicionário com tempo, duração, batidas, seções e envelopes,
+            ou None se a música não puder ser analisada
+        """
+        try:
+            # STFT e autocorrelação são CPU-bound: rodar fora do event loop
+            return await asyncio.to_thread(load_analysis, music_path)
+
+        except Exception as e:
+            # Música simulada ou ausente: etapas seguintes usam seus padrões
+            print(f"Erro ao analisar música: {str(e)}")
+            return None
@@ -1,7 +1,12 @@
+import asyncio
+import json
+import numpy as np
 import requests
 import os
 from typing import Optional
 from core.config import settings
+from services.audio.mixer import AudioMixer
+from services.audio.pcm import create_wav, decode_to_wav, encode_wav, measure_loudness
 
 class MusicGeneratorService:
     """
@@ -11,6 +16,7 @@ class MusicGeneratorService:
     
     def __init__(self):
         self.api_key = settings.SUNO_API_KEY
+        self.mixer = AudioMixer()
         
     async def generate(
         self,
@@ -76,20 +82,23 @@ class MusicGeneratorService:
         Returns:
             Caminho do arquivo de música final
         """
-        # Em uma implementação real, usaríamos ffmpeg ou pydub para combinar os arquivos
-        # Aqui, simulamos o processo para exemplo
-        
         try:
             # Criar diretório se não existir
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # Simular combinação de arquivos
+
             print(f"Combinando instrumental ({instrumental_path}) com voz ({voice_path})")
-            
+
+            try:
+                # Decodificação, DSP e codificação são CPU-bound: rodar fora do event loop
+                return await asyncio.to_thread(self._mix, instrumental_path, voice_path, output_path)
+            except Exception as e:
+                # Stems simulados (texto) não podem ser decodificados
+                print(f"Mixagem indisponível, gerando arquivo simulado: {str(e)}")
+
             # Criar arquivo simulado
             with open(output_path, "w") as f:
                 f.write(f"Simulação de arquivo MP3 - Música finalizada (instrumental + voz)")
-            
+
             return output_path
             
         except Exception as e:
@@ -99,5 +108,26 @@ class MusicGeneratorService:
             # Criar arquivo de fallback
             with open(output_path, "w") as f:
                 f.write("Arquivo de música finalizada de fallback")
-                
+
             return output_path
+
+    def _mix(self, instrumental_path: str, voice_path: str, output_path: str) -> str:
+        # Intermediários PCM ficam ao lado da música e são acessados via memmap,
+        # de modo que a memória por trabalho não cresce com a duração da faixa
+        music_dir = os.path.dirname(output_path)
+        sample_rate = self.mixer.sample_rate
+
+        instrumental = decode_to_wav(instrumental_path, os.path.join(music_dir, "instrumental.wav"), sample_rate)
+        voice = decode_to_wav(voice_path, os.path.join(music_dir, "voice.wav"), sample_rate)
+
+        mix_path = os.path.join(music_dir, "mix.wav")
+        mixed = create_wav(mix_path, max(len(instrumental), len(voice)), instrumental.shape[1], sample_rate)
+        self.mixer.mix(instrumental, voice, output=mixed)
+        if isinstance(mixed, np.memmap):
+            mixed.flush()
+
+        # Loudness medida sobre o memmap, em janelas
+        with open(os.path.join(music_dir, "loudness.json"), "w") as f:
+            json.dump(measure_loudness(mixed, sample_rate), f)
+
+        return encode_wav(mix_path, output_path, settings.AUDIO_BITRATE)
@@ -1,6 +1,7 @@
-import openai
+import json
 from typing import Dict, List, Optional
-from core.config import settings
+from core.cache import ContentCache, make_cache_key
+from core.llm_client import LLMClient, get_llm_client
 
 class PhraseInterpreterService:
     """
@@ -8,14 +9,20 @@ class PhraseInterpreterService:
     identificando emoção dominante, palavras-chave e gênero musical sugerido.
     """
     
-    def __init__(self):
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+    def __init__(
+        self,
+        llm_client: Optional[LLMClient] = None,
+        cache: Optional[ContentCache] = None
+    ):
+        self.llm_client = llm_client or get_llm_client()
+        self.cache = cache or ContentCache("interpretation")
     
     async def interpret(
         self, 
         phrase: str, 
         user_emotion: Optional[str] = None,
-        user_genre: Optional[str] = None
+        user_genre: Optional[str] = None,
+        use_cache: bool = True
     ) -> Dict:
         """
         Interpreta a frase criativa do usuário.
@@ -24,6 +31,7 @@ class PhraseInterpreterService:
             phrase: Frase criativa do usuário
             user_emotion: Emoção especificada pelo usuário (opcional)
             user_genre: Gênero musical especificado pelo usuário (opcional)
+            use_cache: Se False, ignora o cache e sempre consulta a IA
             
         Returns:
             Dicionário contendo emoção dominante, palavras-chave e gênero musical sugerido
@@ -36,6 +44,13 @@ class PhraseInterpreterService:
                 "keywords": self._extract_keywords(phrase)
             }
         
+        # Reutilizar interpretação já feita para a mesma frase/emoção/gênero
+        cache_key = make_cache_key(phrase, user_emotion, user_genre)
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         # Caso contrário, usamos a IA para interpretar a frase
         prompt = f"""
         Analise a seguinte frase criativa e identifique:
@@ -56,8 +71,7 @@ class PhraseInterpreterService:
         # Em uma implementação real, chamaríamos a API da OpenAI
         # Aqui, simulamos uma resposta para exemplo
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
+            result = await self.llm_client.chat(
                 messages=[
                     {"role": "system", "content": "Você é um assistente especializado em análise de texto e música."},
                     {"role": "user", "content": prompt}
@@ -65,9 +79,7 @@ class PhraseInterpreterService:
                 response_format={"type": "json_object"}
             )
             
-            result = response.choices[0].message.content
             # Converter string JSON para dicionário Python
-            import json
             interpretation = json.loads(result)
             
             # Sobrescrever com valores do usuário, se fornecidos
@@ -75,6 +87,9 @@ class PhraseInterpreterService:
                 interpretation["emotion"] = user_emotion
             if user_genre:
                 interpretation["genre"] = user_genre
+            
+            # Apenas respostas da IA são armazenadas; valores padrão de erro não
+            self.cache.set(cache_key, interpretation)
                 
             return interpretation
             
@@ -84,6 +84,14 @@ class AssetCompilerService:
             film_url = f"/api/film/{film_id}/video"
             screenplay_url = f"/api/film/{film_id}/screenplay"
             
+            # Adaptive streams, when the videos were packaged
+            avatar_hls_url = None
+            if os.path.exists(f"./storage/avatar/{avatar_id}/hls/master.m3u8"):
+                avatar_hls_url = f"/api/avatar/{avatar_id}/hls/master.m3u8"
+            film_hls_url = None
+            if os.path.exists(f"./storage/film/{film_id}/hls/master.m3u8"):
+                film_hls_url = f"/api/film/{film_id}/hls/master.m3u8"
+            
             return {
                 "music_id": music_id,
                 "avatar_id": avatar_id,
@@ -94,6 +102,8 @@ class AssetCompilerService:
                 "avatar_model_url": avatar_model_url,
                 "film_url": film_url,
                 "screenplay_url": screenplay_url,
+                "avatar_hls_url": avatar_hls_url,
+                "film_hls_url": film_hls_url,
                 "output_dir": output_dir
             }
                 
@@ -77,6 +77,12 @@ class PageTemplateService:
         music_url = assets.get("music_url", "#")
         avatar_url = assets.get("avatar_url", "#")
         film_url = assets.get("film_url", "#")
+        avatar_hls_url = assets.get("avatar_hls_url") or ""
+        film_hls_url = assets.get("film_hls_url") or ""
+        metrics_url = assets.get("playback_metrics_url") or ""
+        
+        # hls.js is only needed for browsers without native HLS, and only when a playlist exists
+        hls_script = '<script src="https://cdn.jsdelivr.net/npm/hls.js@1"></script>' if (avatar_hls_url or film_hls_url) else ""
         
         return f"""<!DOCTYPE html>
 <html lang="en">
@@ -219,7 +225,7 @@ class PageTemplateService:
         <div class="section">
             <h2 class="section-title">Digital Avatar</h2>
             <div class="avatar-container">
-                <video width="320" height="240" controls>
+                <video width="320" height="240" controls preload="metadata" data-asset="avatar" data-hls="{avatar_hls_url}">
                     <source src="{avatar_url}" type="video/mp4">
                     Your browser does not support the video tag.
                 </video>
@@ -230,7 +236,7 @@ class PageTemplateService:
         <div class="section">
             <h2 class="section-title">Short Film</h2>
             <div class="film-container">
-                <video controls>
+                <video controls preload="metadata" data-asset="film" data-hls="{film_hls_url}">
                     <source src="{film_url}" type="video/mp4">
                     Your browser does not support the video tag.
                 </video>
@@ -249,6 +255,41 @@ class PageTemplateService:
         <p>&copy; 2024 Twinverse Studios. All rights reserved.</p>
         <p>Created with Twinverse AI</p>
     </footer>
+    
+    {hls_script}
+    <script>
+        // Prefer the adaptive HLS playlist (native or hls.js), keeping the MP4 as fallback,
+        // and report the time from the play request to the first frame
+        const metricsUrl = "{metrics_url}";
+        
+        document.querySelectorAll("video[data-asset]").forEach((video) => {{
+            const playlist = video.dataset.hls;
+            let source = "mp4";
+            if (playlist && video.canPlayType("application/vnd.apple.mpegurl")) {{
+                video.src = playlist;
+                source = "hls";
+            }} else if (playlist && window.Hls && Hls.isSupported()) {{
+                const player = new Hls();
+                player.loadSource(playlist);
+                player.attachMedia(video);
+                source = "hls";
+            }}
+            
+            let requestedAt = null;
+            video.addEventListener("play", () => {{
+                if (requestedAt === null) requestedAt = performance.now();
+            }}, {{ once: true }});
+            video.addEventListener("playing", () => {{
+                if (!metricsUrl || requestedAt === null) return;
+                const metric = {{
+                    asset: video.dataset.asset,
+                    source: source,
+                    startup_ms: performance.now() - requestedAt
+                }};
+                navigator.sendBeacon(metricsUrl, new Blob([JSON.stringify(metric)], {{ type: "application/json" }}));
+            }}, {{ once: true }});
+        }});
+    </script>
 </body>
 </html>
 """
@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import numpy as np
+from typing import Dict, Any, Optional
+
+# Startup samples above this are treated as abandoned playbacks and discarded
+MAX_STARTUP_MS = 120000.0
+
+class PlaybackMetricsService:
+    """
+    Service responsible for tracking playback startup time (from the play
+    request to the first rendered frame) reported by publication pages, per
+    asset (film, avatar) and source (hls, mp4).
+    """
+    
+    def __init__(self, storage_dir: str = "./storage/publication"):
+        self.storage_dir = storage_dir
+        
+    def record(
+        self,
+        publication_id: str,
+        asset: str,
+        source: str,
+        startup_ms: float
+    ) -> bool:
+        """
+        Appends one startup time sample to the publication metrics log.
+        
+        Returns:
+            False if the sample was discarded
+        """
+        if not 0 <= startup_ms <= MAX_STARTUP_MS:
+            return False
+        
+        publication_dir = f"{self.storage_dir}/{publication_id}"
+        if not os.path.isdir(publication_dir):
+            return False
+        
+        line = json.dumps({
+            "asset": asset,
+            "source": source,
+            "startup_ms": round(float(startup_ms), 1),
+            "recorded_at": time.time()
+        }) + "\n"
+        
+        # A single O_APPEND write per sample keeps concurrent API workers from interleaving lines
+        fd = os.open(f"{publication_dir}/playback.jsonl", os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+        return True
+    
+    def summary(self, publication_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Summarizes startup times per asset and source (count, median, p95).
+        
+        Returns:
+            Dictionary asset -> source -> statistics, or None if the publication does not exist
+        """
+        publication_dir = f"{self.storage_dir}/{publication_id}"
+        if not os.path.isdir(publication_dir):
+            return None
+        
+        samples: Dict[str, Dict[str, list]] = {}
+        try:
+            with open(f"{publication_dir}/playback.jsonl", "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        sample = json.loads(line)
+                    except ValueError:
+                        continue
+                    samples.setdefault(sample["asset"], {}).setdefault(sample["source"], []).append(sample["startup_ms"])
+        except FileNotFoundError:
+            pass
+        
+        return {
+            asset: {
+                source: {
+                    "count": len(values),
+                    "p50_ms": round(float(np.percentile(values, 50)), 1),
+                    "p95_ms": round(float(np.percentile(values, 95)), 1)
+                }
+                for source, values in sources.items()
+            }
+            for asset, sources in samples.items()
+        }
@@ -0,0 +1,53 @@
+import os
+import asyncio
+from typing import Any, Dict, Optional
+from core.config import settings
+from core.media import record_media
+from services.video.hls import package_hls
+
+class StreamPackagerService:
+    """
+    Serviço responsável por empacotar os vídeos finais (filme e avatar) para
+    streaming adaptativo: renditions HLS em segmentos fMP4 de várias taxas de
+    bits e uma playlist mestre. Segmentos e playlists das renditions ficam num
+    diretório endereçado pelo conteúdo (hls/<digest>/) e são servidos como
+    imutáveis; a playlist mestre tem URL estável e é sempre revalidada.
+    """
+
+    async def package(self, video_path: str, output_dir: str) -> Optional[Dict[str, Any]]:
+        """
+        Empacota um vídeo em HLS.
+
+        Args:
+            video_path: Caminho do MP4 finalizado
+            output_dir: Diretório HLS (playlist mestre e os pacotes hls/<digest>/<rendition>)
+
+        Returns:
+            Dicionário com a playlist mestre, renditions e duração,
+            ou None se o vídeo não puder ser empacotado
+        """
+        try:
+            # Transcodificação e hash dos segmentos fora do event loop
+            return await asyncio.to_thread(self._package, video_path, output_dir)
+
+        except Exception as e:
+            # Vídeo simulado ou ffmpeg ausente: a página usa o MP4 progressivo
+            print(f"Erro ao empacotar vídeo para HLS: {str(e)}")
+            return None
+
+    def _package(self, video_path: str, output_dir: str) -> Dict[str, Any]:
+        package = package_hls(
+            video_path,
+            output_dir,
+            settings.HLS_RENDITIONS,
+            settings.HLS_SEGMENT_DURATION
+        )
+
+        # Validadores de cache da playlist mestre e de cada arquivo do pacote publicado
+        record_media(package["master_playlist"], *(
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(package["package_dir"])
+            for name in names
+            if not name.startswith(".")
+        ))
+        return package
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import uuid
+from typing import Any, Dict, List, Optional
+from core.files import atomic_write, file_sha256
+
+# Tipos de mídia dos arquivos de um pacote HLS (fMP4)
+HLS_MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4"
+}
+
+MASTER_PLAYLIST = "master.m3u8"
+
+# Caracteres hexadecimais do digest que nomeia o diretório de cada pacote
+PACKAGE_DIGEST_LENGTH = 16
+
+def probe_video(path: str) -> Dict[str, Any]:
+    """
+    Lê dimensões, duração e presença de áudio de um vídeo com o ffprobe.
+    """
+    if shutil.which("ffprobe") is None:
+        raise RuntimeError("ffprobe não encontrado para analisar o vídeo")
+
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-print_format", "json", "-show_streams", "-show_format", path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Vídeo inválido {path}: {result.stderr.decode(errors='ignore').strip()}")
+
+    info = json.loads(result.stdout)
+    streams = info.get("streams", [])
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), None)
+    if video is None:
+        raise RuntimeError(f"Sem faixa de vídeo: {path}")
+
+    return {
+        "width": int(video["width"]),
+        "height": int(video["height"]),
+        "duration": float(info.get("format", {}).get("duration", 0.0)),
+        "has_audio": any(stream.get("codec_type") == "audio" for stream in streams)
+    }
+
+def rendition_ladder(source_height: int, renditions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Renditions que não ampliam a fonte (ao menos a menor delas), da maior para a menor.
+    """
+    ladder = sorted(renditions, key=lambda rendition: rendition["height"], reverse=True)
+    fitting = [rendition for rendition in ladder if rendition["height"] <= source_height]
+    return fitting or ladder[-1:]
+
+def _ffmpeg_command(
+    source_path: str,
+    output_dir: str,
+    ladder: List[Dict[str, Any]],
+    segment_duration: float,
+    has_audio: bool
+) -> List[str]:
+    # Uma única decodificação da fonte, dividida entre as renditions pelo filtro split
+    count = len(ladder)
+    filters = [f"[0:v]split={count}" + "".join(f"[s{i}]" for i in range(count))]
+    filters += [f"[s{i}]scale=-2:{rendition['height']}[v{i}]" for i, rendition in enumerate(ladder)]
+
+    command = ["ffmpeg", "-v", "error", "-y", "-i", source_path, "-filter_complex", ";".join(filters)]
+    stream_map = []
+    for i, rendition in enumerate(ladder):
+        command += [
+            "-map", f"[v{i}]",
+            f"-c:v:{i}", "libx264",
+            f"-b:v:{i}", rendition["video_bitrate"],
+            f"-maxrate:v:{i}", rendition["video_bitrate"],
+            f"-bufsize:v:{i}", rendition["video_bitrate"]
+        ]
+        entry = f"v:{i}"
+        if has_audio:
+            command += ["-map", "0:a:0", f"-c:a:{i}", "aac", f"-b:a:{i}", rendition["audio_bitrate"]]
+            entry += f",a:{i}"
+        stream_map.append(f"{entry},name:{rendition['name']}")
+
+    # Keyframes alinhados entre renditions no início de cada segmento,
+    # para que o player troque de qualidade em qualquer fronteira
+    command += [
+        "-preset", "veryfast",
+        "-pix_fmt", "yuv420p",
+        "-sc_threshold", "0",
+        "-force_key_frames", f"expr:gte(t,n_forced*{segment_duration})",
+        "-f", "hls",
+        "-hls_time", str(segment_duration),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_type", "fmp4",
+        "-hls_flags", "independent_segments",
+        "-hls_fmp4_init_filename", "init.mp4",
+        "-hls_segment_filename", os.path.join(output_dir, "%v", "segment_%05d.m4s"),
+        "-var_stream_map", " ".join(stream_map),
+        os.path.join(output_dir, "%v", "index.m3u8")
+    ]
+    return command
+
+def _bandwidth(bitrate: str) -> int:
+    # "2800k" -> 2800000
+    multipliers = {"k": 1000, "m": 1000000}
+    suffix = bitrate[-1].lower()
+    return int(float(bitrate[:-1]) * multipliers[suffix]) if suffix in multipliers else int(bitrate)
+
+def write_master_playlist(
+    path: str,
+    ladder: List[Dict[str, Any]],
+    source: Dict[str, Any],
+    package_name: str = ""
+) -> None:
+    """
+    Escreve a playlist mestre com uma entrada por rendition (banda e
+    resolução), da maior para a menor. Gerada aqui, e não pelo ffmpeg, para
+    que as URIs das renditions sejam sempre relativas a ela
+    (<package_name>/<rendition>/index.m3u8). A gravação é atômica.
+    """
+    prefix = f"{package_name}/" if package_name else ""
+    lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    for rendition in ladder:
+        # Mesma largura que scale=-2 produz (par, proporcional à fonte)
+        width = int(round(source["width"] * rendition["height"] / source["height"] / 2)) * 2
+        bandwidth = _bandwidth(rendition["video_bitrate"])
+        if source["has_audio"]:
+            bandwidth += _bandwidth(rendition["audio_bitrate"])
+        lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{rendition['height']}")
+        lines.append(f"{prefix}{rendition['name']}/index.m3u8")
+
+    with atomic_write(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+def package_digest(package_dir: str) -> str:
+    """
+    Digest do conteúdo de um pacote: caminhos relativos e SHA-256 de cada
+    arquivo. Pacotes iguais têm o mesmo digest; qualquer mudança gera outro.
+    """
+    entries = []
+    for directory, _, names in os.walk(package_dir):
+        for name in names:
+            path = os.path.join(directory, name)
+            entries.append([os.path.relpath(path, package_dir).replace(os.sep, "/"), file_sha256(path)])
+    payload = json.dumps(sorted(entries))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:PACKAGE_DIGEST_LENGTH]
+
+def _published_package(master_path: str) -> Optional[str]:
+    # Diretório do pacote referenciado pela playlist mestre atual, se houver
+    try:
+        with open(master_path) as f:
+            uris = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    except OSError:
+        return None
+    return uris[0].split("/")[0] if uris and uris[0].count("/") == 2 else None
+
+def package_hls(
+    source_path: str,
+    output_dir: str,
+    renditions: List[Dict[str, Any]],
+    segment_duration: float
+) -> Dict[str, Any]:
+    """
+    Empacota um MP4 em HLS com segmentos fMP4 num diretório endereçado pelo
+    conteúdo: uma playlist por rendition (output_dir/<digest>/<nome>/index.m3u8)
+    e a playlist mestre output_dir/master.m3u8, a única com URL estável.
+    O pacote é gerado num diretório temporário, publicado por renomeação e só
+    então a playlist mestre passa a apontar para ele, de modo que clientes
+    nunca vejam playlists parciais e nenhum arquivo publicado mude de conteúdo.
+    O pacote anterior é mantido para players que ainda o estejam tocando.
+
+    Returns:
+        Dicionário com a playlist mestre, o diretório do pacote, as renditions e a duração
+    """
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg não encontrado para empacotar o vídeo")
+
+    source = probe_video(source_path)
+    ladder = rendition_ladder(source["height"], renditions)
+
+    master_path = os.path.join(output_dir, MASTER_PLAYLIST)
+    temp_dir = os.path.join(output_dir, f".tmp-{uuid.uuid4().hex}")
+    for rendition in ladder:
+        os.makedirs(os.path.join(temp_dir, rendition["name"]))
+
+    try:
+        result = subprocess.run(
+            _ffmpeg_command(source_path, temp_dir, ladder, segment_duration, source["has_audio"]),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Falha ao empacotar {source_path}: {result.stderr.decode(errors='ignore').strip()}")
+
+        # Um pacote idêntico já publicado é reaproveitado como está
+        digest = package_digest(temp_dir)
+        package_dir = os.path.join(output_dir, digest)
+        if not os.path.exists(package_dir):
+            os.rename(temp_dir, package_dir)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    previous = _published_package(master_path)
+    write_master_playlist(master_path, ladder, source, digest)
+
+    # Remover pacotes antigos (e o layout sem digest), mantendo o atual e o anterior
+    keep = {MASTER_PLAYLIST, digest, previous}
+    for name in os.listdir(output_dir):
+        if name in keep or name.startswith("."):
+            continue
+        path = os.path.join(output_dir, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+
+    return {
+        "master_playlist": master_path,
+        "package_dir": package_dir,
+        "renditions": [rendition["name"] for rendition in ladder],
+        "segment_duration": segment_duration,
+        "duration": source["duration"]
+    }
@@ -1,6 +1,5 @@
 import requests
 from typing import Optional
-from fastapi import UploadFile
 import os
 from core.config import settings
 
@@ -17,7 +16,7 @@ class VoiceProcessorService:
         self,
         lyrics: str,
         emotion: str,
-        voice_file: Optional[UploadFile] = None,
+        voice_path: Optional[str] = None,
         output_path: str = None
     ) -> str:
         """
@@ -26,7 +25,7 @@ class VoiceProcessorService:
         Args:
             lyrics: Letra da música
             emotion: Emoção dominante
-            voice_file: Arquivo de voz do usuário (opcional)
+            voice_path: Caminho do arquivo de voz do usuário (opcional)
             output_path: Caminho para salvar o arquivo de áudio
             
         Returns:
@@ -37,10 +36,10 @@ class VoiceProcessorService:
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
             # Se o usuário forneceu um arquivo de voz
-            if voice_file:
+            if voice_path:
                 # Em uma implementação real, processaríamos o arquivo de voz
                 # e aplicaríamos à letra da música
-                print(f"Processando arquivo de voz do usuário: {voice_file.filename}")
+                print(f"Processando arquivo de voz do usuário: {voice_path}")
                 
                 # Simular processamento de voz do usuário
                 with open(output_path, "w") as f:
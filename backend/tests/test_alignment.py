@@ -0,0 +1,45 @@
+import pytest
+
+from services.audio.alignment import lyric_syllables, syllabify
+
+# Separação silábica de referência (norma ortográfica), agrupada pela regra exercitada
+REFERENCE = {
+    # Hiato antes de vogal forte, inclusive í/ú acentuadas
+    "poesia": "po-e-si-a", "dia": "di-a", "lua": "lu-a", "quiabo": "qui-a-bo", "leão": "le-ão",
+    "saúde": "sa-ú-de", "país": "pa-ís", "ciúme": "ci-ú-me", "piauí": "pi-au-í", "saída": "sa-í-da",
+    # i/u átonas que fecham sílaba ou precedem nh
+    "sair": "sa-ir", "rainha": "ra-i-nha", "moinho": "mo-i-nho", "ainda": "a-in-da",
+    "ruim": "ru-im", "juiz": "ju-iz", "raiz": "ra-iz", "paul": "pa-ul",
+    # Ditongos decrescentes e nasais
+    "noite": "noi-te", "muito": "mui-to", "cuidar": "cui-dar", "saudade": "sau-da-de",
+    "mais": "mais", "praia": "prai-a", "ideia": "i-dei-a", "raimundo": "rai-mun-do",
+    "gratuito": "gra-tui-to", "mãe": "mãe", "põe": "põe", "coração": "co-ra-ção", "canção": "can-ção",
+    # Duas semivogais após vogal forte
+    "saiu": "sa-iu", "caiu": "ca-iu",
+    # "u" de qu/gu no ataque
+    "quando": "quan-do", "água": "á-gua", "guerra": "guer-ra", "pinguim": "pin-guim",
+    "averiguou": "a-ve-ri-guou",
+    # Consoantes intervocálicas, dígrafos e encontros consonantais
+    "amor": "a-mor", "feliz": "fe-liz", "estrela": "es-tre-la", "carro": "car-ro",
+    "pássaro": "pás-sa-ro", "chuva": "chu-va", "filho": "fi-lho", "sonho": "so-nho",
+    "abraço": "a-bra-ço", "planeta": "pla-ne-ta", "perfeito": "per-fei-to",
+}
+
+
+@pytest.mark.parametrize("word, expected", sorted(REFERENCE.items()))
+def test_syllabify_matches_reference(word, expected):
+    assert "-".join(syllabify(word)) == expected
+
+
+def test_syllabify_ignores_case_and_punctuation():
+    assert syllabify("Rainha,") == ("ra", "i", "nha")
+    assert syllabify("SAIR!") == ("sa", "ir")
+    assert syllabify("...") == ()
+
+
+def test_lyric_syllables_skip_section_headers():
+    lyrics = "**VERSO 1:**\nA rainha quer sair\n\n[Refrão]\nPoesia no Piauí"
+    assert lyric_syllables(lyrics) == [
+        "a", "ra", "i", "nha", "quer", "sa", "ir",
+        "po", "e", "si", "a", "no", "pi", "au", "í"
+    ]
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+
+from services.audio import analysis
+from services.audio.analysis import HOP_LENGTH, compute_features, estimate_tempo, find_sections, load_analysis, track_beats
+from services.audio.pcm import create_wav
+
+SAMPLE_RATE = 22050
+TEMPO = 120.0
+BEAT = 60.0 / TEMPO
+# Troca de timbre no início do compasso 16 (4/4 a 120 BPM: um compasso a cada 2 s)
+SECTION_START = 32.0
+
+
+def _click_track(seconds: float = 64.0) -> np.ndarray:
+    """
+    Clique de 20 ms a cada batida: grave na primeira seção, agudo na segunda.
+    """
+    t = np.arange(int(0.02 * SAMPLE_RATE)) / SAMPLE_RATE
+    decay = np.exp(-t / 0.004)
+    low = (0.8 * np.sin(2 * np.pi * 150 * t) * decay).astype(np.float32)
+    high = (0.8 * np.sin(2 * np.pi * 3000 * t) * decay).astype(np.float32)
+
+    samples = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    for beat in np.arange(0.0, seconds - 0.05, BEAT):
+        start = int(round(beat * SAMPLE_RATE))
+        click = low if beat < SECTION_START else high
+        samples[start:start + len(click)] = click
+    return samples
+
+
+def _write_track(path: str, samples: np.ndarray) -> str:
+    wav = create_wav(path, len(samples), 1, SAMPLE_RATE)
+    wav[:, 0] = samples
+    wav.flush()
+    del wav
+    return path
+
+
+def test_click_track_tempo_beats_and_sections():
+    samples = _click_track()[:, None]
+    frame_rate = SAMPLE_RATE / HOP_LENGTH
+    features = compute_features(samples, SAMPLE_RATE)
+
+    tempo = estimate_tempo(features["onset_strength"], frame_rate)
+    assert abs(tempo - TEMPO) < 1.0
+
+    beats, tempo = track_beats(features["onset_strength"], frame_rate, tempo)
+    assert abs(tempo - TEMPO) < 0.5
+    assert np.allclose(np.diff(beats), BEAT, atol=1.5 / frame_rate)
+    # Grade alinhada aos cliques (resolução de um quadro de análise)
+    assert abs(beats[0] % BEAT) < 2 / frame_rate or abs(beats[0] % BEAT - BEAT) < 2 / frame_rate
+
+    sections = find_sections(features["band_energy"], beats, frame_rate, len(samples) / SAMPLE_RATE)
+    assert sections[0] == 0.0
+    assert len(sections) == 2
+    # A fronteira cai num início de compasso da grade (o primeiro tempo do compasso não é detectado)
+    assert sections[1] in beats[::4]
+    assert abs(sections[1] - SECTION_START) <= BEAT + 2 / frame_rate
+
+
+def test_analysis_is_cached_next_to_the_music_and_invalidated_on_change(tmp_path, monkeypatch):
+    music_path = _write_track(str(tmp_path / "musica.wav"), _click_track())
+    calls = []
+    analyze = analysis.analyze
+    monkeypatch.setattr(analysis, "analyze", lambda *args: calls.append(1) or analyze(*args))
+
+    first = load_analysis(music_path)
+    assert abs(first["tempo"] - TEMPO) < 0.5
+    assert os.path.exists(tmp_path / "analysis.npz")
+    # Só o cache fica no diretório: o PCM temporário é removido
+    assert sorted(os.listdir(tmp_path)) == ["analysis.npz", "musica.wav"]
+
+    cached = load_analysis(music_path)
+    assert len(calls) == 1
+    assert cached["tempo"] == first["tempo"]
+    assert np.array_equal(cached["beats"], first["beats"])
+    assert np.array_equal(cached["sections"], first["sections"])
+
+    # Nova versão da música (andamento mais lento): o cache é recalculado
+    slower = np.repeat(_click_track(48.0), 2)[:int(64.0 * SAMPLE_RATE)]
+    _write_track(music_path, slower)
+    os.utime(music_path, ns=(0, os.stat(music_path).st_mtime_ns + 1))
+
+    changed = load_analysis(music_path)
+    assert len(calls) == 2
+    assert abs(changed["tempo"] - TEMPO / 2) < 0.5
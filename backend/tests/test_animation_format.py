@@ -0,0 +1,133 @@
+import json
+
+import numpy as np
+import pytest
+
+from services.avatar.animation_format import (
+    ALIGNMENT, CHANNEL_ENTRY, HEADER, MAGIC, decode_animation, encode_animation, read_animation, write_animation
+)
+
+
+def _channels(frame_count: int = 300) -> dict:
+    rng = np.random.default_rng(0)
+    return {
+        "jaw_open": rng.random(frame_count).astype(np.float16),
+        "head_rotation_y": rng.standard_normal(frame_count).astype(np.float32),
+        "viseme": rng.integers(0, 14, frame_count).astype(np.uint8),
+        "section": rng.integers(0, 600, frame_count).astype(np.uint16),
+        "beat_index": rng.integers(0, 1 << 20, frame_count).astype(np.uint32)
+    }
+
+
+def test_round_trip_preserves_channels_and_metadata():
+    channels = _channels()
+    metadata = {"style": "anime", "beats": [0.5, 1.0], "título": "canção"}
+
+    clip = decode_animation(encode_animation(30.0, channels, metadata))
+
+    assert clip.fps == 30.0
+    assert clip.frame_count == 300
+    assert clip.duration == 10.0
+    assert clip.metadata == metadata
+    assert list(clip.channels) == list(channels)
+    for name, values in channels.items():
+        assert clip.channels[name].dtype == values.dtype
+        np.testing.assert_array_equal(clip.channels[name], values)
+
+
+def test_decoded_channels_are_read_only_views_over_the_buffer():
+    buffer = bytearray(encode_animation(30.0, _channels()))
+
+    clip = decode_animation(buffer)
+
+    for values in clip.channels.values():
+        assert not values.flags.writeable
+        assert values.ctypes.data % ALIGNMENT == 0
+        assert np.shares_memory(values, np.frombuffer(buffer, dtype=np.uint8))
+
+
+def test_channels_may_be_shorter_than_the_clip():
+    times = np.array([0, 10, 299], dtype=np.uint16)
+    values = np.array([0.0, 1.0, 0.25], dtype=np.float16)
+
+    clip = decode_animation(encode_animation(60.0, {"jaw_times": times, "jaw": values}, frame_count=300))
+
+    assert clip.frame_count == 300
+    np.testing.assert_array_equal(clip.channels["jaw_times"], times)
+    np.testing.assert_array_equal(clip.channels["jaw"], values)
+
+
+def test_version_1_channels_span_every_frame():
+    values = np.arange(4, dtype=np.float32)
+    metadata = b"{}"
+    offset = HEADER.size + len(metadata) + CHANNEL_ENTRY.size
+    offset += -offset % ALIGNMENT
+    buffer = bytearray(offset + values.nbytes)
+    HEADER.pack_into(buffer, 0, MAGIC, 1, 0, 24.0, len(values), 1, len(metadata))
+    buffer[HEADER.size:HEADER.size + len(metadata)] = metadata
+    # Version 1: the value count field is reserved (zero)
+    CHANNEL_ENTRY.pack_into(buffer, HEADER.size + len(metadata), b"blink", 2, 0, offset)
+    buffer[offset:] = values.tobytes()
+
+    clip = decode_animation(bytes(buffer))
+
+    assert clip.version == 1
+    np.testing.assert_array_equal(clip.channels["blink"], values)
+
+
+def test_file_round_trip_is_memory_mapped(tmp_path):
+    channels = _channels()
+    path = write_animation(str(tmp_path / "avatar_animated.anim"), 30.0, channels, {"style": "cartoon"})
+
+    clip = read_animation(path)
+
+    assert clip.metadata == {"style": "cartoon"}
+    for name, values in channels.items():
+        np.testing.assert_array_equal(clip.channels[name], values)
+    assert list(tmp_path.iterdir()) == [tmp_path / "avatar_animated.anim"]
+
+
+def test_empty_clip_round_trips():
+    clip = decode_animation(encode_animation(30.0, {}))
+    assert clip.frame_count == 0
+    assert clip.channels == {}
+
+
+@pytest.mark.parametrize("channels, message", [
+    ({"a": np.zeros(3, np.float16), "b": np.zeros(4, np.float16)}, "different frame counts"),
+    ({"x" * 33: np.zeros(3, np.float16)}, "name too long"),
+    ({"a": np.zeros(3, np.float64)}, "Unsupported channel dtype")
+])
+def test_encode_rejects_invalid_channels(channels, message):
+    with pytest.raises(ValueError, match=message):
+        encode_animation(30.0, channels)
+
+
+def test_decode_rejects_foreign_or_newer_buffers():
+    data = bytearray(encode_animation(30.0, {"a": np.zeros(3, np.float16)}))
+
+    with pytest.raises(ValueError, match="too small"):
+        decode_animation(bytes(data[:HEADER.size - 1]))
+    with pytest.raises(ValueError, match="Not a Twinverse"):
+        decode_animation(b"GLTF" + bytes(data[4:]))
+
+    newer = bytearray(data)
+    newer[4:6] = (99).to_bytes(2, "little")
+    with pytest.raises(ValueError, match="Unsupported animation version"):
+        decode_animation(bytes(newer))
+
+    unknown = bytearray(data)
+    unknown[HEADER.size + 2 + 32] = 200
+    with pytest.raises(ValueError, match="Unknown channel dtype code"):
+        decode_animation(bytes(unknown))
+
+
+def test_container_is_smaller_than_json():
+    channels = {f"blendshape_{index:02d}": values for index, values in enumerate(
+        np.random.default_rng(1).random((52, 9000)).astype(np.float16)
+    )}
+
+    binary = encode_animation(30.0, channels)
+    text = json.dumps({name: values.tolist() for name, values in channels.items()}).encode("utf-8")
+
+    assert len(binary) < len(text) / 4
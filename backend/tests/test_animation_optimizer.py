@@ -0,0 +1,74 @@
+import numpy as np
+
+from services.avatar.animation_format import read_animation, write_animation
+from services.avatar.animation_optimizer import AnimationOptimizerService, quantization_range
+from services.avatar.model_exporter import _channel_curve
+
+
+def _optimize(tmp_path, channels, tolerance=0.01, fps=30.0):
+    dense_path = write_animation(str(tmp_path / "avatar_animated.anim"), fps, channels)
+    keyframes_path = str(tmp_path / "avatar_keyframes.anim")
+    stats = AnimationOptimizerService(tolerance)._optimize_file(dense_path, keyframes_path, tolerance)
+    return read_animation(dense_path), read_animation(keyframes_path), stats
+
+
+def _max_error(dense, optimized, name):
+    times, values = _channel_curve(optimized, name)
+    original = dense.channels[name].astype(np.float64)
+    restored = np.interp(np.arange(len(original)) / dense.fps, times, values)
+    return float(np.abs(restored - original).max())
+
+
+def test_smooth_channels_become_keyframes_within_tolerance(tmp_path):
+    frames = np.arange(7200)
+    head_bob = np.exp(-(frames % 30) / 8.0).astype(np.float16)
+    body = (0.5 + 0.5 * np.sin(frames / 200.0)).astype(np.float16)
+    section = (frames // 1800).astype(np.uint8)
+
+    dense, optimized, stats = _optimize(tmp_path, {"head_bob": head_bob, "body_movement": body, "section": section})
+
+    assert set(optimized.metadata["channels"]) == {"head_bob", "body_movement", "section"}
+    assert stats["compression_ratio"] > 2
+    assert stats["max_error"] <= 0.01
+    for name in ("head_bob", "body_movement"):
+        assert _max_error(dense, optimized, name) <= 0.01 + 1e-6
+    np.testing.assert_array_equal(optimized.channels["section.t"], [0, 1800, 3600, 5400])
+
+
+def test_channels_that_do_not_shrink_stay_dense(tmp_path):
+    rng = np.random.default_rng(0)
+    noise = rng.random(600).astype(np.float16)
+    viseme = (np.arange(600) % 2).astype(np.uint8)
+
+    _, optimized, stats = _optimize(tmp_path, {"noise": noise, "viseme": viseme}, tolerance=0.001)
+
+    assert optimized.metadata["channels"] == {}
+    assert "noise.t" not in optimized.channels and "viseme.t" not in optimized.channels
+    np.testing.assert_array_equal(optimized.channels["noise"], noise)
+    np.testing.assert_array_equal(optimized.channels["viseme"], viseme)
+    assert stats["keyframes"] == 1200
+    assert stats["max_error"] == 0.0
+
+
+def test_wide_channels_fall_back_to_float_keyframes(tmp_path):
+    # Rotation in degrees: half a uint16 step (~0.003) exceeds the tolerance
+    rotation = np.linspace(-180.0, 180.0, 3000, dtype=np.float32)
+    rotation[1500:] = rotation[1500]
+
+    assert quantization_range(rotation.astype(np.float64), 0.001)[2] == np.float32
+
+    dense, optimized, stats = _optimize(tmp_path, {"rotation": rotation}, tolerance=0.001)
+
+    assert optimized.channels["rotation"].dtype == np.float32
+    assert len(optimized.channels["rotation.t"]) < 10
+    assert stats["max_error"] <= 0.001
+    assert _max_error(dense, optimized, "rotation") <= 0.001
+
+
+def test_quantization_picks_the_narrowest_type_within_tolerance():
+    values = np.linspace(0.0, 1.0, 100)
+
+    assert quantization_range(values, 0.01)[2] == np.uint8
+    assert quantization_range(values, 0.0001)[2] == np.uint16
+    assert quantization_range(values, 0.000001)[2] == np.float32
+    assert quantization_range(np.full(10, 0.5), 0.01) == (0.5, 1.0, np.uint8)
@@ -0,0 +1,109 @@
+import os
+import threading
+
+from core import asset_cache
+from core.asset_cache import AssetCache
+
+
+def _builder(calls, size=1000):
+    def build(directory):
+        calls.append(directory)
+        name = os.path.basename(directory)
+        with open(os.path.join(directory, "base.glb"), "wb") as f:
+            f.write(b"x" * size)
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            f.write(name)
+    return build
+
+
+def _keys(cache: AssetCache):
+    return sorted(key for key in os.listdir(cache.directory) if not key.startswith("."))
+
+
+def test_hit_links_the_cached_files_without_rebuilding(tmp_path):
+    cache = AssetCache("avatar_base", directory=str(tmp_path / "cache"))
+    calls = []
+
+    first = cache.materialize("k1", str(tmp_path / "a1"), _builder(calls))
+    second = cache.materialize("k1", str(tmp_path / "a2"), _builder(calls))
+
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert sorted(first) == sorted(second) == ["base.glb", "meta.json"]
+    assert os.path.samefile(first["base.glb"], second["base.glb"])
+    assert cache.references("k1") == 2
+
+
+def test_eviction_runs_only_when_an_insert_exceeds_the_budget(tmp_path, monkeypatch):
+    cache = AssetCache("avatar_base", max_bytes=3500, directory=str(tmp_path / "cache"))
+    evictions = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: evictions.append(1) or evict())
+    calls = []
+
+    for key in ("k1", "k2", "k3"):
+        cache.materialize(key, str(tmp_path / key), _builder(calls))
+    for _ in range(5):
+        cache.materialize("k1", str(tmp_path / "again"), _builder(calls))
+    assert evictions == []
+
+    # Quarta entrada: ~4 KB acima do limite, despeja até 90% (k2 e k3 não têm outra referência)
+    os.remove(tmp_path / "k2" / "base.glb")
+    os.remove(tmp_path / "k2" / "meta.json")
+    cache.materialize("k4", str(tmp_path / "k4"), _builder(calls))
+
+    assert evictions == [1]
+    assert "k2" not in _keys(cache)
+    assert "k4" in _keys(cache)
+    assert cache._bytes <= 3500 * 0.9
+
+
+def test_concurrent_materialize_and_evict_never_lose_files(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    errors = []
+
+    def worker(index):
+        # Uma instância por thread, como processos distintos sobre o mesmo diretório
+        cache = AssetCache("avatar_base", max_bytes=4000, directory=cache_dir)
+        try:
+            for step in range(40):
+                key = f"k{(index * 7 + step) % 10}"
+                paths = cache.materialize(key, str(tmp_path / f"out{index}" / str(step)), _builder([]))
+                with open(paths["base.glb"], "rb") as f:
+                    assert f.read() == b"x" * 1000
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+
+def test_entry_evicted_mid_link_falls_back_to_a_fresh_build(tmp_path, monkeypatch):
+    # Sem flock (ex.: Windows), outro processo pode apagar a entrada durante os links
+    monkeypatch.setattr(asset_cache, "fcntl", None)
+    cache = AssetCache("avatar_base", directory=str(tmp_path / "cache"))
+    link = cache._link
+    entry_dir = os.path.join(cache.directory, "k1")
+
+    def racing_link(source, target):
+        if os.path.exists(entry_dir):
+            for name in os.listdir(entry_dir):
+                os.remove(os.path.join(entry_dir, name))
+            os.rmdir(entry_dir)
+        link(source, target)
+
+    monkeypatch.setattr(cache, "_link", racing_link)
+    calls = []
+
+    paths = cache.materialize("k1", str(tmp_path / "a1"), _builder(calls))
+
+    assert len(calls) == 2
+    assert sorted(paths) == ["base.glb", "meta.json"]
+    with open(paths["base.glb"], "rb") as f:
+        assert f.read() == b"x" * 1000
+    assert not [name for name in os.listdir(cache.directory) if name.startswith(".tmp-")]
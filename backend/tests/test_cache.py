@@ -0,0 +1,65 @@
+import os
+import time
+
+from core.cache import ContentCache, make_cache_key
+
+
+def _cache(tmp_path, **kwargs) -> ContentCache:
+    return ContentCache("test", disk_dir=str(tmp_path / "cache"), **kwargs)
+
+
+def test_key_normalizes_trivial_variations():
+    assert make_cache_key("Céu  Azul ", "Alegria", None) == make_cache_key("céu azul", "alegria", "")
+    assert make_cache_key("céu", ["b", "a"]) == make_cache_key("céu", ["a", "b"])
+    assert make_cache_key("céu", "alegria") != make_cache_key("céu", "tristeza")
+
+
+def test_counters_cover_both_tiers(tmp_path):
+    cache = _cache(tmp_path)
+    assert cache.get("k") is None
+    cache.set("k", {"emotion": "alegria"})
+    assert cache.get("k") == {"emotion": "alegria"}
+
+    # Outro processo: memória vazia, mesmo diretório em disco
+    other = _cache(tmp_path)
+    assert other.get("k") == {"emotion": "alegria"}
+
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert other.stats()["disk_hits"] == 1
+    assert other.stats()["hit_rate"] == 1.0
+
+
+def test_disk_tier_is_bounded_and_evicts_least_recently_used(tmp_path):
+    value = "x" * 1000
+    cache = _cache(tmp_path, max_entries=1, max_disk_bytes=10_000)
+
+    for i in range(8):
+        cache.set(f"key{i}", value)
+    # Uso recente no disco protege key0 do despejo
+    past = time.time() - 60
+    for i in range(1, 8):
+        os.utime(cache._disk_path(f"key{i}"), (past + i, past + i))
+    cache._memory.clear()
+    assert cache.get("key0") == value
+
+    for i in range(8, 14):
+        cache.set(f"key{i}", value)
+
+    stats = cache.stats()
+    assert stats["disk_evictions"] > 0
+    assert stats["disk_bytes"] <= 10_000
+    assert sum(size for _, _, size in cache._disk_entries()) == stats["disk_bytes"]
+
+    cache._memory.clear()
+    assert cache.get("key0") == value
+    assert cache.get("key1") is None
+
+
+def test_expired_disk_entries_are_dropped(tmp_path):
+    cache = _cache(tmp_path, ttl=0.05)
+    cache.set("k", "v")
+    cache._memory.clear()
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert not os.path.exists(cache._disk_path("k"))
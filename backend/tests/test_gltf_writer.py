@@ -0,0 +1,196 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from services.avatar.animation_format import decode_animation, encode_animation
+from services.avatar.avatar_geometry import STYLE_PROFILES, avatar_parts, ellipsoid, outfit_texture
+from services.avatar.gltf_writer import (
+    ARRAY_BUFFER, CHUNK_BIN, CHUNK_JSON, ELEMENT_ARRAY_BUFFER, FLOAT, GLB_MAGIC, QUANTIZATION_EXTENSION, GLBBuilder
+)
+from services.avatar.model_exporter import build_avatar_glb
+
+COMPONENT_DTYPES = {5120: "i1", 5121: "u1", 5122: "<i2", 5123: "<u2", 5125: "<u4", 5126: "<f4"}
+COMPONENT_COUNTS = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}
+FEATURES = {"skin_tone": "tan", "hair_color": "black", "eye_color": "green", "hair_style": "long"}
+
+
+def _accessor_data(gltf, binary, index):
+    # Reads an accessor after checking that it lies inside its buffer view
+    accessor = gltf["accessors"][index]
+    view = gltf["bufferViews"][accessor["bufferView"]]
+    dtype = np.dtype(COMPONENT_DTYPES[accessor["componentType"]])
+    components = COMPONENT_COUNTS[accessor["type"]]
+    element_size = dtype.itemsize * components
+    stride = view.get("byteStride", element_size)
+    offset = view.get("byteOffset", 0) + accessor.get("byteOffset", 0)
+
+    assert accessor["count"] > 0
+    assert offset % dtype.itemsize == 0
+    assert stride >= element_size
+    assert accessor.get("byteOffset", 0) + stride * (accessor["count"] - 1) + element_size <= view["byteLength"]
+    if view.get("target") == ARRAY_BUFFER:
+        # Vertex attributes: every element starts on a 4-byte boundary
+        assert offset % 4 == 0 and stride % 4 == 0 and 4 <= stride <= 252
+
+    return np.ndarray(
+        (accessor["count"], components), dtype=dtype, buffer=binary, offset=offset, strides=(stride, dtype.itemsize)
+    )
+
+
+def validate_glb(data: bytes):
+    """
+    Structural glTF 2.0 validation of a GLB: header, chunk layout, buffer view
+    and accessor bounds, references between objects, mesh indices, bounds,
+    KHR_mesh_quantization usage and animation samplers.
+
+    Returns:
+        Tuple (glTF JSON, BIN chunk)
+    """
+    magic, version, length = struct.unpack_from("<III", data, 0)
+    assert (magic, version, length) == (GLB_MAGIC, 2, len(data))
+
+    json_length, json_type = struct.unpack_from("<II", data, 12)
+    assert json_type == CHUNK_JSON and json_length % 4 == 0
+    gltf = json.loads(data[20:20 + json_length])
+    assert gltf["asset"]["version"] == "2.0"
+
+    position = 20 + json_length
+    binary = b""
+    if position < len(data):
+        bin_length, bin_type = struct.unpack_from("<II", data, position)
+        assert bin_type == CHUNK_BIN and bin_length % 4 == 0
+        binary = data[position + 8:position + 8 + bin_length]
+        assert position + 8 + bin_length == len(data)
+        assert gltf["buffers"] == [{"byteLength": bin_length}]
+
+    for view in gltf.get("bufferViews", []):
+        assert view["buffer"] == 0
+        assert view["byteOffset"] % 4 == 0
+        assert view["byteOffset"] + view["byteLength"] <= len(binary)
+
+    for index in range(len(gltf.get("accessors", []))):
+        values = _accessor_data(gltf, binary, index)
+        accessor = gltf["accessors"][index]
+        if "min" in accessor:
+            assert accessor["min"] == pytest.approx(values.min(axis=0).tolist())
+            assert accessor["max"] == pytest.approx(values.max(axis=0).tolist())
+
+    for image in gltf.get("images", []):
+        view = gltf["bufferViews"][image["bufferView"]]
+        assert image["mimeType"] == "image/png"
+        assert binary[view["byteOffset"]:view["byteOffset"] + 8] == b"\x89PNG\r\n\x1a\n"
+    for texture in gltf.get("textures", []):
+        assert texture["source"] < len(gltf["images"]) and texture["sampler"] < len(gltf["samplers"])
+    for material in gltf.get("materials", []):
+        texture = material["pbrMetallicRoughness"].get("baseColorTexture")
+        assert texture is None or texture["index"] < len(gltf["textures"])
+
+    quantized = False
+    for mesh in gltf.get("meshes", []):
+        for primitive in mesh["primitives"]:
+            attributes = primitive["attributes"]
+            assert primitive["material"] < len(gltf["materials"])
+            vertex_count = gltf["accessors"][attributes["POSITION"]]["count"]
+            for name, index in attributes.items():
+                assert gltf["accessors"][index]["count"] == vertex_count
+                assert gltf["bufferViews"][gltf["accessors"][index]["bufferView"]]["target"] == ARRAY_BUFFER
+            position_accessor = gltf["accessors"][attributes["POSITION"]]
+            assert "min" in position_accessor and "max" in position_accessor
+            quantized |= position_accessor["componentType"] != FLOAT
+            normal_accessor = gltf["accessors"][attributes["NORMAL"]]
+            assert normal_accessor["componentType"] == FLOAT or normal_accessor.get("normalized")
+
+            indices = _accessor_data(gltf, binary, primitive["indices"])
+            assert gltf["bufferViews"][gltf["accessors"][primitive["indices"]]["bufferView"]]["target"] == ELEMENT_ARRAY_BUFFER
+            assert len(indices) % 3 == 0 and indices.max() < vertex_count
+    if quantized:
+        assert QUANTIZATION_EXTENSION in gltf["extensionsUsed"]
+        assert QUANTIZATION_EXTENSION in gltf["extensionsRequired"]
+
+    # Node hierarchy: valid references, a single parent per node, roots in the scene
+    assert all(value != [] for value in gltf.values())
+    assert all(scene.get("nodes", None) != [] for scene in gltf["scenes"])
+    nodes = gltf.get("nodes", [])
+    parents = {}
+    for index, node in enumerate(nodes):
+        assert node.get("mesh", 0) < len(gltf.get("meshes", []))
+        for child in node.get("children", []):
+            assert child < len(nodes) and child not in parents
+            parents[child] = index
+    assert sorted(gltf["scenes"][gltf["scene"]].get("nodes", [])) == sorted(set(range(len(nodes))) - set(parents))
+
+    for animation in gltf.get("animations", []):
+        for channel in animation["channels"]:
+            sampler = animation["samplers"][channel["sampler"]]
+            assert channel["target"]["node"] < len(nodes)
+            times = _accessor_data(gltf, binary, sampler["input"])[:, 0]
+            outputs = _accessor_data(gltf, binary, sampler["output"])
+            assert gltf["accessors"][sampler["input"]]["componentType"] == FLOAT
+            assert "min" in gltf["accessors"][sampler["input"]]
+            assert np.all(np.diff(times) > 0)
+            assert len(outputs) == len(times)
+
+    return gltf, binary
+
+
+def _animation(frame_count: int = 900):
+    frames = np.arange(frame_count)
+    return decode_animation(encode_animation(30.0, {
+        "head_bob": np.exp(-(frames % 15) / 5.0).astype(np.float16),
+        "body_movement": (0.5 + 0.5 * np.sin(frames / 40.0)).astype(np.float16),
+        "section": (frames // 300).astype(np.uint8)
+    }))
+
+
+@pytest.mark.parametrize("style", sorted(STYLE_PROFILES))
+def test_avatar_glb_is_valid_for_every_style(style):
+    gltf, binary = validate_glb(build_avatar_glb({"style": style, "features": FEATURES}, _animation()))
+
+    parts = avatar_parts(style, FEATURES)
+    nodes = {node["name"]: node for node in gltf["nodes"]}
+    assert set(part["name"] for part in parts) <= set(nodes)
+
+    # Dequantized bounds (node scale and translation) match the source geometry
+    for part in parts:
+        node = nodes[part["name"]]
+        accessor = gltf["accessors"][gltf["meshes"][node["mesh"]]["primitives"][0]["attributes"]["POSITION"]]
+        positions = ellipsoid(part["radii"], *part["detail"])[0]
+        scale, translation = np.array(node["scale"]), np.array(node["translation"])
+        step = scale.max()
+        np.testing.assert_allclose(np.array(accessor["min"]) * scale + translation,
+                                   positions.min(axis=0) + part["translation"], atol=step)
+        np.testing.assert_allclose(np.array(accessor["max"]) * scale + translation,
+                                   positions.max(axis=0) + part["translation"], atol=step)
+
+    assert {animation["name"] for animation in gltf["animations"]} == {"music_sync"}
+    assert {channel["target"]["path"] for channel in gltf["animations"][0]["channels"]} == {"translation", "scale"}
+
+
+def test_symmetric_parts_and_textures_are_stored_once():
+    gltf, _ = validate_glb(build_avatar_glb({"style": "anime", "features": FEATURES}))
+
+    mesh_nodes = [node for node in gltf["nodes"] if "mesh" in node]
+    assert len(mesh_nodes) == 9
+    # Eyes, arms and legs share the mesh of their pair
+    assert len(gltf["meshes"]) == 6
+    assert len(gltf["images"]) == len(gltf["textures"]) == 1
+    assert len(gltf["materials"]) == 4
+    assert "animations" not in gltf
+
+
+def test_builder_deduplicates_buffers_by_content():
+    builder = GLBBuilder()
+    texture = builder.add_texture(outfit_texture("cartoon"))
+    assert builder.add_texture(outfit_texture("cartoon")) == texture
+
+    positions, normals, texcoords, indices = ellipsoid((0.1, 0.2, 0.1), 16, 8)
+    material = builder.add_material({"name": "skin", "pbrMetallicRoughness": {}})
+    first = builder.add_mesh("eye_left", positions, normals, indices, material, texcoords)
+    second = builder.add_mesh("eye_right", positions, normals, indices, material, texcoords)
+    assert first == second
+
+    gltf, binary = validate_glb(builder.build())
+    assert len(gltf["bufferViews"]) == 5
+    assert len(binary) == sum(-(-view["byteLength"] // 4) * 4 for view in gltf["bufferViews"])
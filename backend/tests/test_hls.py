@@ -0,0 +1,77 @@
+import pytest
+
+from core.config import settings
+from services.video.hls import _bandwidth, package_digest, rendition_ladder, write_master_playlist
+
+
+def _names(ladder):
+    return [rendition["name"] for rendition in ladder]
+
+
+def test_rendition_ladder_never_upscales_and_is_sorted_by_height():
+    shuffled = list(reversed(settings.HLS_RENDITIONS))
+
+    assert _names(rendition_ladder(1080, shuffled)) == ["1080p", "720p", "480p", "360p"]
+    assert _names(rendition_ladder(2160, shuffled)) == ["1080p", "720p", "480p", "360p"]
+    assert _names(rendition_ladder(720, shuffled)) == ["720p", "480p", "360p"]
+    assert _names(rendition_ladder(600, shuffled)) == ["480p", "360p"]
+
+
+def test_rendition_ladder_keeps_the_smallest_rendition_for_tiny_sources():
+    assert _names(rendition_ladder(240, settings.HLS_RENDITIONS)) == ["360p"]
+
+
+@pytest.mark.parametrize("bitrate, expected", [
+    ("2800k", 2800000),
+    ("192K", 192000),
+    ("1.5m", 1500000),
+    ("5M", 5000000),
+    ("64000", 64000),
+])
+def test_bandwidth_parses_ffmpeg_bitrates(bitrate, expected):
+    assert _bandwidth(bitrate) == expected
+
+
+def test_master_playlist_points_into_the_package_directory(tmp_path):
+    path = tmp_path / "master.m3u8"
+    ladder = rendition_ladder(720, settings.HLS_RENDITIONS)
+
+    write_master_playlist(str(path), ladder, {"width": 1280, "height": 720, "has_audio": True}, "0123abcd")
+
+    assert path.read_text().splitlines() == [
+        "#EXTM3U",
+        "#EXT-X-VERSION:7",
+        "#EXT-X-INDEPENDENT-SEGMENTS",
+        "#EXT-X-STREAM-INF:BANDWIDTH=2928000,RESOLUTION=1280x720",
+        "0123abcd/720p/index.m3u8",
+        "#EXT-X-STREAM-INF:BANDWIDTH=1496000,RESOLUTION=854x480",
+        "0123abcd/480p/index.m3u8",
+        "#EXT-X-STREAM-INF:BANDWIDTH=864000,RESOLUTION=640x360",
+        "0123abcd/360p/index.m3u8",
+    ]
+
+
+def test_master_playlist_without_audio_counts_only_video(tmp_path):
+    path = tmp_path / "master.m3u8"
+    # Fonte vertical: largura proporcional e par, como scale=-2
+    ladder = rendition_ladder(1080, settings.HLS_RENDITIONS)[-1:]
+
+    write_master_playlist(str(path), ladder, {"width": 1080, "height": 1920, "has_audio": False})
+
+    assert path.read_text().splitlines()[-2:] == [
+        "#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=202x360",
+        "360p/index.m3u8",
+    ]
+
+
+def test_package_digest_changes_with_any_file(tmp_path):
+    package = tmp_path / "package"
+    (package / "720p").mkdir(parents=True)
+    (package / "720p" / "index.m3u8").write_text("#EXTM3U\n")
+    (package / "720p" / "segment_00000.m4s").write_bytes(b"segment")
+
+    digest = package_digest(str(package))
+    assert digest == package_digest(str(package))
+
+    (package / "720p" / "segment_00000.m4s").write_bytes(b"other segment")
+    assert package_digest(str(package)) != digest
@@ -0,0 +1,92 @@
+import sqlite3
+import time
+from contextlib import closing
+
+import pytest
+
+from core.job_queue import JobQueue, SQLiteJobQueue
+
+
+def _queue(tmp_path, **kwargs) -> SQLiteJobQueue:
+    options = {"visibility_timeout": 0.05, "max_attempts": 3, "retry_backoff": 0.01, "max_retry_backoff": 0.01}
+    options.update(kwargs)
+    return SQLiteJobQueue(path=str(tmp_path / "jobs.db"), **options)
+
+
+def _job_row(queue: SQLiteJobQueue, job_id: str):
+    with closing(sqlite3.connect(queue.path)) as conn:
+        return conn.execute("SELECT status, attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+
+def test_stale_worker_cannot_touch_a_reclaimed_job(tmp_path):
+    queue = _queue(tmp_path)
+    job_id = queue.enqueue("film", {"film_id": "f1"})
+
+    first = queue.reserve("film")
+    time.sleep(0.06)
+    second = queue.reserve("film")
+    assert second["id"] == job_id and second["attempts"] == 2
+    assert second["lease"] != first["lease"]
+
+    # O primeiro worker perdeu a reserva: nada do que ele faz altera o trabalho
+    assert queue.heartbeat(job_id, first["lease"]) is False
+    assert queue.ack(job_id, first["lease"]) is False
+    assert queue.nack(job_id, first["lease"], "late") is None
+    assert queue.release(job_id, first["lease"]) is False
+    assert _job_row(queue, job_id) == ("running", 2)
+
+    assert queue.heartbeat(job_id, second["lease"]) is True
+    assert queue.ack(job_id, second["lease"]) is True
+    assert _job_row(queue, job_id) == ("done", 2)
+
+
+def test_nack_retries_with_backoff_then_fails(tmp_path):
+    queue = _queue(tmp_path, max_attempts=2)
+    job_id = queue.enqueue("music", {"music_id": "m1"})
+
+    job = queue.reserve("music")
+    assert queue.nack(job_id, job["lease"], "boom") == "queued"
+    assert queue.reserve("music") is None
+
+    time.sleep(0.02)
+    job = queue.reserve("music")
+    assert job["attempts"] == 2
+    assert queue.nack(job_id, job["lease"], "boom") == "failed"
+    assert _job_row(queue, job_id) == ("failed", 2)
+
+
+def test_release_returns_the_job_without_spending_an_attempt(tmp_path):
+    queue = _queue(tmp_path)
+    job_id = queue.enqueue("avatar", {"avatar_id": "a1"})
+
+    job = queue.reserve("avatar")
+    assert queue.release(job_id, job["lease"]) is True
+    assert queue.reserve("avatar")["attempts"] == 1
+
+
+def test_queue_created_before_leases_is_migrated(tmp_path):
+    path = tmp_path / "jobs.db"
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, stage TEXT NOT NULL, payload TEXT NOT NULL, "
+            "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL, "
+            "available_at REAL NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL, last_error TEXT)"
+        )
+        conn.commit()
+
+    queue = SQLiteJobQueue(path=str(path))
+    job_id = queue.enqueue("film", {"film_id": "f1"})
+    job = queue.reserve("film")
+    assert queue.ack(job_id, job["lease"]) is True
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class PartialQueue(JobQueue):
+        def enqueue(self, stage, payload, max_attempts=None):
+            return "job"
+
+        def reserve(self, stage):
+            return None
+
+    with pytest.raises(TypeError):
+        PartialQueue()
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.llm_client import LLMClient
+
+# Latência simulada de cada chamada ao servidor falso
+DELAY = 0.3
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """
+    Servidor HTTP/1.1 local que imita /v1/chat/completions com latência fixa,
+    contando conexões TCP aceitas e requisições em andamento.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeCompletionHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+
+class FakeCompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(DELAY)
+        with server.lock:
+            server.in_flight -= 1
+
+        payload = json.dumps({
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": body["messages"][-1]["content"]},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_server():
+    server = FakeLLMServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server: FakeLLMServer, max_connections: int) -> LLMClient:
+    return LLMClient(
+        api_key="test",
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+        timeout=10.0,
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        max_retries=0
+    )
+
+
+def test_concurrent_calls_overlap_and_reuse_the_pool(fake_server):
+    requests_per_wave = 8
+    max_connections = 4
+
+    async def run():
+        client = _client(fake_server, max_connections)
+        try:
+            elapsed = []
+            for wave in range(2):
+                started_at = time.perf_counter()
+                replies = await asyncio.gather(*(
+                    client.chat([{"role": "user", "content": f"frase {wave}-{i}"}])
+                    for i in range(requests_per_wave)
+                ))
+                elapsed.append(time.perf_counter() - started_at)
+                assert replies == [f"frase {wave}-{i}" for i in range(requests_per_wave)]
+            return elapsed
+        finally:
+            await client.aclose()
+
+    elapsed = asyncio.run(run())
+
+    # As chamadas se sobrepõem: cada onda leva ~2 latências, não 8
+    serial = requests_per_wave * DELAY
+    assert all(seconds < serial / 2 for seconds in elapsed)
+    assert fake_server.max_in_flight == max_connections
+
+    # O pool é limitado e reaproveitado: a segunda onda não abre conexões novas
+    assert fake_server.connections == max_connections
+
+
+def test_timeout_cancels_the_call(fake_server):
+    async def run():
+        client = _client(fake_server, 1)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await client.chat([{"role": "user", "content": "lenta"}], timeout=DELAY / 3)
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,154 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from core import media
+from core.config import settings
+from core.media import media_response, package_file_response, record_media
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # Sem TTL: cada requisição revalida os metadados com um stat
+    monkeypatch.setattr(media.metadata_cache, "ttl", 0)
+    path = str(tmp_path / "filme_final.mp4")
+    app = FastAPI()
+
+    @app.get("/film/f1/video")
+    async def video(request: Request):
+        return await media_response(request, path, media_type="video/mp4")
+
+    client = TestClient(app)
+    client.path = path
+    return client
+
+
+def _generate(path: str, content: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(content)
+    record_media(path)
+
+
+def test_stable_url_is_revalidated_and_picks_up_a_regenerated_file(client):
+    _generate(client.path, b"first cut" * 1000)
+
+    first = client.get("/film/f1/video")
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "no-cache"
+    assert "immutable" not in first.headers["cache-control"]
+
+    unchanged = client.get("/film/f1/video", headers={"if-none-match": first.headers["etag"]})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+
+    # Nova geração no mesmo caminho (mesma URL)
+    _generate(client.path, b"final cut" * 2000)
+
+    regenerated = client.get("/film/f1/video", headers={"if-none-match": first.headers["etag"]})
+    assert regenerated.status_code == 200
+    assert regenerated.content == b"final cut" * 2000
+    assert regenerated.headers["etag"] != first.headers["etag"]
+
+
+def test_range_request_sends_only_the_requested_bytes(client):
+    content = bytes(range(256)) * 4096
+    _generate(client.path, content)
+
+    response = client.get("/film/f1/video", headers={"range": "bytes=500000-500099"})
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 500000-500099/{len(content)}"
+    assert response.content == content[500000:500100]
+    assert response.headers["cache-control"] == "no-cache"
+
+
+@pytest.fixture
+def package_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(media.metadata_cache, "ttl", 0)
+    hls_dir = tmp_path / "hls"
+    (hls_dir / "0123abcd" / "720p").mkdir(parents=True)
+    (hls_dir / "master.m3u8").write_text("#EXTM3U\n0123abcd/720p/index.m3u8\n")
+    (hls_dir / "0123abcd" / "720p" / "index.m3u8").write_text("#EXTM3U\nsegment_00000.m4s\n")
+    (hls_dir / "0123abcd" / "720p" / "segment_00000.m4s").write_bytes(b"segment")
+    (hls_dir / "0123abcd" / "720p" / "notes.txt").write_text("not part of the stream")
+    (tmp_path / "secret.m3u8").write_text("outside the package")
+    app = FastAPI()
+
+    @app.get("/film/f1/hls/{file_path:path}")
+    async def hls(file_path: str, request: Request):
+        return await package_file_response(
+            request, str(hls_dir), file_path, {".m3u8": "application/vnd.apple.mpegurl", ".m4s": "video/iso.segment"},
+            revalidate=("master.m3u8",)
+        )
+
+    client = TestClient(app)
+    client.hls_dir = str(hls_dir)
+    return client
+
+
+def test_package_master_is_revalidated_and_the_rest_is_immutable(package_client):
+    master = package_client.get("/film/f1/hls/master.m3u8")
+    assert master.status_code == 200
+    assert master.headers["cache-control"] == "no-cache"
+
+    for path, media_type in (
+        ("0123abcd/720p/index.m3u8", "application/vnd.apple.mpegurl"),
+        ("0123abcd/720p/segment_00000.m4s", "video/iso.segment")
+    ):
+        response = package_client.get(f"/film/f1/hls/{path}")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == media_type
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+
+@pytest.mark.parametrize("path", [
+    "../secret.m3u8",
+    "0123abcd/../../secret.m3u8",
+    "0123abcd/720p/notes.txt",
+    "0123abcd/720p",
+    "missing.m4s",
+])
+def test_package_paths_outside_the_package_or_of_other_types_are_not_found(package_client, path):
+    # Chamada direta: o cliente HTTP normalizaria os ".." antes do roteamento
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(package_file_response(request, package_client.hls_dir, path, {".m3u8": "", ".m4s": ""}))
+    assert error.value.status_code == 404
+
+    assert package_client.get(f"/film/f1/hls/{path}").status_code == 404
+
+
+@pytest.mark.parametrize("mode, header", [("x-accel-redirect", "x-accel-redirect"), ("x-sendfile", "x-sendfile")])
+def test_offload_hands_the_file_to_the_proxy_after_validation(client, tmp_path, monkeypatch, mode, header):
+    monkeypatch.setattr(settings, "MEDIA_OFFLOAD", mode)
+    monkeypatch.setattr(settings, "STORAGE_DIR", str(tmp_path))
+    _generate(client.path, b"final cut" * 2000)
+
+    response = client.get("/film/f1/video", headers={"range": "bytes=0-99"})
+
+    # Sem corpo: o proxy envia o arquivo (e atende o Range)
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-type"] == "video/mp4"
+    assert response.headers["cache-control"] == "no-cache"
+    expected = "/protected-media/filme_final.mp4" if mode == "x-accel-redirect" else os.path.realpath(client.path)
+    assert response.headers[header] == expected
+
+    # Revalidação continua na aplicação
+    unchanged = client.get("/film/f1/video", headers={"if-none-match": response.headers["etag"]})
+    assert unchanged.status_code == 304
+    assert header not in unchanged.headers
+
+
+def test_offload_is_skipped_for_files_outside_the_storage_dir(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_OFFLOAD", "x-accel-redirect")
+    monkeypatch.setattr(settings, "STORAGE_DIR", str(tmp_path / "storage"))
+    _generate(client.path, b"final cut" * 2000)
+
+    response = client.get("/film/f1/video")
+
+    assert "x-accel-redirect" not in response.headers
+    assert response.content == b"final cut" * 2000
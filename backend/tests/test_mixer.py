@@ -0,0 +1,48 @@
+import numpy as np
+
+from services.audio.mixer import AudioMixer
+
+SAMPLE_RATE = 44100
+
+
+def _stems(frames: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames, dtype=np.float32) / SAMPLE_RATE
+    instrumental = np.stack([0.3 * np.sin(2 * np.pi * 220 * t), 0.3 * np.sin(2 * np.pi * 330 * t)], axis=1)
+    instrumental += 0.05 * rng.standard_normal((frames, 2)).astype(np.float32)
+    voice = (0.4 * np.sin(2 * np.pi * 440 * t) * (np.sin(2 * np.pi * 0.5 * t) > 0))[:, None].repeat(2, axis=1)
+    return instrumental.astype(np.float32), voice.astype(np.float32)
+
+
+def test_block_boundaries_do_not_change_the_mix():
+    block_size = 8192
+    frames = block_size * 6 + 1234
+    instrumental, voice = _stems(frames)
+
+    # Transientes exatamente no início de cada bloco
+    rng = np.random.default_rng(1)
+    for start in range(block_size, frames, block_size):
+        instrumental[start:start + 300] = rng.uniform(-1.0, 1.0, (300, 2))
+
+    blocked = AudioMixer(sample_rate=SAMPLE_RATE, block_size=block_size, instrumental_gain_db=6.0)
+    whole = AudioMixer(sample_rate=SAMPLE_RATE, block_size=frames * 2, instrumental_gain_db=6.0)
+    mixed = blocked.mix(instrumental, voice)
+
+    np.testing.assert_allclose(mixed, whole.mix(instrumental, voice), atol=1e-6)
+
+    # O limitador alcança o teto apenas nos picos, sem clipping rígido
+    assert np.abs(mixed).max() <= blocked.ceiling
+    assert np.count_nonzero(np.abs(mixed) >= blocked.ceiling * 0.99999) < 20
+
+
+def test_voice_ducks_the_instrumental():
+    frames = SAMPLE_RATE * 2
+    instrumental, voice = _stems(frames)
+    silent = np.zeros_like(voice)
+    mixer = AudioMixer(sample_rate=SAMPLE_RATE, block_size=16384)
+
+    ducked = mixer.mix(instrumental, voice) - voice * mixer.voice_gain
+    plain = mixer.mix(instrumental, silent)
+    speaking = slice(SAMPLE_RATE // 4, SAMPLE_RATE * 3 // 4)
+    ratio = np.sqrt(np.mean(ducked[speaking] ** 2) / np.mean(plain[speaking] ** 2))
+    assert abs(20 * np.log10(ratio) - (-6.0)) < 1.0
@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from services.audio.mixer import AudioMixer
+from services.audio.pcm import create_wav, measure_loudness, open_wav, release_pages
+
+SAMPLE_RATE = 44100
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executado em um processo novo: o pico de RSS medido é só o desta tarefa
+JOB_SCRIPT = """
+import json, resource, sys
+from services.audio.analysis import compute_features
+from services.audio.mixer import AudioMixer
+from services.audio.pcm import create_wav, measure_loudness, open_wav
+
+directory = sys.argv[1]
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+instrumental, sample_rate = open_wav(directory + "/instrumental.wav")
+voice, _ = open_wav(directory + "/voice.wav")
+mixed = create_wav(directory + "/mix.wav", len(instrumental), 2, sample_rate)
+AudioMixer(sample_rate=sample_rate).mix(instrumental, voice, output=mixed)
+mixed.flush()
+measure_loudness(mixed, sample_rate)
+compute_features(mixed, sample_rate)
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"growth_kib": after - before}))
+"""
+
+
+def _write_stem(path: str, seconds: int, seed: int) -> None:
+    frames = seconds * SAMPLE_RATE
+    stem = create_wav(path, frames, 2, SAMPLE_RATE)
+    rng = np.random.default_rng(seed)
+    block = SAMPLE_RATE * 10
+    for start in range(0, frames, block):
+        end = min(start + block, frames)
+        stem[start:end] = 0.2 * rng.standard_normal((end - start, 2), dtype=np.float32)
+        release_pages(stem, start, end)
+    stem.flush()
+
+
+def _job_rss_growth_mib(directory: str, seconds: int) -> float:
+    _write_stem(os.path.join(directory, "instrumental.wav"), seconds, 0)
+    _write_stem(os.path.join(directory, "voice.wav"), seconds, 1)
+    result = subprocess.run(
+        [sys.executable, "-c", JOB_SCRIPT, directory],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])["growth_kib"] / 1024
+
+
+def test_peak_rss_is_flat_in_track_length(tmp_path):
+    short_dir = tmp_path / "short"
+    long_dir = tmp_path / "long"
+    short_dir.mkdir()
+    long_dir.mkdir()
+
+    short = _job_rss_growth_mib(str(short_dir), 30)
+    long = _job_rss_growth_mib(str(long_dir), 240)
+
+    # 8x mais áudio (~250 MiB de PCM no caso longo) sem crescimento proporcional do RSS:
+    # só a comparação entre as duas durações, com folga, independente da máquina
+    assert long - short < max(24, 0.5 * short)
+
+
+def test_released_pages_keep_their_data(tmp_path):
+    frames = SAMPLE_RATE * 5
+    rng = np.random.default_rng(2)
+    instrumental = (0.2 * rng.standard_normal((frames, 2))).astype(np.float32)
+    voice = (0.2 * rng.standard_normal((frames, 2))).astype(np.float32)
+    mixer = AudioMixer(sample_rate=SAMPLE_RATE, block_size=8192)
+
+    mixed = create_wav(str(tmp_path / "mix.wav"), frames, 2, SAMPLE_RATE)
+    mixer.mix(instrumental, voice, output=mixed)
+    mixed.flush()
+    del mixed
+
+    reopened, _ = open_wav(str(tmp_path / "mix.wav"))
+    np.testing.assert_array_equal(reopened, mixer.mix(instrumental, voice))
+    assert measure_loudness(reopened, SAMPLE_RATE) == measure_loudness(mixer.mix(instrumental, voice), SAMPLE_RATE)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from core.config import settings
+from services.film.timeline_planner import plan_scenes
+
+# 120 BPM in 4/4: one beat every 0.5 s, one bar every 2 s
+BEAT = 0.5
+BAR = 4 * BEAT
+
+
+def _beats(duration: float, beat: float = BEAT) -> np.ndarray:
+    return np.arange(0.0, duration, beat)
+
+
+def test_every_boundary_lands_on_a_bar_start():
+    duration = 183.7
+    beats = _beats(duration)
+    bar_starts = beats[::4]
+
+    scenes = plan_scenes(7, duration, beats)
+
+    assert len(scenes) == 7
+    for scene in scenes[1:]:
+        assert np.isclose(bar_starts, scene["start"]).any()
+    for previous, scene in zip(scenes[:-1], scenes[1:]):
+        assert scene["start"] == previous["end"]
+    assert all(scene["bars"] >= 1 for scene in scenes)
+
+
+def test_section_start_within_the_snap_window_wins_over_the_nearest_bar():
+    duration = 100.0
+    beats = _beats(duration)
+    inside = 50.0 + settings.FILM_SECTION_SNAP_BARS * BAR
+    outside = inside + BAR
+
+    # The ideal cut for two scenes is 50 s, itself a bar start
+    snapped = plan_scenes(2, duration, beats, sections=np.array([0.0, inside]))
+    assert snapped[1]["start"] == inside
+
+    ignored = plan_scenes(2, duration, beats, sections=np.array([0.0, outside]))
+    assert ignored[1]["start"] == 50.0
+
+
+def test_scene_durations_add_up_to_the_track_length():
+    # Irregular tempo and a length that is not a whole number of bars
+    duration = 187.437
+    beats = _beats(duration, beat=0.4862)
+
+    scenes = plan_scenes(9, duration, beats, sections=np.array([0.0, 31.1152, 93.3504, 155.5856]))
+
+    assert scenes[0]["start"] == 0.0
+    assert scenes[-1]["end"] == duration
+    assert sum(scene["duration"] for scene in scenes) == pytest.approx(duration, abs=1e-9)
+
+
+@pytest.mark.parametrize("beats", [None, np.zeros(0), _beats(6.0)])
+def test_sparse_or_empty_beat_grid_falls_back_to_an_even_split(beats):
+    # _beats(6.0) has only two bar starts inside the track, fewer than the four cuts needed
+    scenes = plan_scenes(5, 60.0, beats)
+
+    assert [scene["start"] for scene in scenes] == [0.0, 12.0, 24.0, 36.0, 48.0]
+    assert all(scene["duration"] == 12.0 for scene in scenes)
+    assert all(scene["bars"] is None for scene in scenes)
+
+
+def test_zero_or_one_scene():
+    beats = _beats(60.0)
+
+    assert plan_scenes(0, 60.0, beats) == []
+
+    (scene,) = plan_scenes(1, 60.0, beats)
+    assert (scene["order"], scene["start"], scene["end"], scene["duration"]) == (1, 0.0, 60.0, 60.0)
+    assert scene["bars"] == 30
@@ -0,0 +1,61 @@
+import asyncio
+import os
+
+from services.film import video_editor
+from services.film.video_editor import VideoEditorService
+
+
+def _write(path, content: bytes) -> str:
+    with open(path, "wb") as f:
+        f.write(content)
+    return str(path)
+
+
+def test_editing_one_scene_reencodes_only_its_segment(tmp_path, monkeypatch):
+    encoded = []
+    remuxed = []
+
+    def fake_encode(source_path, in_point, out_point, segment_path):
+        encoded.append(source_path)
+        return _write(segment_path, b"segment")
+
+    def fake_remux(segment_paths, music_path, output_path):
+        remuxed.append(list(segment_paths))
+        return _write(output_path, b"film")
+
+    monkeypatch.setattr(video_editor.shutil, "which", lambda name: f"/usr/bin/{name}")
+    monkeypatch.setattr(video_editor, "encode_segment", fake_encode)
+    monkeypatch.setattr(video_editor, "remux_film", fake_remux)
+
+    scenes = [
+        {"file_path": _write(tmp_path / f"scene_{index}.mp4", f"scene {index}".encode()), "duration": 8.0}
+        for index in range(3)
+    ]
+    music_path = _write(tmp_path / "music.mp3", b"music")
+    output_path = str(tmp_path / "film" / "final.mp4")
+    editor = VideoEditorService()
+
+    first = asyncio.run(editor.edit(scenes, music_path, "avatar.mp4", output_path))
+    assert len(first["segments_reencoded"]) == 3
+    assert first["remuxed"] is True
+
+    # Re-render the second scene only
+    _write(scenes[1]["file_path"], b"scene 1, second take")
+    encoded.clear()
+
+    second = asyncio.run(editor.edit(scenes, music_path, "avatar.mp4", output_path))
+
+    reencoded = second["segments_reencoded"]
+    assert len(reencoded) == 1
+    assert reencoded[0] not in first["segments_reencoded"]
+    assert sorted(second["segments_reused"]) == sorted(
+        key for index, key in enumerate(first["segments_reencoded"]) if index != 1
+    )
+    assert encoded == [scenes[1]["file_path"]]
+    assert second["remuxed"] is True and len(remuxed) == 2
+    assert len(os.listdir(tmp_path / "film" / "segments")) == 3
+
+    # Nothing changed: no encoding and no remux
+    third = asyncio.run(editor.edit(scenes, music_path, "avatar.mp4", output_path))
+    assert third["segments_reencoded"] == []
+    assert third["remuxed"] is False
@@ -0,0 +1,140 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import worker
+from core.config import settings
+from core.job_queue import SQLiteJobQueue
+from core.status_store import StatusStore
+
+
+def _services(tmp_path, max_attempts: int) -> SimpleNamespace:
+    services = SimpleNamespace(
+        job_queue=SQLiteJobQueue(
+            path=str(tmp_path / "jobs.db"),
+            visibility_timeout=0.2,
+            max_attempts=max_attempts,
+            retry_backoff=0.01,
+            max_retry_backoff=0.01
+        ),
+        status_store=StatusStore(path=str(tmp_path / "status.db"))
+    )
+    services.job_queue.on_give_up = lambda job: worker._give_up(services, job)
+    return services
+
+
+def _statuses(services: SimpleNamespace, job_id: str):
+    return [status["status"] for _, event_job_id, status in services.status_store.events_since(0)
+            if event_job_id == job_id]
+
+
+def _flaky_handler(failures: int):
+    calls = {"count": 0}
+
+    async def handler(services, music_id: str):
+        services.status_store.start(music_id)
+        calls["count"] += 1
+        if calls["count"] <= failures:
+            services.status_store.retrying(music_id, f"Erro ao gerar música: tentativa {calls['count']}")
+            raise RuntimeError("boom")
+        services.status_store.complete(music_id)
+
+    return handler
+
+
+async def _consume_until(services: SimpleNamespace, job_id: str, terminal=("completed", "failed")) -> None:
+    task = asyncio.create_task(worker._consume(services, "music"))
+    try:
+        deadline = time.monotonic() + 5
+        while services.status_store.get(job_id)["status"] not in terminal:
+            assert time.monotonic() < deadline
+            await asyncio.sleep(0.01)
+        # Deixar o worker confirmar o trabalho na fila
+        await asyncio.sleep(0.05)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def test_retried_attempt_is_never_published_as_failed(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_POLL_INTERVAL", 0.01)
+    monkeypatch.setitem(worker.STAGE_HANDLERS, "music", _flaky_handler(failures=1))
+    services = _services(tmp_path, max_attempts=3)
+    services.status_store.create("m1", "music")
+    services.job_queue.enqueue("music", {"music_id": "m1"})
+
+    asyncio.run(_consume_until(services, "m1"))
+
+    assert _statuses(services, "m1") == ["queued", "running", "retrying", "running", "completed"]
+    assert services.status_store.get("m1")["error"] is None
+
+
+def test_status_fails_only_when_the_queue_gives_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_POLL_INTERVAL", 0.01)
+    monkeypatch.setitem(worker.STAGE_HANDLERS, "music", _flaky_handler(failures=5))
+    services = _services(tmp_path, max_attempts=2)
+    services.status_store.create("m1", "music")
+    services.job_queue.enqueue("music", {"music_id": "m1"})
+
+    asyncio.run(_consume_until(services, "m1"))
+
+    statuses = _statuses(services, "m1")
+    assert statuses[-1] == "failed"
+    assert statuses.count("failed") == 1
+    assert services.status_store.get("m1")["error"] == "Erro ao gerar música: tentativa 2"
+
+
+def test_worker_dying_on_last_attempt_fails_the_status(tmp_path):
+    services = _services(tmp_path, max_attempts=1)
+    services.status_store.create("m1", "music")
+    services.job_queue.enqueue("music", {"music_id": "m1"})
+
+    # Worker reserva, começa e morre sem confirmar
+    assert services.job_queue.reserve("music") is not None
+    services.status_store.start("m1")
+    time.sleep(0.25)
+
+    assert services.job_queue.reserve("music") is None
+    status = services.status_store.get("m1")
+    assert status["status"] == "failed"
+    assert status["error"] == "Visibility timeout expired"
+
+
+def test_failed_batch_does_not_leave_avatars_running(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    services = _services(tmp_path, max_attempts=1)
+
+    async def analyze(music_path):
+        raise RuntimeError("decoder crashed")
+
+    services.music_analyzer = SimpleNamespace(analyze=analyze)
+    items = [
+        {"avatar_id": avatar_id, "music_id": "m1", "style": "anime", "visual_data": {}}
+        for avatar_id in ("a1", "a2", "a3")
+    ]
+    services.status_store.create("b1", "avatar_batch")
+    for item in items:
+        services.status_store.create(item["avatar_id"], "avatar", {"batch_id": "b1"})
+    services.status_store.complete("a1")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(worker.process_avatar_batch(services, "b1", items))
+
+    assert [services.status_store.get(avatar_id)["status"] for avatar_id in ("a1", "a2", "a3")] == \
+        ["completed", "retrying", "retrying"]
+
+    worker._give_up(services, {
+        "id": "job_avatar_batch_1",
+        "stage": "avatar_batch",
+        "payload": {"batch_id": "b1", "items": items},
+        "error": "decoder crashed"
+    })
+
+    assert services.status_store.get("b1")["status"] == "failed"
+    assert services.status_store.get("a1")["status"] == "completed"
+    for avatar_id in ("a2", "a3"):
+        status = services.status_store.get(avatar_id)
+        assert status["status"] == "failed"
+        assert status["error"] == "Error generating avatar batch: decoder crashed"
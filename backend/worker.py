@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import signal
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+# Importações dos módulos internos
+from api.router import process_music_generation
+from api.avatar.router import fail_batch_avatars, process_avatar_batch, process_avatar_generation
+from api.film.router import process_film_generation
+from api.publication.router import process_publication_generation
+from core.config import settings
+from core.container import ServiceContainer
+from core.job_queue import JobQueue
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+# Função de processamento de cada etapa
+STAGE_HANDLERS = {
+    "music": process_music_generation,
+    "avatar": process_avatar_generation,
+    "avatar_batch": process_avatar_batch,
+    "film": process_film_generation,
+    "publication": process_publication_generation
+}
+
+# Campo do payload com o ID do status (StatusStore) de cada etapa
+STATUS_KEYS = {
+    "music": "music_id",
+    "avatar": "avatar_id",
+    "avatar_batch": "batch_id",
+    "film": "film_id",
+    "publication": "publication_id"
+}
+
+
+def _give_up(services: ServiceContainer, job: Dict[str, Any]) -> None:
+    """
+    A fila desistiu do trabalho (tentativas esgotadas ou worker morto na última
+    tentativa): só agora o status passa ao estado terminal "failed".
+    """
+    status_id = job["payload"].get(STATUS_KEYS.get(job["stage"], ""))
+    if status_id is None:
+        return
+    status = services.status_store.get(status_id)
+    if status is None or status["status"] in ("completed", "failed"):
+        return
+    error = status["error"] or job["error"]
+    services.status_store.fail(status_id, error)
+
+    # Avatares do lote ainda não concluídos falham junto com ele
+    if job["stage"] == "avatar_batch":
+        fail_batch_avatars(services, job["payload"]["items"], error)
+
+
+async def _heartbeat(queue: JobQueue, job: Dict[str, Any]) -> None:
+    # Renovar o visibility timeout enquanto o trabalho estiver em execução
+    while True:
+        await asyncio.sleep(settings.JOB_VISIBILITY_TIMEOUT / 3)
+        if not await asyncio.to_thread(queue.heartbeat, job["id"], job["lease"]):
+            print(f"[{job['stage']}] Reserva de {job['id']} perdida: outro worker assumiu o trabalho")
+            return
+
+
+async def _consume(services: ServiceContainer, stage: str) -> None:
+    """
+    Laço de um slot de execução: reserva, executa e confirma trabalhos da etapa.
+    As operações da fila (SQLite, bloqueantes) rodam fora do event loop.
+    """
+    queue = services.job_queue
+    handler = STAGE_HANDLERS[stage]
+
+    while True:
+        job = await asyncio.to_thread(queue.reserve, stage)
+        if job is None:
+            await asyncio.sleep(settings.WORKER_POLL_INTERVAL)
+            continue
+
+        print(f"[{stage}] Executando {job['id']} (tentativa {job['attempts']})")
+        heartbeat = asyncio.create_task(_heartbeat(queue, job))
+        try:
+            await handler(services=services, **job["payload"])
+            if not await asyncio.to_thread(queue.ack, job["id"], job["lease"]):
+                print(f"[{stage}] {job['id']} concluído após perder a reserva; confirmação ignorada")
+        except asyncio.CancelledError:
+            # Worker encerrando: devolver o trabalho à fila sem consumir tentativa
+            await asyncio.to_thread(queue.release, job["id"], job["lease"])
+            raise
+        except Exception as e:
+            print(f"[{stage}] Falha em {job['id']}: {str(e)}")
+            await asyncio.to_thread(queue.nack, job["id"], job["lease"], str(e))
+        finally:
+            heartbeat.cancel()
+
+
+async def run_worker(stages: List[str], concurrency: Dict[str, int]) -> None:
+    """
+    Executa os slots de consumo de cada etapa até receber SIGINT/SIGTERM.
+    """
+    services = ServiceContainer()
+    services.job_queue.on_give_up = lambda job: _give_up(services, job)
+    tasks = [
+        asyncio.create_task(_consume(services, stage))
+        for stage in stages
+        for _ in range(concurrency.get(stage, 1))
+    ]
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: [task.cancel() for task in tasks])
+
+    print(f"Worker iniciado: {', '.join(f'{stage}={concurrency.get(stage, 1)}' for stage in stages)}")
+    try:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        await services.aclose()
+
+
+def _parse_concurrency(value: str) -> Dict[str, int]:
+    # Formato: "music=2,film=1"
+    concurrency = dict(settings.WORKER_CONCURRENCY)
+    for item in filter(None, value.split(",")):
+        stage, count = item.split("=")
+        concurrency[stage.strip()] = int(count)
+    return concurrency
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker de geração do Twinverse-AI")
+    parser.add_argument(
+        "--stages",
+        default=",".join(STAGE_HANDLERS),
+        help="Etapas consumidas por este processo (ex.: music,avatar)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        default="",
+        help="Concorrência por etapa (ex.: music=2,film=1); padrão em settings.WORKER_CONCURRENCY"
+    )
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    for stage in stages:
+        if stage not in STAGE_HANDLERS:
+            parser.error(f"Etapa desconhecida: {stage}")
+
+    asyncio.run(run_worker(stages, _parse_concurrency(args.concurrency)))
@@ -7,49 +7,45 @@ const MusicPlayerPage = () => {
   const [musicData, setMusicData] = useState(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
-  const [pollingInterval, setPollingInterval] = useState(null)
 
   // Função para buscar status da música
   const fetchMusicStatus = async () => {
     try {
       const response = await axios.get(`http://localhost:8000/api/music/${musicId}`)
       setMusicData(response.data)
-      
-      // Se a música estiver pronta, parar de verificar
-      if (response.data.status === 'completed') {
-        if (pollingInterval) {
-          clearInterval(pollingInterval)
-          setPollingInterval(null)
-        }
-      }
     } catch (err) {
       setError('Erro ao buscar informações da música')
       console.error('Erro:', err)
-      
-      // Parar de verificar em caso de erro
-      if (pollingInterval) {
-        clearInterval(pollingInterval)
-        setPollingInterval(null)
-      }
     } finally {
       setLoading(false)
     }
   }
 
-  // Iniciar verificação quando o componente montar
+  // Acompanhar o progresso via Server-Sent Events quando o componente montar
   useEffect(() => {
-    fetchMusicStatus()
+    const events = new EventSource(`http://localhost:8000/api/music/${musicId}/events`)
     
-    // Verificar status a cada 5 segundos se estiver em processamento
-    const interval = setInterval(fetchMusicStatus, 5000)
-    setPollingInterval(interval)
+    events.addEventListener('status', (event) => {
+      const status = JSON.parse(event.data)
+      setMusicData((current) => ({ ...current, ...status }))
+      setLoading(false)
+      
+      // Ao terminar, buscar o status completo (URLs da música) e encerrar o stream
+      if (status.status === 'completed' || status.status === 'failed') {
+        events.close()
+        fetchMusicStatus()
+      }
+    })
     
-    // Limpar intervalo quando o componente desmontar
-    return () => {
-      if (interval) {
-        clearInterval(interval)
+    events.onerror = () => {
+      // Música inexistente ou servidor indisponível
+      if (events.readyState === EventSource.CLOSED) {
+        fetchMusicStatus()
       }
     }
+    
+    // Encerrar o stream quando o componente desmontar
+    return () => events.close()
   }, [musicId])
 
   // Renderizar estado de carregamento
@@ -76,8 +72,22 @@ const MusicPlayerPage = () => {
     )
   }
 
+  // Renderizar falha na geração
+  if (musicData && musicData.status === 'failed') {
+    return (
+      <div className="container mx-auto py-8 px-4 text-center">
+        <div className="bg-red-100 border border-red-400 text-red-700 px-4 py-3 rounded max-w-lg mx-auto">
+          <p>{musicData.error || 'Erro ao gerar música'}</p>
+        </div>
+        <Link to="/create" className="mt-6 inline-block text-purple-600 hover:underline">
+          Voltar e tentar novamente
+        </Link>
+      </div>
+    )
+  }
+
   // Renderizar música em processamento
-  if (musicData && musicData.status === 'processing') {
+  if (musicData && musicData.status !== 'completed') {
     return (
       <div className="container mx-auto py-8 px-4 text-center">
         <div className="max-w-2xl mx-auto bg-white rounded-lg shadow-md p-6">
@@ -93,7 +103,10 @@ const MusicPlayerPage = () => {
           </p>
           
           <div className="mt-6 w-full bg-gray-200 rounded-full h-2.5">
-            <div className="bg-purple-600 h-2.5 rounded-full w-3/4 animate-[pulse_2s_ease-in-out_infinite]"></div>
+            <div
+              className="bg-purple-600 h-2.5 rounded-full animate-[pulse_2s_ease-in-out_infinite]"
+              style={{ width: `${musicData.progress || 0}%` }}
+            ></div>
           </div>
           
           <p className="text-sm text-gray-500 mt-4">
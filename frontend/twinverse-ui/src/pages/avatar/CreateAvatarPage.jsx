@@ -8,7 +8,7 @@ import VisualDescriptionForm from '../components/avatar/VisualDescriptionForm';
 import ImageUploader from '../components/avatar/ImageUploader';
 import LoadingIndicator from '../components/LoadingIndicator';
 import ErrorMessage from '../components/ErrorMessage';
-import { createAvatar, getAvatarStatus } from '../services/avatarService';
+import { createAvatar } from '../services/avatarService';
 
 const CreateAvatarPage = () => {
   const { musicId } = useParams();
@@ -23,31 +23,35 @@ const CreateAvatarPage = () => {
   const [selectedStyle, setSelectedStyle] = useState('realistic');
   const [imageFile, setImageFile] = useState(null);
   
-  // Check avatar processing status
+  // Follow avatar processing status via Server-Sent Events
   useEffect(() => {
-    let statusInterval;
+    if (!avatarId) return;
     
-    if (avatarId && processingStatus !== 'completed') {
-      statusInterval = setInterval(async () => {
-        try {
-          const status = await getAvatarStatus(avatarId);
-          setProcessingStatus(status.status);
-          
-          if (status.status === 'completed') {
-            clearInterval(statusInterval);
-            // Navigate to next step or preview
-            navigate(`/avatar/${avatarId}/preview`);
-          }
-        } catch (err) {
-          console.error('Error checking avatar status:', err);
-        }
-      }, 5000); // Check every 5 seconds
-    }
+    const events = new EventSource(`http://localhost:8000/api/avatar/${avatarId}/events`);
     
-    return () => {
-      if (statusInterval) clearInterval(statusInterval);
+    events.addEventListener('status', (event) => {
+      const status = JSON.parse(event.data);
+      
+      if (status.status === 'completed') {
+        setProcessingStatus('completed');
+        events.close();
+        // Navigate to next step or preview
+        navigate(`/avatar/${avatarId}/preview`);
+      } else if (status.status === 'failed') {
+        setProcessingStatus('failed');
+        setError(status.error || 'Error generating avatar');
+        events.close();
+      } else {
+        setProcessingStatus('processing');
+      }
+    });
+    
+    events.onerror = (err) => {
+      console.error('Error following avatar status:', err);
     };
-  }, [avatarId, processingStatus, navigate]);
+    
+    return () => events.close();
+  }, [avatarId, navigate]);
   
   const handleStyleChange = (style) => {
     setSelectedStyle(style);
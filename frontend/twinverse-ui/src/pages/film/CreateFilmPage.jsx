@@ -4,7 +4,7 @@ import Header from '../components/Header';
 import Footer from '../components/Footer';
 import LoadingIndicator from '../components/LoadingIndicator';
 import ErrorMessage from '../components/ErrorMessage';
-import { createFilm, getFilmStatus } from '../services/filmService';
+import { createFilm } from '../services/filmService';
 
 const CreateFilmPage = () => {
   const { musicId, avatarId } = useParams();
@@ -15,31 +15,35 @@ const CreateFilmPage = () => {
   const [filmId, setFilmId] = useState(null);
   const [processingStatus, setProcessingStatus] = useState(null);
   
-  // Check film processing status
+  // Follow film processing status via Server-Sent Events
   useEffect(() => {
-    let statusInterval;
+    if (!filmId) return;
     
-    if (filmId && processingStatus !== 'completed') {
-      statusInterval = setInterval(async () => {
-        try {
-          const status = await getFilmStatus(filmId);
-          setProcessingStatus(status.status);
-          
-          if (status.status === 'completed') {
-            clearInterval(statusInterval);
-            // Navigate to film preview
-            navigate(`/film/${filmId}/preview`);
-          }
-        } catch (err) {
-          console.error('Error checking film status:', err);
-        }
-      }, 5000); // Check every 5 seconds
-    }
+    const events = new EventSource(`http://localhost:8000/api/film/${filmId}/events`);
     
-    return () => {
-      if (statusInterval) clearInterval(statusInterval);
+    events.addEventListener('status', (event) => {
+      const status = JSON.parse(event.data);
+      
+      if (status.status === 'completed') {
+        setProcessingStatus('completed');
+        events.close();
+        // Navigate to preview
+        navigate(`/film/${filmId}/preview`);
+      } else if (status.status === 'failed') {
+        setProcessingStatus('failed');
+        setError(status.error || 'Error generating film');
+        events.close();
+      } else {
+        setProcessingStatus('processing');
+      }
+    });
+    
+    events.onerror = (err) => {
+      console.error('Error following film status:', err);
     };
-  }, [filmId, processingStatus, navigate]);
+    
+    return () => events.close();
+  }, [filmId, navigate]);
   
   const handleCreateFilm = async () => {
     setLoading(true);
@@ -4,7 +4,7 @@ import Header from '../components/Header';
 import Footer from '../components/Footer';
 import LoadingIndicator from '../components/LoadingIndicator';
 import ErrorMessage from '../components/ErrorMessage';
-import { createPublication, getPublicationStatus } from '../services/publicationService';
+import { createPublication } from '../services/publicationService';
 
 const CreatePublicationPage = () => {
   const { musicId, avatarId, filmId } = useParams();
@@ -16,31 +16,35 @@ const CreatePublicationPage = () => {
   const [processingStatus, setProcessingStatus] = useState(null);
   const [artistName, setArtistName] = useState('');
   
-  // Check publication processing status
+  // Follow publication processing status via Server-Sent Events
   useEffect(() => {
-    let statusInterval;
+    if (!publicationId) return;
     
-    if (publicationId && processingStatus !== 'completed') {
-      statusInterval = setInterval(async () => {
-        try {
-          const status = await getPublicationStatus(publicationId);
-          setProcessingStatus(status.status);
-          
-          if (status.status === 'completed') {
-            clearInterval(statusInterval);
-            // Navigate to publication preview
-            navigate(`/publication/${publicationId}/preview`);
-          }
-        } catch (err) {
-          console.error('Error checking publication status:', err);
-        }
-      }, 5000); // Check every 5 seconds
-    }
+    const events = new EventSource(`http://localhost:8000/api/publication/${publicationId}/events`);
     
-    return () => {
-      if (statusInterval) clearInterval(statusInterval);
+    events.addEventListener('status', (event) => {
+      const status = JSON.parse(event.data);
+      
+      if (status.status === 'completed') {
+        setProcessingStatus('completed');
+        events.close();
+        // Navigate to preview
+        navigate(`/publication/${publicationId}/preview`);
+      } else if (status.status === 'failed') {
+        setProcessingStatus('failed');
+        setError(status.error || 'Error generating publication');
+        events.close();
+      } else {
+        setProcessingStatus('processing');
+      }
+    });
+    
+    events.onerror = (err) => {
+      console.error('Error following publication status:', err);
     };
-  }, [publicationId, processingStatus, navigate]);
+    
+    return () => events.close();
+  }, [publicationId, navigate]);
   
   const handleArtistNameChange = (e) => {
     setArtistName(e.target.value);